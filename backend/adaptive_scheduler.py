@@ -0,0 +1,203 @@
+import heapq
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TargetSchedule:
+    """Intervalo atual e próximo horário de sondagem de um destino"""
+
+    __slots__ = ("interval", "next_due", "stable_cycles", "baseline", "in_flight")
+
+    def __init__(self, interval: float, now: float):
+        self.interval = interval
+        self.next_due = now
+        self.stable_cycles = 0
+        self.baseline: Optional[float] = None  # EWMA da latência quando estável
+        self.in_flight = False
+
+
+class AdaptiveScheduler:
+    """Intervalos por destino: recua em destinos estáveis, aperta em destinos degradados
+
+    Os agendamentos ficam em heaps por próximo vencimento, então cada despertar só olha os
+    destinos vencidos. Um orçamento global de sondas por segundo (token bucket) limita o
+    total; quando ele se esgota, os destinos degradados (intervalo abaixo do base) têm prioridade.
+    """
+
+    def __init__(self, base_interval: float = 5, min_interval: float = 1, max_interval: float = 60,
+                 max_probes_per_second: float = 50, backoff: float = 1.5, stable_after: int = 3,
+                 latency_rise: float = 2.0, baseline_alpha: float = 0.1):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_probes_per_second = max_probes_per_second
+        self.backoff = backoff
+        self.stable_after = stable_after  # ciclos estáveis antes de aumentar o intervalo
+        self.latency_rise = latency_rise  # latência acima de N x a linha de base = degradado
+        self.baseline_alpha = baseline_alpha
+
+        self.targets: Dict[str, TargetSchedule] = {}
+        # (next_due, rótulo) dos destinos degradados e dos demais; entradas obsoletas são descartadas ao sair
+        self._urgent: List[Tuple[float, str]] = []
+        self._heap: List[Tuple[float, str]] = []
+        self._tokens = max_probes_per_second
+        self._last_refill: Optional[float] = None
+
+        # Estatísticas
+        self.scheduled = 0
+        self.deferred = 0
+        self.tightened = 0
+        self.relaxed = 0
+
+    def _available(self, now: float) -> float:
+        """Sondas disponíveis no orçamento em `now`"""
+        if self._last_refill is None:
+            return self._tokens
+        return min(self.max_probes_per_second,
+                   self._tokens + (now - self._last_refill) * self.max_probes_per_second)
+
+    def _refill(self, now: float):
+        self._tokens = self._available(now)
+        self._last_refill = now
+
+    def _push(self, label: str, schedule: TargetSchedule):
+        heap = self._urgent if schedule.interval < self.base_interval else self._heap
+        heapq.heappush(heap, (schedule.next_due, label))
+
+    def _next_due(self, heap: List[Tuple[float, str]]) -> Optional[float]:
+        """Vencimento da primeira entrada válida do heap"""
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _is_current(self, entry: Tuple[float, str]) -> bool:
+        """Entrada do heap ainda vale (destino existe, não está em voo e o vencimento não mudou)"""
+        next_due, label = entry
+        schedule = self.targets.get(label)
+        return schedule is not None and not schedule.in_flight and schedule.next_due == next_due
+
+    def add(self, label: str, now: float):
+        """Passa a agendar um destino (vence imediatamente); não altera um já agendado"""
+        if label not in self.targets:
+            schedule = self.targets[label] = TargetSchedule(self.base_interval, now)
+            self._push(label, schedule)
+
+    def due(self, now: float, resolve: Callable[[str, float], Optional[str]]) -> List[Tuple[str, str]]:
+        """Destinos (endereço, rótulo) a sondar agora, dentro do orçamento
+
+        `resolve` devolve o endereço a sondar de um rótulo vencido, ou None para pulá-lo até o
+        próximo intervalo; só é chamado quando a sonda será de fato despachada.
+        """
+        self._refill(now)
+
+        batch = []
+        for heap in (self._urgent, self._heap):
+            while True:
+                next_due = self._next_due(heap)
+                if next_due is None or next_due > now:
+                    break
+                if self._tokens < 1:
+                    self.deferred += 1
+                    break
+
+                _, label = heapq.heappop(heap)
+                schedule = self.targets[label]
+                address = resolve(label, now)
+                if address is None:
+                    schedule.next_due = now + schedule.interval
+                    self._push(label, schedule)
+                    continue
+
+                self._tokens -= 1
+                schedule.in_flight = True
+                batch.append((address, label))
+        self.scheduled += len(batch)
+        return batch
+
+    def observe(self, result: Dict, now: float):
+        """Ajusta o intervalo do destino a partir do resultado"""
+        schedule = self.targets.get(result["target"])
+        if schedule is None or not schedule.in_flight:
+            return
+        schedule.in_flight = False
+
+        latency = result.get("latency", 0)
+        degraded = not result["success"] or result.get("loss", 0) > 0
+        if not degraded and schedule.baseline is not None and latency > 0:
+            degraded = latency > schedule.baseline * self.latency_rise and latency - schedule.baseline > 5
+
+        if degraded:
+            # Perda ou latência subindo: aperta até o mínimo
+            if schedule.interval > self.min_interval:
+                self.tightened += 1
+            schedule.interval = max(self.min_interval, schedule.interval / 2 if result["success"] else self.min_interval)
+            schedule.stable_cycles = 0
+        else:
+            if latency > 0:
+                schedule.baseline = latency if schedule.baseline is None else (
+                    schedule.baseline + self.baseline_alpha * (latency - schedule.baseline))
+            schedule.stable_cycles += 1
+            if schedule.stable_cycles >= self.stable_after and schedule.interval < self.max_interval:
+                schedule.interval = min(self.max_interval, schedule.interval * self.backoff)
+                schedule.stable_cycles = 0
+                self.relaxed += 1
+
+        schedule.next_due = now + schedule.interval
+        self._push(result["target"], schedule)
+
+    def release(self, label: str):
+        """Libera um destino cuja sonda não produziu resultado"""
+        schedule = self.targets.get(label)
+        if schedule and schedule.in_flight:
+            schedule.in_flight = False
+            self._push(label, schedule)
+
+    def remove(self, label: str):
+        """Descarta o agendamento de um destino"""
+        self.targets.pop(label, None)
+
+    def reset(self, now: float):
+        """Volta todos os destinos ao intervalo base, vencendo imediatamente"""
+        self._urgent = []
+        self._heap = []
+        for label, schedule in self.targets.items():
+            schedule.interval = self.base_interval
+            schedule.next_due = now
+            schedule.stable_cycles = 0
+            schedule.baseline = None
+            if not schedule.in_flight:
+                self._heap.append((now, label))
+        heapq.heapify(self._heap)
+
+    def next_wakeup(self, now: float) -> float:
+        """Segundos até o próximo destino vencer, ou até o orçamento ter 1 sonda se ele acabou
+
+        O intervalo é limitado a min_interval para destinos recém-adicionados não esperarem demais.
+        """
+        pending = [due for due in (self._next_due(self._urgent), self._next_due(self._heap)) if due is not None]
+        wait = min(self.min_interval, min(pending) - now) if pending else self.min_interval
+
+        tokens = self._available(now)
+        if tokens < 1:
+            # Sem orçamento não adianta acordar antes do próximo token
+            wait = max(wait, (1 - tokens) / self.max_probes_per_second)
+        return max(0.05, wait)
+
+    def get_stats(self) -> Dict:
+        """Distribuição dos intervalos e uso do orçamento"""
+        intervals = [s.interval for s in self.targets.values()]
+        planned = sum(1 / interval for interval in intervals)
+        return {
+            "targets": len(intervals),
+            "min_interval": round(min(intervals), 2) if intervals else None,
+            "max_interval": round(max(intervals), 2) if intervals else None,
+            "planned_probes_per_second": round(planned, 2),
+            "max_probes_per_second": self.max_probes_per_second,
+            "degraded_targets": sum(1 for i in intervals if i < self.base_interval),
+            "scheduled": self.scheduled,
+            "deferred": self.deferred,
+            "tightened": self.tightened,
+            "relaxed": self.relaxed
+        }
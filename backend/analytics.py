@@ -0,0 +1,218 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from history_store import STATUS_SUCCESS
+
+PERCENTILES = (50, 95, 99)
+
+
+class ColumnarHistory:
+    """Histórico de pings em colunas NumPy (destino, timestamp, latência, sucesso)"""
+
+    def __init__(self, target_names: List[str], target_codes, timestamps_ms, latencies, success):
+        self.target_names = target_names
+        self.target_codes = target_codes  # int32, índice em target_names
+        self.timestamps_ms = timestamps_ms  # int64
+        self.latencies = latencies  # float32
+        self.success = success  # bool
+
+    def __len__(self) -> int:
+        return len(self.timestamps_ms)
+
+    @classmethod
+    def from_dicts(cls, ping_history: List[Dict]) -> "ColumnarHistory":
+        """Converte uma lista no formato de ping_target"""
+        n = len(ping_history)
+        names: Dict[str, int] = {}
+        codes = np.fromiter((names.setdefault(p.get("target", "unknown"), len(names)) for p in ping_history),
+                            dtype=np.int32, count=n)
+        timestamps = np.fromiter((cls._parse_ms(p.get("timestamp")) for p in ping_history),
+                                 dtype=np.int64, count=n)
+        latencies = np.fromiter((p.get("latency", 0) or 0 for p in ping_history), dtype=np.float32, count=n)
+        success = np.fromiter((bool(p.get("success", False)) for p in ping_history), dtype=bool, count=n)
+        return cls(list(names), codes, timestamps, latencies, success)
+
+    @classmethod
+    def from_history_store(cls, store, since_ms: Optional[int] = None) -> "ColumnarHistory":
+        """Lê os buffers circulares do HistoryStore diretamente (sem criar dicts)
+
+        Cada buffer é copiado sob o lock do store por `_copy_ring`, cujas views e arrays
+        sobre os buffers deixam de existir quando ela retorna, ainda dentro do lock.
+        """
+        names, codes, timestamps, latencies, status = [], [], [], [], []
+        with store.lock:
+            for code, (target, ring) in enumerate(store.rings.items()):
+                names.append(target)
+                for ts, latency, st in _copy_ring(ring, since_ms):
+                    timestamps.append(ts)
+                    latencies.append(latency)
+                    status.append(st)
+                    codes.append(np.full(len(ts), code, dtype=np.int32))
+
+        if not timestamps:
+            empty = np.zeros(0)
+            return cls([], empty.astype(np.int32), empty.astype(np.int64), empty.astype(np.float32),
+                       empty.astype(bool))
+        return cls(
+            names,
+            np.concatenate(codes),
+            np.concatenate(timestamps),
+            np.concatenate(latencies),
+            (np.concatenate(status) & STATUS_SUCCESS).astype(bool)
+        )
+
+    @staticmethod
+    def _parse_ms(timestamp: Optional[str]) -> int:
+        try:
+            return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+        except (TypeError, ValueError):
+            return 0
+
+
+def _copy_ring(ring, since_ms: Optional[int]) -> List[Tuple]:
+    """Cópias (timestamps, latências, status) dos trechos de um buffer; nenhuma view sobrevive"""
+    copies = []
+    for ts_view, latency_view, status_view in ring.views():
+        ts = np.frombuffer(ts_view, dtype=np.int64)
+        mask = ts >= since_ms if since_ms is not None else slice(None)
+        copies.append((
+            np.array(ts[mask], copy=True),
+            np.array(np.frombuffer(latency_view, dtype=np.float32)[mask], copy=True),
+            np.array(np.frombuffer(status_view, dtype=np.uint8)[mask], copy=True)
+        ))
+        del ts, ts_view, latency_view, status_view
+    return copies
+
+
+def _group_percentiles(codes, values, groups: int) -> Dict[int, List[Optional[float]]]:
+    """Percentis por grupo com uma ordenação e interpolação vetorizada"""
+    # Uma única ordenação de chave composta (grupo * escala + valor), mais rápida que lexsort
+    scale = float(values.max()) + 1.0 if len(values) else 1.0
+    counts = np.bincount(codes, minlength=groups)
+    offsets = np.arange(groups, dtype=np.float64) * scale
+    sorted_values = np.sort(codes * scale + values.astype(np.float64)) - np.repeat(offsets, counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = {}
+    has_values = counts > 0
+    for p in PERCENTILES:
+        position = starts + (counts - 1).clip(min=0) * (p / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + counts - 1).clip(min=0)
+        lower = lower.clip(max=max(len(sorted_values) - 1, 0))
+        upper = upper.clip(max=max(len(sorted_values) - 1, 0))
+        if len(sorted_values):
+            value = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+        else:
+            value = np.zeros(groups)
+        result[p] = np.where(has_values, value, np.nan)
+    return result
+
+
+def compute_daily_stats(history: ColumnarHistory) -> Dict:
+    """Estatísticas diárias em passadas vetorizadas (mesmo formato de _calculate_daily_stats)"""
+    n = len(history)
+    if n == 0:
+        return {}
+
+    groups = len(history.target_names)
+    codes = history.target_codes
+    success = history.success
+    latencies = history.latencies
+
+    # Ordena por (destino, tempo) para jitter e rajadas de perda
+    order = np.lexsort((history.timestamps_ms, codes))
+    codes_sorted = codes[order]
+    success_sorted = success[order]
+    latency_sorted = latencies[order]
+
+    total = np.bincount(codes, minlength=groups)
+    successful = np.bincount(codes, weights=success, minlength=groups).astype(np.int64)
+    failed = total - successful
+
+    # Latência apenas de pings bem-sucedidos com valor > 0
+    valid = success & (latencies > 0)
+    valid_codes = codes[valid]
+    valid_latencies = latencies[valid]
+    latency_count = np.bincount(valid_codes, minlength=groups)
+    latency_sum = np.bincount(valid_codes, weights=valid_latencies, minlength=groups)
+    average = np.divide(latency_sum, latency_count, out=np.zeros(groups), where=latency_count > 0)
+    percentiles = _group_percentiles(valid_codes, valid_latencies, groups)
+
+    # Jitter: média da diferença absoluta entre latências consecutivas do mesmo destino
+    valid_sorted = success_sorted & (latency_sorted > 0)
+    jitter_codes = codes_sorted[valid_sorted]
+    jitter_values = latency_sorted[valid_sorted].astype(np.float64)
+    same_target = jitter_codes[1:] == jitter_codes[:-1]
+    diffs = np.abs(np.diff(jitter_values))[same_target]
+    diff_codes = jitter_codes[1:][same_target]
+    jitter_count = np.bincount(diff_codes, minlength=groups)
+    jitter = np.divide(np.bincount(diff_codes, weights=diffs, minlength=groups), jitter_count,
+                       out=np.zeros(groups), where=jitter_count > 0)
+
+    # Rajadas de perda: sequências de falhas consecutivas por destino
+    failure = ~success_sorted
+    boundary = np.ones(n, dtype=bool)
+    boundary[1:] = (codes_sorted[1:] != codes_sorted[:-1]) | (failure[1:] != failure[:-1])
+    run_starts = np.flatnonzero(boundary)
+    run_lengths = np.diff(np.append(run_starts, n))
+    failure_runs = failure[run_starts]
+    burst_codes = codes_sorted[run_starts][failure_runs]
+    burst_lengths = run_lengths[failure_runs]
+    burst_count = np.bincount(burst_codes, minlength=groups)
+    max_burst = np.zeros(groups, dtype=np.int64)
+    np.maximum.at(max_burst, burst_codes, burst_lengths)
+
+    # Histograma por hora local (amostras e falhas)
+    utc_offset = datetime.now().astimezone().utcoffset().total_seconds()
+    hours = ((history.timestamps_ms // 1000 + int(utc_offset)) // 3600) % 24
+    hourly = np.bincount(codes * 24 + hours, minlength=groups * 24).reshape(groups, 24)
+    hourly_failed = np.bincount(codes * 24 + hours, weights=~success, minlength=groups * 24).reshape(groups, 24)
+
+    def rounded(value) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), 2)
+
+    targets = {}
+    for i, name in enumerate(history.target_names):
+        targets[name] = {
+            "total": int(total[i]),
+            "successful": int(successful[i]),
+            "failed": int(failed[i]),
+            "success_rate": round(float(successful[i]) / int(total[i]) * 100, 2) if total[i] else 0,
+            "average_latency": round(float(average[i]), 2),
+            "p50_latency": rounded(percentiles[50][i]),
+            "p95_latency": rounded(percentiles[95][i]),
+            "p99_latency": rounded(percentiles[99][i]),
+            "jitter": round(float(jitter[i]), 2),
+            "loss_bursts": int(burst_count[i]),
+            "max_loss_burst": int(max_burst[i]),
+            "hourly": {
+                "pings": hourly[i].tolist(),
+                "failed": hourly_failed[i].astype(np.int64).tolist()
+            }
+        }
+
+    total_successful = int(successful.sum())
+    total_latency_count = int(latency_count.sum())
+    first = int(history.timestamps_ms.min())
+    last = int(history.timestamps_ms.max())
+    return {
+        "total_pings": n,
+        "successful_pings": total_successful,
+        "failed_pings": n - total_successful,
+        "success_rate": round(total_successful / n * 100, 2),
+        "average_latency": round(float(latency_sum.sum()) / total_latency_count, 2) if total_latency_count else 0,
+        "targets": targets,
+        "first_ping": datetime.fromtimestamp(first / 1000).isoformat() if first else "N/A",
+        "last_ping": datetime.fromtimestamp(last / 1000).isoformat() if last else "N/A"
+    }
+
+
+def calculate_daily_stats(ping_history: List[Dict]) -> Dict:
+    """Atalho: converte o histórico para colunas e calcula as estatísticas"""
+    return compute_daily_stats(ColumnarHistory.from_dicts(ping_history))
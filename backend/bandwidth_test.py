@@ -0,0 +1,339 @@
+import os
+import select
+import socket
+import struct
+import tempfile
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 5201
+MAGIC = b"NMBW"
+PROTO_TCP = 0
+PROTO_UDP = 1
+FLAG_REVERSE = 0x01
+
+# Cabeçalho de controle: magic, protocolo, flags, duração (ms)
+HEADER = struct.Struct("!4sBBI")
+# Totais devolvidos pelo servidor (TCP: bytes; UDP: bytes, pacotes, fora de ordem, jitter em µs)
+TCP_REPLY = struct.Struct("!Q")
+UDP_DONE = struct.Struct("!Q")  # pacotes enviados pelo cliente
+UDP_REPLY = struct.Struct("!QQQQ")
+UDP_PORT = struct.Struct("!H")
+# Início de cada datagrama UDP: sequência e instante de envio (ns)
+DATAGRAM = struct.Struct("!QQ")
+
+BUFFER_SIZE = 256 * 1024
+PAYLOAD_FILE_SIZE = 4 * 1024 * 1024
+MAX_BITRATE_MBPS = 10000
+
+
+def validate_port(port: int) -> int:
+    """Porta TCP/UDP de destino (1-65535); ValueError se fora da faixa"""
+    if not 0 < port <= 65535:
+        raise ValueError(f"Porta inválida: {port} (use 1-65535)")
+    return port
+
+
+def validate_bitrate(bitrate_mbps: float) -> float:
+    """Taxa alvo do teste UDP em Mbps; ValueError se não for positiva ou passar do limite"""
+    if not 0 < bitrate_mbps <= MAX_BITRATE_MBPS:
+        raise ValueError(f"Taxa inválida: {bitrate_mbps} Mbps (use 0 < taxa <= {MAX_BITRATE_MBPS})")
+    return bitrate_mbps
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("conexão encerrada")
+        data.extend(chunk)
+    return bytes(data)
+
+
+class PayloadSource:
+    """Arquivo temporário de dados aleatórios usado pelo sendfile (sem cópia para o espaço do usuário)"""
+
+    def __init__(self, size: int = PAYLOAD_FILE_SIZE):
+        self.size = size
+        self.file = tempfile.TemporaryFile()
+        self.file.write(os.urandom(size))
+        self.file.flush()
+
+    def send_until(self, sock: socket.socket, deadline: float, chunk: int = 1024 * 1024) -> int:
+        """Envia até o prazo com socket.sendfile (os.sendfile; send() onde não existir)"""
+        sent = 0
+        offset = 0
+        while time.monotonic() < deadline:
+            count = sock.sendfile(self.file, offset, min(chunk, self.size - offset))
+            if count == 0:
+                break
+            sent += count
+            offset = (offset + count) % self.size
+        return sent
+
+    def close(self):
+        self.file.close()
+
+
+def _drain(sock: socket.socket, buffer: memoryview, deadline: Optional[float] = None) -> int:
+    """Lê e descarta até EOF (ou até o prazo) reutilizando o mesmo buffer"""
+    received = 0
+    while deadline is None or time.monotonic() < deadline:
+        count = sock.recv_into(buffer)
+        if count == 0:
+            break
+        received += count
+    return received
+
+
+class BandwidthServer:
+    """Servidor mínimo de teste de vazão (TCP e UDP), no estilo do iperf"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = DEFAULT_PORT, max_duration: float = 60):
+        self.host = host
+        self.port = port
+        self.max_duration = max_duration
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+        self._payload: Optional[PayloadSource] = None
+        self.sessions = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Abre a porta de controle e aceita conexões numa thread"""
+        if self._thread:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(64)
+        sock.settimeout(1.0)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        self._payload = PayloadSource()
+        self._stop.clear()
+        self._thread = Thread(target=self._accept_loop, name="bandwidth-server", daemon=True)
+        self._thread.start()
+        logger.info(f"📶 Servidor de teste de vazão ouvindo em {self.host}:{self.port}")
+
+    def stop(self):
+        """Fecha a porta de controle"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._sock.close()
+        self._sock = None
+        self._payload.close()
+        self._payload = None
+        logger.info("📶 Servidor de teste de vazão parado")
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        """Atende um fluxo TCP ou uma sessão UDP"""
+        try:
+            conn.settimeout(self.max_duration + 10)
+            magic, proto, flags, duration_ms = HEADER.unpack(_recv_exact(conn, HEADER.size))
+            if magic != MAGIC:
+                return
+            self.sessions += 1
+            duration = min(duration_ms / 1000, self.max_duration)
+
+            if proto == PROTO_UDP:
+                self._handle_udp(conn)
+            elif flags & FLAG_REVERSE:
+                # Download do ponto de vista do cliente: o servidor envia
+                self._payload.send_until(conn, time.monotonic() + duration)
+            else:
+                received = _drain(conn, memoryview(bytearray(BUFFER_SIZE)))
+                conn.sendall(TCP_REPLY.pack(received))
+        except (OSError, ConnectionError, struct.error) as e:
+            logger.debug(f"Teste de vazão: {e}")
+        finally:
+            conn.close()
+
+    def _handle_udp(self, conn: socket.socket):
+        """Recebe datagramas numerados e mede perda, ordem e jitter (RFC 3550)"""
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        udp.bind((conn.getsockname()[0], 0))
+        udp.setblocking(False)
+        conn.sendall(UDP_PORT.pack(udp.getsockname()[1]))
+        conn.setblocking(False)
+
+        buffer = memoryview(bytearray(65536))
+        received_bytes = packets = out_of_order = 0
+        highest_seq = -1
+        jitter = 0.0
+        last_transit = None
+        sent_packets = None
+        done = bytearray()
+        deadline = time.monotonic() + self.max_duration + 10
+        try:
+            while True:
+                if time.monotonic() > deadline:
+                    return
+                ready, _, _ = select.select([udp, conn], [], [], 1.0)
+                if udp in ready:
+                    while True:
+                        try:
+                            count = udp.recv_into(buffer)
+                        except BlockingIOError:
+                            break
+                        if count < DATAGRAM.size:
+                            continue
+                        seq, sent_ns = DATAGRAM.unpack_from(buffer)
+                        received_bytes += count
+                        packets += 1
+                        if seq < highest_seq:
+                            out_of_order += 1
+                        highest_seq = max(highest_seq, seq)
+                        transit = time.perf_counter_ns() - sent_ns
+                        if last_transit is not None:
+                            jitter += (abs(transit - last_transit) - jitter) / 16
+                        last_transit = transit
+                if conn in ready:
+                    chunk = conn.recv(UDP_DONE.size - len(done))
+                    if not chunk:
+                        return
+                    done.extend(chunk)
+                    if len(done) == UDP_DONE.size:
+                        sent_packets = UDP_DONE.unpack(bytes(done))[0]
+                        # Janela curta para datagramas ainda em trânsito
+                        time.sleep(0.2)
+                        while True:
+                            try:
+                                count = udp.recv_into(buffer)
+                            except BlockingIOError:
+                                break
+                            if count >= DATAGRAM.size:
+                                received_bytes += count
+                                packets += 1
+                        break
+            conn.setblocking(True)
+            conn.sendall(UDP_REPLY.pack(received_bytes, packets, out_of_order, int(jitter / 1000)))
+            logger.debug(f"UDP: {packets}/{sent_packets} pacotes recebidos")
+        finally:
+            udp.close()
+
+
+def _tcp_stream(host: str, port: int, duration: float, reverse: bool,
+                payload: Optional[PayloadSource]) -> int:
+    """Um fluxo TCP; retorna bytes transferidos (contados pelo receptor)"""
+    with socket.create_connection((host, port), timeout=duration + 10) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(HEADER.pack(MAGIC, PROTO_TCP, FLAG_REVERSE if reverse else 0, int(duration * 1000)))
+        if reverse:
+            return _drain(sock, memoryview(bytearray(BUFFER_SIZE)))
+        payload.send_until(sock, time.monotonic() + duration)
+        sock.shutdown(socket.SHUT_WR)
+        return TCP_REPLY.unpack(_recv_exact(sock, TCP_REPLY.size))[0]
+
+
+def run_tcp_test(host: str, port: int = DEFAULT_PORT, streams: int = 4, duration: float = 5,
+                 reverse: bool = False) -> Dict:
+    """Teste TCP com fluxos paralelos; `reverse` mede download (servidor envia)"""
+    validate_port(port)
+    payload = None if reverse else PayloadSource()
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=streams) as executor:
+            futures = [executor.submit(_tcp_stream, host, port, duration, reverse, payload)
+                       for _ in range(streams)]
+            per_stream: List[int] = [future.result() for future in futures]
+    finally:
+        if payload:
+            payload.close()
+    elapsed = time.monotonic() - start
+
+    total = sum(per_stream)
+    return {
+        "target": host,
+        "protocol": "tcp",
+        "direction": "download" if reverse else "upload",
+        "streams": streams,
+        "duration": round(elapsed, 3),
+        "bytes": total,
+        "mbps": round(total * 8 / elapsed / 1_000_000, 2),
+        "per_stream_mbps": [round(b * 8 / elapsed / 1_000_000, 2) for b in per_stream]
+    }
+
+
+def run_udp_test(host: str, port: int = DEFAULT_PORT, duration: float = 5, bitrate_mbps: float = 100,
+                 size: int = 1200) -> Dict:
+    """Teste UDP a taxa fixa com perda, fora de ordem e jitter medidos no servidor"""
+    validate_port(port)
+    validate_bitrate(bitrate_mbps)
+    size = max(DATAGRAM.size, min(size, 65000))
+    with socket.create_connection((host, port), timeout=duration + 10) as conn:
+        conn.sendall(HEADER.pack(MAGIC, PROTO_UDP, 0, int(duration * 1000)))
+        udp_port = UDP_PORT.unpack(_recv_exact(conn, UDP_PORT.size))[0]
+
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.connect((host, udp_port))
+        datagram = bytearray(os.urandom(size))
+        view = memoryview(datagram)
+        interval_ns = max(1, int(size * 8 / (bitrate_mbps * 1_000_000) * 1e9))
+
+        sent = 0
+        start_ns = time.perf_counter_ns()
+        end_ns = start_ns + int(duration * 1e9)
+        try:
+            while True:
+                now = time.perf_counter_ns()
+                if now >= end_ns:
+                    break
+                # Envia o que estiver atrasado em relação à taxa alvo
+                due = (now - start_ns) // interval_ns + 1
+                while sent < due:
+                    DATAGRAM.pack_into(datagram, 0, sent, time.perf_counter_ns())
+                    try:
+                        udp.send(view)
+                    except (BlockingIOError, ConnectionRefusedError):
+                        pass
+                    sent += 1
+                delay = (start_ns + sent * interval_ns - time.perf_counter_ns()) / 1e9
+                if delay > 0.001:
+                    time.sleep(delay)
+        finally:
+            udp.close()
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+
+        conn.sendall(UDP_DONE.pack(sent))
+        received_bytes, packets, out_of_order, jitter_us = UDP_REPLY.unpack(_recv_exact(conn, UDP_REPLY.size))
+
+    return {
+        "target": host,
+        "protocol": "udp",
+        "direction": "upload",
+        "streams": 1,
+        "duration": round(elapsed, 3),
+        "bytes": received_bytes,
+        "mbps": round(received_bytes * 8 / elapsed / 1_000_000, 2),
+        "target_mbps": bitrate_mbps,
+        "packets_sent": sent,
+        "packets_received": packets,
+        "loss": round(1 - packets / sent, 4) if sent else 0,
+        "out_of_order": out_of_order,
+        "jitter_ms": round(jitter_us / 1000, 3)
+    }
@@ -0,0 +1,155 @@
+"""Benchmark: estatísticas diárias em Python puro x caminho colunar NumPy
+
+Uso: python benchmark_analytics.py [--sizes 100000 1000000 10000000] [--legacy-max 10000000]
+
+A implementação original recebe a lista de dicts; o caminho colunar lê os buffers do
+HistoryStore (como generate_daily_report faz) e calcula também percentis, jitter,
+rajadas de perda e histogramas por hora.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from analytics import ColumnarHistory, compute_daily_stats
+from history_store import HistoryStore, TargetRing, STATUS_SUCCESS
+
+
+def legacy_daily_stats(ping_history):
+    """Implementação original de ReportGenerator._calculate_daily_stats (referência)"""
+    if not ping_history:
+        return {}
+
+    total_pings = len(ping_history)
+    successful_pings = sum(1 for p in ping_history if p.get("success", False))
+    failed_pings = total_pings - successful_pings
+
+    successful_latencies = [p.get("latency", 0) for p in ping_history if p.get("success", False) and p.get("latency", 0) > 0]
+    average_latency = sum(successful_latencies) / len(successful_latencies) if successful_latencies else 0
+
+    targets = {}
+    for ping in ping_history:
+        target = ping.get("target", "unknown")
+        if target not in targets:
+            targets[target] = {"total": 0, "successful": 0, "failed": 0, "success_rate": 0,
+                               "average_latency": 0, "latencies": []}
+        targets[target]["total"] += 1
+        if ping.get("success", False):
+            targets[target]["successful"] += 1
+            if ping.get("latency", 0) > 0:
+                targets[target]["latencies"].append(ping.get("latency", 0))
+        else:
+            targets[target]["failed"] += 1
+
+    for target_data in targets.values():
+        if target_data["total"] > 0:
+            target_data["success_rate"] = round((target_data["successful"] / target_data["total"]) * 100, 2)
+        if target_data["latencies"]:
+            target_data["average_latency"] = round(sum(target_data["latencies"]) / len(target_data["latencies"]), 2)
+        del target_data["latencies"]
+
+    return {
+        "total_pings": total_pings,
+        "successful_pings": successful_pings,
+        "failed_pings": failed_pings,
+        "success_rate": round((successful_pings / total_pings) * 100, 2) if total_pings > 0 else 0,
+        "average_latency": round(average_latency, 2),
+        "targets": targets,
+        "first_ping": ping_history[0].get("timestamp", "N/A"),
+        "last_ping": ping_history[-1].get("timestamp", "N/A")
+    }
+
+
+def make_columns(size: int, targets: int, seed: int = 42) -> ColumnarHistory:
+    """Gera um dia sintético de amostras intercaladas entre os destinos"""
+    rng = np.random.default_rng(seed)
+    start_ms = int((datetime.now() - timedelta(days=1)).timestamp() * 1000)
+    codes = (np.arange(size) % targets).astype(np.int32)
+    timestamps = start_ms + np.arange(size, dtype=np.int64) * (86_400_000 // max(size, 1))
+    latencies = rng.lognormal(3, 0.5, size).astype(np.float32)
+    success = rng.random(size) > 0.02
+    latencies[~success] = 0
+    names = [f"10.0.{i // 256}.{i % 256}" for i in range(targets)]
+    return ColumnarHistory(names, codes, timestamps, latencies, success)
+
+
+def to_history_store(history: ColumnarHistory) -> HistoryStore:
+    """Preenche um HistoryStore com as mesmas amostras (como o monitor faria)"""
+    store = HistoryStore()
+    for code, name in enumerate(history.target_names):
+        mask = history.target_codes == code
+        ring = TargetRing(int(mask.sum()))
+        ring.timestamps.frombytes(history.timestamps_ms[mask].tobytes())
+        ring.latencies.frombytes(history.latencies[mask].tobytes())
+        ring.status.frombytes((history.success[mask] * STATUS_SUCCESS).astype(np.uint8).tobytes())
+        store.rings[name] = ring
+    return store
+
+
+def columnar_from_store(store: HistoryStore):
+    """Caminho usado por generate_daily_report: buffers -> colunas -> estatísticas"""
+    return compute_daily_stats(ColumnarHistory.from_history_store(store))
+
+
+def to_dicts(history: ColumnarHistory, chunk: int = 1_000_000):
+    """Converte para o formato de ping_target (entrada da implementação original)
+
+    Converte em blocos para não somar às listas de dicts as listas temporárias de tolist().
+    """
+    names = history.target_names
+    dicts = []
+    for start in range(0, len(history.timestamps_ms), chunk):
+        part = slice(start, start + chunk)
+        dicts.extend(
+            {
+                "target": names[code],
+                "success": ok,
+                "latency": round(latency, 2),
+                "timestamp": datetime.fromtimestamp(ts / 1000).isoformat(),
+                "error": None if ok else "Timeout ou host inacessível"
+            }
+            for code, ts, latency, ok in zip(history.target_codes[part].tolist(), history.timestamps_ms[part].tolist(),
+                                             history.latencies[part].tolist(), history.success[part].tolist())
+        )
+    return dicts
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--targets", type=int, default=200)
+    parser.add_argument("--legacy-max", type=int, default=10_000_000,
+                        help="maior tamanho para a implementação original (10^7 dicts usam ~4 GB de memória)")
+    args = parser.parse_args()
+
+    print(f"{'amostras':>12} {'original (s)':>14} {'colunar (s)':>12} {'speedup':>9}")
+    for size in args.sizes:
+        history = make_columns(size, args.targets)
+        store = to_history_store(history)
+        columnar_stats, columnar_time = timed(columnar_from_store, store)
+
+        legacy_time = None
+        if size <= args.legacy_max:
+            try:
+                dicts = to_dicts(history)
+                legacy_stats, legacy_time = timed(legacy_daily_stats, dicts)
+                assert legacy_stats["successful_pings"] == columnar_stats["successful_pings"]
+            except MemoryError:
+                print(f"⚠️ Memória insuficiente para {size:,} dicts: comparação com a original ignorada")
+            dicts = None
+
+        if legacy_time is not None:
+            print(f"{size:>12,} {legacy_time:>14.3f} {columnar_time:>12.3f} {legacy_time / columnar_time:>8.1f}x")
+        else:
+            print(f"{size:>12,} {'-':>14} {columnar_time:>12.3f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import json
+import os
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from threading import Lock, Timer
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+class ConfigStore:
+    """Configuração e destinos em um arquivo JSON gravado de forma atômica
+
+    As gravações são agrupadas: `schedule_save` marca o estado como alterado e grava uma
+    única vez após `delay` segundos, então um lote de alterações gera uma só escrita.
+    """
+
+    def __init__(self, path: Path, snapshot: Callable[[], Dict], delay: float = 1.0):
+        self.path = Path(path)
+        self.snapshot = snapshot  # monta o estado atual a gravar
+        self.delay = delay
+        self._lock = Lock()
+        self._timer: Optional[Timer] = None
+        self._dirty = False
+
+        # Estatísticas
+        self.saves = 0
+        self.last_save_ms = 0.0
+        self.last_load_ms = 0.0
+
+    def load(self) -> Optional[Dict]:
+        """Lê o estado salvo (None se não existir ou estiver ilegível)"""
+        if not self.path.exists():
+            return None
+        start = time.perf_counter()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Configuração salva ilegível, iniciando vazio: {e}")
+            return None
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            logger.warning(f"⚠️ Versão de configuração desconhecida em {self.path}")
+            return None
+        return data
+
+    def save(self):
+        """Grava o estado atual imediatamente (tmp + fsync + os.replace)"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._dirty = False
+            start = time.perf_counter()
+            data = {"version": STATE_VERSION, "saved_at": datetime.now().isoformat(), **self.snapshot()}
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+            self.saves += 1
+            self.last_save_ms = (time.perf_counter() - start) * 1000
+
+    def schedule_save(self):
+        """Agenda uma gravação agrupada"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = Timer(self.delay, self._save_scheduled)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _save_scheduled(self):
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar configuração: {e}")
+
+    def flush(self):
+        """Grava agora se houver alteração pendente"""
+        if self._dirty:
+            self._save_scheduled()
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do armazenamento"""
+        return {
+            "path": str(self.path),
+            "saves": self.saves,
+            "pending": self._dirty,
+            "last_save_ms": round(self.last_save_ms, 2),
+            "last_load_ms": round(self.last_load_ms, 2)
+        }
@@ -0,0 +1,330 @@
+import asyncio
+import os
+import re
+import random
+import socket
+import struct
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from stats_engine import RunningStats
+
+logger = logging.getLogger(__name__)
+
+HOSTNAME_PATTERN = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
+
+# Mensagens DNS (RFC 1035)
+DNS_HEADER = struct.Struct("!HHHHHH")
+DNS_RR = struct.Struct("!HHIH")
+TYPE_A = 1
+TYPE_CNAME = 5
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+
+def is_ipv4(value: str) -> bool:
+    """Verifica se o texto é um endereço IPv4 literal"""
+    try:
+        socket.inet_aton(value)
+        return value.count(".") == 3
+    except OSError:
+        return False
+
+
+def is_valid_hostname(name: str) -> bool:
+    """Validação sintática de hostname (sem resolver)"""
+    name = name[:-1] if name.endswith(".") else name
+    if not name or len(name) > 253:
+        return False
+    return all(HOSTNAME_PATTERN.match(label) for label in name.split("."))
+
+
+def read_nameservers(path: str = "/etc/resolv.conf") -> List[str]:
+    """Servidores DNS IPv4 configurados no sistema"""
+    servers = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver" and is_ipv4(parts[1]):
+                    servers.append(parts[1])
+    except OSError:
+        pass
+    return servers
+
+
+def read_hosts(path: str = "/etc/hosts") -> Dict[str, str]:
+    """Mapeamento nome -> IPv4 do arquivo hosts"""
+    hosts = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.split("#", 1)[0].split()
+                if len(parts) >= 2 and is_ipv4(parts[0]):
+                    for name in parts[1:]:
+                        hosts.setdefault(name.lower(), parts[0])
+    except OSError:
+        pass
+    return hosts
+
+
+def build_query(query_id: int, name: str) -> bytes:
+    """Consulta A recursiva para um nome"""
+    question = b"".join(bytes([len(label)]) + label.encode("ascii")
+                        for label in name.rstrip(".").split(".")) + b"\0"
+    return DNS_HEADER.pack(query_id, 0x0100, 1, 0, 0, 0) + question + struct.pack("!HH", TYPE_A, CLASS_IN)
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    """Posição após um nome (com ou sem compressão)"""
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+def parse_response(data: bytes, query_id: int) -> Tuple[int, Optional[str], Optional[int]]:
+    """Extrai (rcode, primeiro endereço A, menor TTL da cadeia) de uma resposta"""
+    response_id, flags, qdcount, ancount, _, _ = DNS_HEADER.unpack_from(data)
+    if response_id != query_id or not flags & 0x8000:
+        raise ValueError("resposta DNS não corresponde à consulta")
+    if flags & 0x0200:
+        raise ValueError("resposta DNS truncada")
+    rcode = flags & 0x000F
+
+    offset = DNS_HEADER.size
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+
+    address = None
+    ttl = None
+    for _ in range(ancount):
+        offset = _skip_name(data, offset)
+        rtype, rclass, rr_ttl, rdlength = DNS_RR.unpack_from(data, offset)
+        offset += DNS_RR.size
+        if rclass == CLASS_IN and rtype in (TYPE_A, TYPE_CNAME):
+            ttl = rr_ttl if ttl is None else min(ttl, rr_ttl)
+            if rtype == TYPE_A and rdlength == 4 and address is None:
+                address = socket.inet_ntoa(data[offset:offset + 4])
+        offset += rdlength
+    return rcode, address, ttl
+
+
+class DnsCache:
+    """Cache assíncrono de resolução de nomes com TTL, cache negativo e renovação antecipada"""
+
+    def __init__(self, default_ttl: float = 300, negative_ttl: float = 30, min_ttl: float = 5,
+                 max_ttl: float = 3600, refresh_ahead: float = 0.8, timeout: float = 2):
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.refresh_ahead = refresh_ahead  # fração do TTL após a qual renova em segundo plano
+        self.timeout = timeout
+
+        # {nome: (endereço ou None, resolvido em, expira em)}
+        self.entries: Dict[str, Tuple[Optional[str], float, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: set = set()
+        self._hosts: Dict[str, str] = {}
+        self._hosts_mtime = None
+        self.nameservers = read_nameservers()
+
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.latency = RunningStats()  # latência de resolução (ms), separada do RTT ICMP
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Endereço em cache, sem I/O (None se ausente, expirado ou negativo)"""
+        if is_ipv4(name):
+            return name
+        entry = self.entries.get(name.lower())
+        if entry and entry[2] > self._now():
+            return entry[0]
+        return None
+
+    def seed(self, name: str, address: str, ttl: Optional[float] = None):
+        """Pré-carrega um endereço conhecido (ex.: salvo na configuração)"""
+        now = self._now()
+        self.entries[name.lower()] = (address, now, now + (ttl or self.default_ttl))
+
+    def export(self, names) -> Dict[str, Dict]:
+        """Endereços válidos dos nomes, com expiração em tempo de parede, para salvar e usar em seed"""
+        now = self._now()
+        wall = time.time()
+        exported = {}
+        for name in names:
+            entry = self.entries.get(name.lower())
+            if entry and entry[0] is not None:
+                exported[name.lower()] = {"address": entry[0], "expires_at": round(wall + entry[2] - now, 1)}
+        return exported
+
+    def forget(self, name: str):
+        """Remove um nome do cache"""
+        self.entries.pop(name.lower(), None)
+
+    async def resolve(self, name: str) -> Optional[str]:
+        """Endereço IPv4 do nome; None se não resolver (resultado negativo também fica em cache)"""
+        if is_ipv4(name):
+            return name
+        key = name.lower()
+        now = self._now()
+        entry = self.entries.get(key)
+
+        if entry and entry[2] > now:
+            address, resolved_at, expires_at = entry
+            if address is None:
+                self.negative_hits += 1
+                return None
+            self.hits += 1
+            # Renova antes de expirar, sem atrasar quem consultou
+            if (now - resolved_at >= (expires_at - resolved_at) * self.refresh_ahead and
+                    key not in self._refreshing):
+                self._refreshing.add(key)
+                asyncio.ensure_future(self._background_refresh(key))
+            return address
+
+        self.misses += 1
+        return await self._resolve_shared(key)
+
+    async def _background_refresh(self, key: str):
+        try:
+            self.refreshes += 1
+            await self._resolve_shared(key)
+        finally:
+            self._refreshing.discard(key)
+
+    async def _resolve_shared(self, key: str) -> Optional[str]:
+        """Uma única resolução em andamento por nome, compartilhada entre as sondas"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._resolve_now(key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _resolve_now(self, key: str) -> Optional[str]:
+        """Resolve e grava no cache, medindo a latência da resolução"""
+        start = time.perf_counter()
+        address, ttl = None, None
+        try:
+            address, ttl = await self._query(key)
+        except Exception as e:
+            logger.debug(f"DNS {key}: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.latency.update(address is not None, elapsed_ms)
+
+        now = self._now()
+        if address is None:
+            self.failures += 1
+            previous = self.entries.get(key)
+            if previous and previous[0] is not None and ttl is None:
+                # Falha transitória: mantém o último endereço bom por mais um período curto
+                self.entries[key] = (previous[0], now, now + self.negative_ttl)
+                return previous[0]
+            self.entries[key] = (None, now, now + self.negative_ttl)
+            logger.warning(f"⚠️ Não foi possível resolver {key}")
+            return None
+
+        ttl = max(self.min_ttl, min(self.max_ttl, ttl if ttl is not None else self.default_ttl))
+        self.entries[key] = (address, now, now + ttl)
+        return address
+
+    async def _query(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        """Arquivo hosts, depois consulta DNS direta (com TTL), por fim getaddrinfo"""
+        hosts = self._load_hosts()
+        if key in hosts:
+            return hosts[key], self.default_ttl
+
+        not_found = False
+        if "." in key.rstrip(".") and self.nameservers:
+            for server in self.nameservers:
+                try:
+                    rcode, address, ttl = await self._udp_query(server, key)
+                except (OSError, ValueError, asyncio.TimeoutError, IndexError, struct.error):
+                    continue
+                if rcode == RCODE_NXDOMAIN or (rcode == 0 and address is None):
+                    # Nome inexistente ou sem registro A no DNS; search, mDNS (.local) e NSS ainda podem resolver
+                    not_found = True
+                    break
+                if rcode == 0:
+                    return address, ttl
+
+        # Nomes sem domínio (search), não encontrados no DNS, sem servidor configurado ou sem resposta
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(key, None, family=socket.AF_INET, type=socket.SOCK_DGRAM), self.timeout * 2
+            )
+        except (OSError, asyncio.TimeoutError):
+            if not_found:
+                # Negativo definitivo só depois do resolvedor do sistema também falhar
+                return None, self.negative_ttl
+            raise
+        if infos:
+            return infos[0][4][0], None
+        return None, self.negative_ttl if not_found else None
+
+    async def _udp_query(self, server: str, name: str) -> Tuple[int, Optional[str], Optional[int]]:
+        """Consulta A por UDP a um servidor"""
+        loop = asyncio.get_running_loop()
+        query_id = random.getrandbits(16)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, (server, 53))
+            await loop.sock_sendall(sock, build_query(query_id, name))
+            deadline = loop.time() + self.timeout
+            while True:
+                data = await asyncio.wait_for(loop.sock_recv(sock, 4096), max(0, deadline - loop.time()))
+                try:
+                    return parse_response(data, query_id)
+                except ValueError as e:
+                    if "truncada" in str(e):
+                        raise
+                    # Pacote de outra consulta: continua aguardando
+        finally:
+            sock.close()
+
+    def _load_hosts(self) -> Dict[str, str]:
+        """Arquivo hosts, relido apenas quando muda"""
+        try:
+            mtime = os.stat("/etc/hosts").st_mtime
+        except OSError:
+            return self._hosts
+        if mtime != self._hosts_mtime:
+            self._hosts = read_hosts()
+            self._hosts_mtime = mtime
+        return self._hosts
+
+    def get_stats(self) -> Dict:
+        """Retorna ocupação, acertos e latência de resolução"""
+        now = self._now()
+        latency = self.latency.to_dict()
+        return {
+            "entries": len(self.entries),
+            "negative_entries": sum(1 for address, _, expires in self.entries.values()
+                                    if address is None and expires > now),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "resolution_ms": {
+                "count": latency["total"],
+                "average": latency["average_latency"],
+                "max": latency["max_latency"],
+                "p95": latency["p95"]
+            }
+        }
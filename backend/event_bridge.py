@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventBridge:
+    """Ponte thread-safe entre a thread de monitoramento e o event loop do servidor"""
+
+    def __init__(self, consumer: Callable[[Dict], Awaitable[None]], max_queue: int = 1000):
+        self.consumer = consumer
+        self.max_queue = max_queue
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        """Vincula a ponte ao event loop atual e inicia o consumidor"""
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._consume())
+        logger.info(f"🌉 Ponte de eventos iniciada (fila máx. {self.max_queue})")
+
+    async def stop(self):
+        """Para o consumidor"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.loop = None
+
+    def publish(self, data: Dict):
+        """Publica um evento a partir de qualquer thread (nunca bloqueia)"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self.dropped += 1
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, data)
+        except RuntimeError:
+            # Loop encerrado entre a verificação e o agendamento
+            self.dropped += 1
+
+    def _enqueue(self, data: Dict):
+        """Enfileira no event loop; com a fila cheia descarta o evento mais antigo"""
+        self.published += 1
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"⚠️ Fila de eventos cheia, {self.dropped} eventos descartados")
+        self.queue.put_nowait(data)
+
+    async def _consume(self):
+        """Entrega os eventos ao consumidor, um por vez"""
+        while True:
+            data = await self.queue.get()
+            try:
+                await self.consumer(data)
+                self.delivered += 1
+            except Exception as e:
+                logger.error(f"❌ Erro ao entregar evento: {e}")
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas da ponte"""
+        return {
+            "queue_size": self.queue.qsize() if self.queue else 0,
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
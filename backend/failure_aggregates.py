@@ -0,0 +1,162 @@
+import json
+import os
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("CRÍTICA", "ALTA", "MÉDIA", "BAIXA")
+
+
+def empty_aggregate(date_str: str) -> Dict:
+    """Agregado de um dia sem falhas"""
+    return {
+        "date": date_str,
+        "failures": 0,
+        "packets_lost": 0,
+        "downtime_seconds": 0,
+        "severity_count": {severity: 0 for severity in SEVERITIES},
+        "targets": {}  # {destino: {failures, downtime_seconds}}
+    }
+
+
+def apply_failure(aggregate: Dict, failure: Dict):
+    """Soma uma falha ao agregado do dia"""
+    downtime = failure.get("duration_seconds", 0) or 0
+    aggregate["failures"] += 1
+    aggregate["packets_lost"] += failure.get("packets_lost", 0) or 0
+    aggregate["downtime_seconds"] += downtime
+
+    severity = failure.get("severity", "BAIXA")
+    if severity in aggregate["severity_count"]:
+        aggregate["severity_count"][severity] += 1
+
+    target = aggregate["targets"].setdefault(failure.get("target", "unknown"),
+                                             {"failures": 0, "downtime_seconds": 0})
+    target["failures"] += 1
+    target["downtime_seconds"] += downtime
+
+
+class FailureAggregates:
+    """Agregados diários de falhas: gravados uma vez quando o dia fecha, dia atual ao vivo"""
+
+    def __init__(self, path: Path, loader: Callable[[str], Iterable[Dict]]):
+        self.path = Path(path)
+        self.loader = loader  # lê as falhas de um dia (log ou arquivo mensal)
+        self._lock = Lock()
+        self.closed: Dict[str, Dict] = {}
+        self.live: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.closed = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Agregados de falhas ilegíveis, serão recalculados: {e}")
+            self.closed = {}
+
+    def _save(self):
+        """Grava os dias fechados de forma atômica"""
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.closed, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def build(self, date_str: str) -> Dict:
+        """Calcula o agregado de um dia lendo o log uma única vez"""
+        aggregate = empty_aggregate(date_str)
+        for failure in self.loader(date_str):
+            apply_failure(aggregate, failure)
+        return aggregate
+
+    def start_day(self, date_str: str):
+        """Carrega o agregado ao vivo de um dia (antes de novas falhas serem gravadas)"""
+        aggregate = self.build(date_str)
+        with self._lock:
+            self.live.setdefault(date_str, aggregate)
+
+    def add(self, failure: Dict, date_str: str):
+        """Atualiza o agregado ao vivo com uma falha recém-gravada"""
+        with self._lock:
+            aggregate = self.live.get(date_str)
+            if aggregate is None:
+                aggregate = self.live[date_str] = empty_aggregate(date_str)
+            apply_failure(aggregate, failure)
+
+    def _close_days(self, today: str) -> bool:
+        """Move para os fechados os dias ao vivo anteriores a hoje"""
+        changed = False
+        for date_str in [d for d in self.live if d < today]:
+            self.closed[date_str] = self.live.pop(date_str)
+            changed = True
+        return changed
+
+    def days(self, dates: List[str], today: Optional[str] = None) -> List[Dict]:
+        """Agregados de vários dias; dias ainda não agregados são calculados uma vez"""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            changed = self._close_days(today)
+            missing = [d for d in dates if d not in self.closed and d not in self.live]
+
+        built = {date_str: self.build(date_str) for date_str in missing}
+
+        with self._lock:
+            for date_str, aggregate in built.items():
+                if date_str < today:
+                    self.closed[date_str] = aggregate
+                    changed = True
+                else:
+                    self.live.setdefault(date_str, aggregate)
+            result = [self.closed.get(d) or self.live[d] for d in dates]
+            if changed:
+                try:
+                    self._save()
+                except OSError as e:
+                    logger.error(f"❌ Erro ao gravar agregados de falhas: {e}")
+            return result
+
+    def forget(self, before: str):
+        """Descarta agregados de dias anteriores a uma data (YYYY-MM-DD)"""
+        with self._lock:
+            stale = [d for d in self.closed if d < before]
+            for date_str in stale:
+                del self.closed[date_str]
+            if stale:
+                self._save()
+
+    def summary(self, days: int, today: Optional[datetime] = None) -> Dict:
+        """Resumo dos últimos N dias somando os agregados diários"""
+        today = today or datetime.now()
+        dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+        summary = {
+            "period_days": days,
+            "total_failures": 0,
+            "targets_affected": set(),
+            "severity_count": {severity: 0 for severity in SEVERITIES},
+            "daily_breakdown": {},
+            "packets_lost": 0,
+            "total_downtime_seconds": 0,
+            "mttr_seconds": 0
+        }
+        for aggregate in self.days(dates, dates[0]):
+            summary["daily_breakdown"][aggregate["date"]] = aggregate["failures"]
+            summary["total_failures"] += aggregate["failures"]
+            summary["packets_lost"] += aggregate["packets_lost"]
+            summary["total_downtime_seconds"] += aggregate["downtime_seconds"]
+            summary["targets_affected"].update(aggregate["targets"])
+            for severity, count in aggregate["severity_count"].items():
+                summary["severity_count"][severity] = summary["severity_count"].get(severity, 0) + count
+
+        if summary["total_failures"]:
+            summary["mttr_seconds"] = round(summary["total_downtime_seconds"] / summary["total_failures"], 1)
+        summary["targets_affected"] = list(summary["targets_affected"])
+        return summary
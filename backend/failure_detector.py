@@ -0,0 +1,163 @@
+import logging
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TargetFailure:
+    """Estado de falha em andamento de um destino"""
+
+    __slots__ = ("start_time", "last_seen", "packets_lost", "consecutive_failures", "confirmed",
+                 "folded_into", "affected")
+
+    def __init__(self, timestamp: str):
+        self.start_time = timestamp
+        self.last_seen = timestamp
+        self.packets_lost = 0
+        self.consecutive_failures = 0
+        self.confirmed = False
+        self.folded_into: Optional[str] = None  # ancestral cuja queda explica esta falha
+        self.affected: Set[str] = set()  # dependentes que caíram junto
+
+    def to_dict(self) -> Dict:
+        return {
+            "start_time": self.start_time,
+            "last_seen": self.last_seen,
+            "packets_lost": self.packets_lost,
+            "consecutive_failures": self.consecutive_failures,
+            "confirmed": self.confirmed,
+            "folded_into": self.folded_into,
+            "affected_targets": sorted(self.affected)
+        }
+
+
+class FailureDetector:
+    """Máquina de estados de falha compartilhada: O(1) por resultado, eventos para os consumidores
+
+    Eventos:
+      failure_started  - o destino atingiu `threshold` falhas consecutivas
+      failure_resolved - um destino com falha confirmada voltou a responder
+
+    Com `parent_of` (destino -> destino pai), a falha de um dependente enquanto um ancestral
+    está em falha é incorporada à queda do ancestral em vez de gerar alerta próprio.
+    """
+
+    def __init__(self, threshold: int = 3, parent_of: Optional[Callable[[str], Optional[str]]] = None):
+        self.threshold = threshold
+        self.parent_of = parent_of
+        self.failures: Dict[str, TargetFailure] = {}
+        self._lock = Lock()  # o monitor grava; a API lê de outra thread
+        self.sinks: List[Callable[[Dict], None]] = []
+
+        # Estatísticas
+        self.processed = 0
+        self.started = 0
+        self.resolved = 0
+        self.folded = 0
+
+    def register_sink(self, sink: Callable[[Dict], None]):
+        """Registra um consumidor dos eventos de falha"""
+        self.sinks.append(sink)
+
+    def process(self, result: Dict) -> Optional[Dict]:
+        """Atualiza o estado do destino com um resultado; retorna o evento gerado, se houver"""
+        with self._lock:
+            return self._process(result)
+
+    def _process(self, result: Dict) -> Optional[Dict]:
+        self.processed += 1
+        target = result["target"]
+        timestamp = result.get("timestamp")
+        state = self.failures.get(target)
+
+        if not result["success"]:
+            if state is None:
+                state = self.failures[target] = TargetFailure(timestamp)
+            state.packets_lost += 1
+            state.consecutive_failures += 1
+            state.last_seen = timestamp
+            if not state.confirmed and state.consecutive_failures >= self.threshold:
+                upstream = self.failing_ancestor(target, confirmed_only=False)
+                if upstream:
+                    # Queda explicada pelo ancestral: sem alerta próprio
+                    if state.folded_into != upstream:
+                        state.folded_into = upstream
+                        self.failures[upstream].affected.add(target)
+                        self.folded += 1
+                        logger.debug(f"🔗 Falha de {target} incorporada à queda de {upstream}")
+                    return None
+                state.folded_into = None
+                state.confirmed = True
+                self.started += 1
+                logger.error(f"🚨 LIMITE DE FALHAS ATINGIDO: {target} ({state.consecutive_failures} falhas)")
+                return {"type": "failure_started", "target": target, **state.to_dict()}
+            return None
+
+        if state is None:
+            return None
+        del self.failures[target]
+        if not state.confirmed:
+            # Perda isolada abaixo do limite: não é uma queda
+            return None
+        self.resolved += 1
+        logger.info(f"✅ Falha resolvida: {target}")
+        return {"type": "failure_resolved", "target": target, "end_time": timestamp, **state.to_dict()}
+
+    def failing_ancestor(self, target: str, confirmed_only: bool = True) -> Optional[str]:
+        """Ancestral mais alto do destino que está em falha (a causa raiz), se houver"""
+        if self.parent_of is None:
+            return None
+        root = None
+        seen = {target}
+        parent = self.parent_of(target)
+        while parent and parent not in seen:
+            seen.add(parent)
+            state = self.failures.get(parent)
+            if state and (state.confirmed or not confirmed_only):
+                root = parent
+            parent = self.parent_of(parent)
+        return root
+
+    def process_many(self, results: List[Dict]) -> List[Dict]:
+        """Processa os resultados de um ciclo e entrega os eventos aos consumidores"""
+        events = []
+        with self._lock:
+            for result in results:
+                event = self._process(result)
+                if event:
+                    events.append(event)
+
+        for event in events:
+            for sink in self.sinks:
+                try:
+                    sink(event)
+                except Exception as e:
+                    logger.error(f"❌ Erro no consumidor de eventos de falha: {e}")
+        return events
+
+    def remove(self, target: str):
+        """Descarta o estado de um destino removido"""
+        with self._lock:
+            self.failures.pop(target, None)
+
+    def active(self, confirmed_only: bool = False) -> Dict[str, Dict]:
+        """Falhas em andamento por destino"""
+        with self._lock:
+            return {target: state.to_dict() for target, state in self.failures.items()
+                    if state.confirmed or not confirmed_only}
+
+    def get_stats(self) -> Dict:
+        """Retorna contadores do detector"""
+        with self._lock:
+            confirmed = sum(1 for state in self.failures.values() if state.confirmed)
+            pending = len(self.failures) - confirmed
+        return {
+            "threshold": self.threshold,
+            "processed": self.processed,
+            "active": confirmed,
+            "pending": pending,
+            "started": self.started,
+            "resolved": self.resolved,
+            "folded": self.folded
+        }
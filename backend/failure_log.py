@@ -0,0 +1,112 @@
+import json
+import os
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FailureLog:
+    """Log de falhas append-only em JSONL (um arquivo por dia), com fsync em lote"""
+
+    def __init__(self, reports_dir: Path, fsync_batch: int = 32, fsync_interval: float = 1.0):
+        self.reports_dir = Path(reports_dir)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._lock = Lock()
+        self._file = None
+        self._date: Optional[str] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def path_for(self, date_str: str) -> Path:
+        """Arquivo JSONL de um dia"""
+        return self.reports_dir / f"failures_{date_str}.jsonl"
+
+    def legacy_path_for(self, date_str: str) -> Path:
+        """Arquivo JSON do formato antigo (lista completa reescrita a cada falha)"""
+        return self.reports_dir / f"failures_{date_str}.json"
+
+    def _rotate(self, date_str: str):
+        """Fecha o arquivo do dia anterior (com fsync) e abre o do dia atual"""
+        if self._file:
+            self._sync()
+            self._file.close()
+        self._file = open(self.path_for(date_str), "a", encoding="utf-8")
+        self._date = date_str
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, entry: Dict, date_str: Optional[str] = None):
+        """Acrescenta uma falha em O(1); cada linha é gravada com uma única escrita"""
+        date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            if date_str != self._date:
+                self._rotate(date_str)
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_batch or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def append_many(self, entries, date_str: str):
+        """Acrescenta várias falhas com uma única escrita e um único fsync"""
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+
+        with self._lock:
+            if date_str != self._date:
+                self._rotate(date_str)
+            self._file.write(data)
+            self._sync()
+
+    def flush(self):
+        """Força o fsync das linhas pendentes"""
+        with self._lock:
+            if self._file and self._unsynced:
+                self._sync()
+
+    def close(self):
+        """Fecha o arquivo atual"""
+        with self._lock:
+            if self._file:
+                self._sync()
+                self._file.close()
+                self._file = None
+                self._date = None
+
+    def iter_day(self, date_str: str) -> Iterator[Dict]:
+        """Lê as falhas de um dia em streaming (inclui o formato antigo, se existir)"""
+        legacy = self.legacy_path_for(date_str)
+        if legacy.exists():
+            try:
+                with open(legacy, "r", encoding="utf-8") as f:
+                    yield from json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Erro ao ler {legacy.name}: {e}")
+
+        path = self.path_for(date_str)
+        if not path.exists():
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # Linha incompleta (gravação interrompida)
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"⚠️ Linha inválida ignorada em {path.name}")
@@ -0,0 +1,239 @@
+import os
+import select
+import socket
+import struct
+import subprocess
+import platform
+import time
+import logging
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROC_ROUTE = "/proc/net/route"
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+
+# rtnetlink (linux/rtnetlink.h)
+NETLINK_ROUTE = 0
+RTMGRP_IPV4_ROUTE = 0x40
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+NLMSG_HEADER = struct.Struct("=IHHII")
+
+
+def read_proc_route(path: str = PROC_ROUTE) -> Optional[str]:
+    """Gateway da rota padrão IPv4 de menor métrica em /proc/net/route"""
+    best = None
+    try:
+        with open(path, "r") as f:
+            next(f, None)  # cabeçalho
+            for line in f:
+                fields = line.split()
+                if len(fields) < 7 or fields[1] != "00000000":
+                    continue
+                flags = int(fields[3], 16)
+                if not (flags & RTF_UP and flags & RTF_GATEWAY):
+                    continue
+                metric = int(fields[6])
+                if best is None or metric < best[0]:
+                    best = (metric, socket.inet_ntoa(struct.pack("<I", int(fields[2], 16))))
+    except (OSError, ValueError):
+        return None
+    return best[1] if best else None
+
+
+def read_route_command() -> Optional[str]:
+    """Último recurso: consulta a rota padrão com `ip route`/`route print` (fork)"""
+    try:
+        if platform.system() == "Windows":
+            result = subprocess.run(["route", "print", "0.0.0.0"], capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                for line in result.stdout.split('\n'):
+                    if '0.0.0.0' in line and 'Gateway' not in line:
+                        parts = line.split()
+                        if len(parts) >= 3 and _is_ipv4(parts[2]):
+                            return parts[2]
+        else:
+            result = subprocess.run(["ip", "route", "show", "default"], capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                for line in result.stdout.strip().split('\n'):
+                    if 'default via' in line:
+                        parts = line.split()
+                        if len(parts) >= 3 and _is_ipv4(parts[2]):
+                            return parts[2]
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return None
+
+
+def _is_ipv4(ip: str) -> bool:
+    try:
+        socket.inet_aton(ip)
+        return True
+    except OSError:
+        return False
+
+
+class GatewayResolver:
+    """Gateway padrão mantido em memória e atualizado por eventos de rota (rtnetlink)
+
+    Linux com netlink: custo zero em regime, atualização imediata a cada mudança de rota.
+    Linux sem netlink: releitura de /proc/net/route (sem fork) a cada `proc_ttl` segundos.
+    Outros sistemas: `ip route`/`route print` com cache de `command_ttl` segundos.
+    """
+
+    def __init__(self, fallback: str = "192.168.1.1", proc_ttl: float = 5, command_ttl: float = 300):
+        self.fallback = fallback
+        self.proc_ttl = proc_ttl
+        self.command_ttl = command_ttl
+        self.callbacks: List[Callable[[Optional[str], str], None]] = []
+
+        self.gateway: Optional[str] = None
+        self.source: Optional[str] = None  # "netlink", "proc", "command" ou "fallback"
+        self._resolved_at = 0.0
+        self._lock = Lock()
+
+        self._sock: Optional[socket.socket] = None
+        self._watcher: Optional[Thread] = None
+        self._stop = Event()
+
+        # Estatísticas
+        self.refreshes = 0
+        self.changes = 0
+        self.route_events = 0
+
+    def register_callback(self, callback: Callable[[Optional[str], str], None]):
+        """Registra callback chamado com (gateway anterior, novo gateway) em cada mudança"""
+        self.callbacks.append(callback)
+
+    def get(self) -> str:
+        """Gateway atual (sem I/O em regime quando o netlink está ativo)"""
+        if self.gateway is None:
+            self.refresh()
+        elif self._watcher is None:
+            ttl = self.proc_ttl if self.source == "proc" else self.command_ttl
+            if time.monotonic() - self._resolved_at >= ttl:
+                self.refresh()
+        return self.gateway
+
+    def refresh(self) -> str:
+        """Relê a rota padrão e notifica se o gateway mudou"""
+        gateway = read_proc_route()
+        source = "netlink" if self._watcher is not None else "proc"
+        if gateway is None and not os.path.exists(PROC_ROUTE):
+            gateway = read_route_command()
+            source = "command"
+        if gateway is None:
+            gateway = self.fallback
+            source = "fallback"
+
+        with self._lock:
+            previous = self.gateway
+            self.gateway = gateway
+            self.source = source
+            self._resolved_at = time.monotonic()
+            self.refreshes += 1
+
+        if gateway != previous:
+            if source == "fallback":
+                logger.warning(f"⚠️ Gateway não detectado, usando fallback: {gateway}")
+            else:
+                logger.info(f"🏠 Gateway detectado: {gateway} ({source})")
+            if previous is not None:
+                self.changes += 1
+                for callback in self.callbacks:
+                    try:
+                        callback(previous, gateway)
+                    except Exception as e:
+                        logger.error(f"❌ Erro no callback de gateway: {e}")
+        return gateway
+
+    # === Eventos de rota (rtnetlink) ===
+
+    def start(self) -> bool:
+        """Assina eventos de rota IPv4; retorna False se o netlink não estiver disponível"""
+        if self._watcher is not None:
+            return True
+        if not hasattr(socket, "AF_NETLINK"):
+            self.refresh()
+            return False
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_IPV4_ROUTE))
+        except OSError as e:
+            logger.warning(f"⚠️ rtnetlink indisponível ({e}), relendo /proc/net/route periodicamente")
+            self.refresh()
+            return False
+
+        self._sock = sock
+        self._stop.clear()
+        self._watcher = Thread(target=self._watch_loop, name="gateway-watcher", daemon=True)
+        self._watcher.start()
+        # Leitura inicial depois da assinatura, para não perder mudanças no intervalo
+        self.refresh()
+        logger.info("👀 Gateway observado via rtnetlink")
+        return True
+
+    def stop(self):
+        """Encerra a assinatura de eventos"""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=5)
+        self._watcher = None
+        self._sock.close()
+        self._sock = None
+
+    def _route_changed(self, data: bytes) -> bool:
+        """Verifica se o lote de mensagens netlink contém mudanças de rota"""
+        offset = 0
+        while offset + NLMSG_HEADER.size <= len(data):
+            length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+            if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+                return True
+            if length < NLMSG_HEADER.size:
+                break
+            offset += (length + 3) & ~3
+        return False
+
+    def _watch_loop(self):
+        """Relê a rota padrão apenas quando o kernel anuncia mudança de rota"""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._sock], [], [], 1.0)
+            if not ready:
+                continue
+
+            changed = False
+            try:
+                # Drena as mensagens pendentes e faz uma única releitura
+                while True:
+                    data = self._sock.recv(65536, socket.MSG_DONTWAIT)
+                    if not data:
+                        break
+                    changed = changed or self._route_changed(data)
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                # ENOBUFS: eventos perdidos, relê de qualquer forma
+                logger.debug(f"Netlink: {e}")
+                changed = True
+
+            if changed:
+                self.route_events += 1
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"❌ Erro ao atualizar gateway: {e}")
+
+    def get_stats(self) -> Dict:
+        """Retorna o gateway atual e a origem da informação"""
+        return {
+            "gateway": self.gateway,
+            "source": self.source,
+            "watching": self._watcher is not None,
+            "refreshes": self.refreshes,
+            "changes": self.changes,
+            "route_events": self.route_events
+        }
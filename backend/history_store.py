@@ -0,0 +1,192 @@
+import heapq
+import time
+from array import array
+from itertools import islice
+from threading import Lock
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Bits do campo de status
+STATUS_SUCCESS = 0x01
+STATUS_ERROR = 0x02  # falha com erro (não apenas timeout)
+# Bits superiores: perda da rajada quantizada em 0..15 (0 também para sonda única)
+LOSS_SHIFT = 4
+LOSS_LEVELS = 15
+
+# Bytes por amostra: int64 + float32 + uint8
+SAMPLE_BYTES = 8 + 4 + 1
+
+
+class TargetRing:
+    """Buffer circular de amostras de um destino em arrays tipados"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.timestamps = array("q")  # epoch em milissegundos
+        self.latencies = array("f")  # ms
+        self.status = array("B")  # bitfield STATUS_*
+        self.head = 0  # posição da amostra mais antiga quando cheio
+        self.success_count = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, timestamp_ms: int, latency: float, status: int):
+        """Adiciona uma amostra em O(1), sobrescrevendo a mais antiga quando cheio"""
+        if len(self.timestamps) < self.capacity:
+            self.timestamps.append(timestamp_ms)
+            self.latencies.append(latency)
+            self.status.append(status)
+        else:
+            i = self.head
+            if self.status[i] & STATUS_SUCCESS:
+                self.success_count -= 1
+            self.timestamps[i] = timestamp_ms
+            self.latencies[i] = latency
+            self.status[i] = status
+            self.head = (i + 1) % self.capacity
+
+        if status & STATUS_SUCCESS:
+            self.success_count += 1
+
+    def views(self) -> List[Tuple[memoryview, memoryview, memoryview]]:
+        """Segmentos (timestamps, latências, status) em ordem cronológica, sem cópia"""
+        ts, lat, st = memoryview(self.timestamps), memoryview(self.latencies), memoryview(self.status)
+        if self.head == 0:
+            return [(ts, lat, st)]
+        h = self.head
+        return [(ts[h:], lat[h:], st[h:]), (ts[:h], lat[:h], st[:h])]
+
+    def iter_samples(self, since_ms: Optional[int] = None) -> Iterator[Tuple[int, float, int]]:
+        """Itera (timestamp_ms, latência, status) em ordem cronológica"""
+        for ts, lat, st in self.views():
+            for i in range(len(ts)):
+                if since_ms is None or ts[i] >= since_ms:
+                    yield ts[i], lat[i], st[i]
+
+    def iter_recent(self, since_ms: Optional[int] = None) -> Iterator[Tuple[int, float, int]]:
+        """Itera da amostra mais recente para a mais antiga, parando em since_ms"""
+        for ts, lat, st in reversed(self.views()):
+            for i in range(len(ts) - 1, -1, -1):
+                if since_ms is not None and ts[i] < since_ms:
+                    return
+                yield ts[i], lat[i], st[i]
+
+    def resize(self, capacity: int):
+        """Altera a capacidade mantendo as amostras mais recentes"""
+        samples = list(self.iter_samples())[-max(1, capacity):]
+        self.__init__(capacity)
+        for sample in samples:
+            self.append(*sample)
+
+
+class HistoryStore:
+    """Histórico de pings compacto, com um buffer circular por destino
+
+    Leitores de outras threads devem segurar `lock` enquanto usam views() dos buffers:
+    um array exportando buffer não pode crescer e a gravação seguinte falharia.
+    """
+
+    def __init__(self, capacity: int = 17280):
+        self.default_capacity = capacity  # 1 dia a cada 5 s
+        self.capacities: Dict[str, int] = {}
+        self.rings: Dict[str, TargetRing] = {}
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return sum(len(ring) for ring in list(self.rings.values()))
+
+    def set_capacity(self, target: str, capacity: int):
+        """Define a capacidade do histórico de um destino"""
+        with self.lock:
+            self.capacities[target] = capacity
+            if target in self.rings:
+                self.rings[target].resize(capacity)
+
+    def append(self, result: Dict):
+        """Adiciona um resultado no formato de ping_target"""
+        target = result["target"]
+        try:
+            timestamp_ms = int(datetime.fromisoformat(result["timestamp"]).timestamp() * 1000)
+        except (KeyError, TypeError, ValueError):
+            timestamp_ms = int(time.time() * 1000)
+
+        status = 0
+        if result["success"]:
+            status |= STATUS_SUCCESS
+        elif result.get("error") and result["error"] != "Timeout ou host inacessível":
+            status |= STATUS_ERROR
+        if "loss" in result:
+            status |= int(round(result["loss"] * LOSS_LEVELS)) << LOSS_SHIFT
+
+        with self.lock:
+            ring = self.rings.get(target)
+            if ring is None:
+                ring = TargetRing(self.capacities.get(target, self.default_capacity))
+                self.rings[target] = ring
+            ring.append(timestamp_ms, result.get("latency", 0) or 0, status)
+
+    def remove(self, target: str):
+        """Descarta o histórico de um destino"""
+        with self.lock:
+            self.rings.pop(target, None)
+            self.capacities.pop(target, None)
+
+    def success_count(self) -> int:
+        """Total de amostras bem-sucedidas guardadas"""
+        return sum(ring.success_count for ring in list(self.rings.values()))
+
+    def memory_bytes(self) -> int:
+        """Memória aproximada ocupada pelas amostras"""
+        return len(self) * SAMPLE_BYTES
+
+    @staticmethod
+    def _to_dict(target: str, timestamp_ms: int, latency: float, status: int) -> Dict:
+        """Converte uma amostra para o formato de ping_target"""
+        success = bool(status & STATUS_SUCCESS)
+        if success:
+            error = None
+        elif status & STATUS_ERROR:
+            error = "Erro no ping"
+        else:
+            error = "Timeout ou host inacessível"
+        sample = {
+            "target": target,
+            "success": success,
+            "latency": round(latency, 2),
+            "timestamp": datetime.fromtimestamp(timestamp_ms / 1000).isoformat(),
+            "error": error
+        }
+        if status >> LOSS_SHIFT:
+            sample["loss"] = round((status >> LOSS_SHIFT) / LOSS_LEVELS, 3)
+        return sample
+
+    def _tagged(self, target: str, since_ms: Optional[int],
+                recent_first: bool = False) -> Iterator[Tuple[int, str, float, int]]:
+        """Amostras de um destino com o nome incluído (para intercalar por timestamp)"""
+        ring = self.rings[target]
+        samples = ring.iter_recent(since_ms) if recent_first else ring.iter_samples(since_ms)
+        for ts, lat, st in samples:
+            yield ts, target, lat, st
+
+    def to_dicts(self, target: Optional[str] = None, since_ms: Optional[int] = None,
+                 limit: Optional[int] = None) -> List[Dict]:
+        """Histórico em ordem cronológica (de um destino ou de todos)"""
+        with self.lock:
+            targets = [target] if target is not None else list(self.rings)
+            targets = [t for t in targets if t in self.rings]
+            if limit is not None:
+                # Intercala de trás para frente e para após `limit` amostras (sem percorrer o resto)
+                streams = [self._tagged(t, since_ms, recent_first=True) for t in targets]
+                merged = heapq.merge(*streams, reverse=True)
+                samples = list(islice(merged, max(0, limit)))
+                samples.reverse()
+                # Geradores interrompidos seguram views dos buffers: fecha antes de liberar o lock
+                merged.close()
+                for stream in streams:
+                    stream.close()
+                del merged, streams
+            else:
+                streams = [self._tagged(t, since_ms) for t in targets]
+                samples = list(heapq.merge(*streams))
+        return [self._to_dict(t, ts, lat, st) for ts, t, lat, st in samples]
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+ICMP_HEADER = struct.Struct("!BBHHH")
+PAYLOAD = b"networkteste".ljust(56, b"\x00")
+
+
+def _checksum(data: bytes) -> int:
+    """Checksum da internet (RFC 1071)"""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class IcmpEngine:
+    """Motor ICMP assíncrono com um único socket compartilhado por todos os destinos"""
+
+    def __init__(self):
+        self.sock: Optional[socket.socket] = None
+        self.kind: Optional[str] = None  # "dgram" (sem privilégios) ou "raw"
+        self.ident = 0
+        self._seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # {sequência: (endereço, futuro, instante de envio em ns)}
+        self._pending: Dict[int, Tuple[str, asyncio.Future, int]] = {}
+
+        # Estatísticas
+        self.sent = 0
+        self.received = 0
+        self.unmatched = 0
+
+    def open(self):
+        """Abre o socket ICMP (tenta SOCK_DGRAM primeiro, depois SOCK_RAW)"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            sock.bind(("0.0.0.0", 0))
+            # Em sockets de ping o kernel usa a porta local como identificador
+            self.ident = sock.getsockname()[1]
+            self.kind = "dgram"
+        except OSError:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.ident = os.getpid() & 0xFFFF
+            self.kind = "raw"
+
+        sock.setblocking(False)
+        self.sock = sock
+        logger.info(f"📡 Motor ICMP aberto (socket {self.kind}, id={self.ident})")
+
+    async def start(self):
+        """Abre o socket e registra o leitor no event loop atual"""
+        if self.sock is None:
+            self.open()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    def close(self):
+        """Fecha o socket e cancela pings pendentes"""
+        if self.sock is None:
+            return
+        if self._loop:
+            try:
+                self._loop.remove_reader(self.sock.fileno())
+            except Exception:
+                pass
+        for _, future, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        self.sock.close()
+        self.sock = None
+        self._loop = None
+        logger.info("📡 Motor ICMP fechado")
+
+    def _next_seq(self) -> int:
+        """Próximo número de sequência livre"""
+        for _ in range(0x10000):
+            self._seq = (self._seq + 1) & 0xFFFF
+            if self._seq not in self._pending:
+                return self._seq
+        raise RuntimeError("Sem números de sequência ICMP livres")
+
+    async def _resolve(self, target: str) -> str:
+        """Resolve o destino para um endereço IPv4"""
+        try:
+            socket.inet_aton(target)
+            return target
+        except OSError:
+            pass
+        infos = await self._loop.getaddrinfo(target, None, family=socket.AF_INET)
+        return infos[0][4][0]
+
+    def _send_echo(self, address: str) -> Tuple[int, asyncio.Future]:
+        """Envia um echo request e registra o futuro que receberá a latência"""
+        seq = self._next_seq()
+        header = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, self.ident, seq)
+        checksum = _checksum(header + PAYLOAD)
+        packet = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, self.ident, seq) + PAYLOAD
+
+        future = self._loop.create_future()
+        self._pending[seq] = (address, future, time.perf_counter_ns())
+        try:
+            self.sock.sendto(packet, (address, 0))
+        except OSError:
+            self._pending.pop(seq, None)
+            raise
+        self.sent += 1
+        return seq, future
+
+    async def ping(self, target: str, timeout: float = 3) -> Optional[float]:
+        """Envia um echo request e retorna a latência em ms (None em caso de timeout)"""
+        if self.sock is None:
+            raise RuntimeError("Motor ICMP não iniciado")
+
+        address = await self._resolve(target)
+        seq, future = self._send_echo(address)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._pending.pop(seq, None)
+
+    async def ping_burst(self, target: str, count: int, spacing: float,
+                         timeout: float = 3) -> List[Optional[float]]:
+        """Envia `count` echos espaçados em uma única corrotina; latências em ms (None = perdido)"""
+        if self.sock is None:
+            raise RuntimeError("Motor ICMP não iniciado")
+
+        address = await self._resolve(target)
+        sent: List[Tuple[int, asyncio.Future, float]] = []
+        try:
+            for i in range(count):
+                if i:
+                    await asyncio.sleep(spacing)
+                seq, future = self._send_echo(address)
+                sent.append((seq, future, self._loop.time() + timeout))
+
+            # Cada echo tem o seu próprio prazo, contado a partir do envio
+            latencies: List[Optional[float]] = []
+            for _, future, deadline in sent:
+                remaining = deadline - self._loop.time()
+                if future.done() or remaining > 0:
+                    try:
+                        latencies.append(await asyncio.wait_for(future, max(0, remaining)))
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                latencies.append(None)
+            return latencies
+        finally:
+            for seq, _, _ in sent:
+                self._pending.pop(seq, None)
+
+    def _on_readable(self):
+        """Lê todas as respostas disponíveis e resolve os pings correspondentes"""
+        while True:
+            try:
+                data, (address, _) = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug(f"📡 Erro ao ler socket ICMP: {e}")
+                return
+
+            received_ns = time.perf_counter_ns()
+
+            # Sockets raw recebem o cabeçalho IP junto
+            if self.kind == "raw":
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < ICMP_HEADER.size:
+                continue
+
+            icmp_type, _, _, ident, seq = ICMP_HEADER.unpack_from(data)
+            if icmp_type != ICMP_ECHO_REPLY or ident != self.ident:
+                continue
+
+            pending = self._pending.get(seq)
+            if pending is None or pending[0] != address:
+                self.unmatched += 1
+                continue
+
+            _, future, sent_ns = pending
+            if not future.done():
+                self.received += 1
+                future.set_result((received_ns - sent_ns) / 1_000_000)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do motor"""
+        return {
+            "socket": self.kind,
+            "sent": self.sent,
+            "received": self.received,
+            "unmatched": self.unmatched,
+            "pending": len(self._pending)
+        }
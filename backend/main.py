@@ -3,11 +3,12 @@ import json
 import os
 import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from email.utils import formatdate
+from typing import Dict, Optional
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -19,11 +20,18 @@ logger = logging.getLogger(__name__)
 # Importa módulos locais
 from network_monitor import NetworkMonitor
 from report_generator import ReportGenerator
+from event_bridge import EventBridge
+from websocket_hub import WebSocketHub
+from timeseries_store import TimeSeriesStore
+from report_http import report_file_response, report_entries_response, file_validators, is_not_modified
+from target_registry import BulkRowParser, normalize_row
 
 # Variáveis globais
 network_monitor = None
 report_generator = None
-websocket_connections: List[WebSocket] = []
+event_bridge = None
+timeseries_store = None
+websocket_hub = WebSocketHub()
 
 # Credenciais de autenticação (em produção, usar variáveis de ambiente)
 VALID_CREDENTIALS = {
@@ -37,26 +45,43 @@ def verify_credentials(username: str, password: str) -> bool:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
-    global network_monitor, report_generator
+    global network_monitor, report_generator, event_bridge, timeseries_store
     
     try:
         print("🚀 Iniciando servidor Network Monitor...")
         
+        # Inicializa monitor de rede (o histórico dele alimenta o relatório diário)
+        network_monitor = NetworkMonitor()
+        restored = network_monitor.load_state()
+        print(f"✅ {restored} destinos restaurados da configuração salva")
+        
         # Inicializa gerador de relatórios
-        report_generator = ReportGenerator()
+        report_generator = ReportGenerator(history_store=network_monitor.ping_history)
         print("✅ Gerador de relatórios inicializado")
         
-        # Inicializa monitor de rede
-        network_monitor = NetworkMonitor()
+        # Compacta relatórios antigos nos arquivos mensais
+        await asyncio.to_thread(report_generator.cleanup_old_reports)
+        
+        # Inicializa armazenamento de séries temporais
+        timeseries_store = TimeSeriesStore()
+        timeseries_store.start()
+        print("✅ Armazenamento de séries temporais inicializado")
+        
+        # Resultados de cada ciclo vão para o armazenamento e para os relatórios
+        network_monitor.register_result_sink(timeseries_store.append_many)
+        network_monitor.register_result_sink(report_generator.process_results)
         
-        # Registra callback para WebSocket
-        def websocket_callback(data):
-            if websocket_connections:
-                asyncio.create_task(broadcast_to_websockets(data))
+        # Ponte entre a thread de monitoramento e o event loop do servidor
+        event_bridge = EventBridge(broadcast_to_websockets)
+        await event_bridge.start()
         
-        network_monitor.register_callback(websocket_callback)
+        # Registra callback para WebSocket (chamado pela thread de monitoramento)
+        network_monitor.register_callback(event_bridge.publish)
         print("✅ Callback WebSocket registrado")
         
+        # Eventos do detector de falhas geram os relatórios automáticos
+        network_monitor.register_failure_sink(handle_failure_event)
+        
         # Inicia monitoramento
         network_monitor.start_monitoring()
         print("=== INICIANDO MONITORAMENTO ===")
@@ -70,6 +95,12 @@ async def lifespan(app: FastAPI):
         # Cleanup
         if network_monitor:
             network_monitor.stop_monitoring()
+        if event_bridge:
+            await event_bridge.stop()
+        if timeseries_store:
+            timeseries_store.stop()
+        if report_generator:
+            report_generator.close()
         print("🛑 Servidor finalizado")
 
 # Cria aplicação FastAPI
@@ -89,25 +120,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def handle_failure_event(event: Dict):
+    """Gera o relatório de uma queda encerrada e avisa os clientes"""
+    report = report_generator.handle_failure_event(event)
+    if report and event_bridge:
+        event_bridge.publish({"type": "failure_report", "data": report})
+
 async def broadcast_to_websockets(data):
     """Envia dados para todos os WebSockets conectados"""
-    if not websocket_connections:
-        return
-    
-    message = json.dumps(data)
-    disconnected = []
-    
-    for websocket in websocket_connections:
-        try:
-            await websocket.send_text(message)
-        except Exception as e:
-            print(f"❌ Erro ao enviar para WebSocket: {e}")
-            disconnected.append(websocket)
-    
-    # Remove conexões desconectadas
-    for ws in disconnected:
-        if ws in websocket_connections:
-            websocket_connections.remove(ws)
+    # Cada cliente tem fila e tarefa de escrita próprias; aqui apenas enfileira
+    websocket_hub.broadcast(data)
 
 # === ROTAS DE AUTENTICAÇÃO ===
 
@@ -165,9 +187,112 @@ async def get_status():
         logger.error(f"Erro ao obter status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/stats")
+async def get_stats():
+    """Retorna estatísticas do monitor e da transmissão em tempo real"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        return {
+            "monitor": network_monitor.get_stats(),
+            "websocket": {
+                **websocket_hub.get_stats(),
+                "events": event_bridge.get_stats() if event_bridge else None
+            },
+            "storage": timeseries_store.get_stats() if timeseries_store else None,
+            "report_writer": report_generator.get_writer_stats() if report_generator else None,
+            "report_archive": report_generator.archive.get_stats() if report_generator else None
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter estatísticas: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats/targets")
+async def get_target_stats(target: Optional[str] = None):
+    """Retorna estatísticas por destino (latência, perda, percentis)"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        return network_monitor.get_target_stats(target)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter estatísticas por destino: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/history/{target}")
+async def get_history(target: str, hours: float = 24, resolution: str = "auto"):
+    """Retorna o histórico persistido de um destino (rollups para períodos longos)"""
+    try:
+        if not timeseries_store:
+            raise HTTPException(status_code=503, detail="Armazenamento não inicializado")
+        
+        if resolution not in ("auto", "raw", "1m", "1h", "1d"):
+            raise HTTPException(status_code=400, detail="Resolução inválida")
+        
+        end = time.time()
+        start = end - max(0.0, hours) * 3600
+        
+        # Consulta ao SQLite fora do event loop
+        return await asyncio.to_thread(timeseries_store.query, target, start, end, resolution)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter histórico: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/config")
+async def get_config():
+    """Retorna as configurações do monitor"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        return network_monitor.get_config()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter configurações: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/api/config")
+async def update_config(request: Request):
+    """Atualiza e salva as configurações do monitor (ping_interval, failure_threshold, ...)"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        data = await request.json()
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=400, detail="Esperado um objeto JSON")
+        
+        allowed = network_monitor.get_config()
+        unknown = [key for key in data if key not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Configurações desconhecidas: {', '.join(unknown)}")
+        
+        network_monitor.update_config(**data)
+        return {"success": True, "config": network_monitor.get_config()}
+        
+    except HTTPException:
+        raise
+    except (json.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except Exception as e:
+        logger.error(f"Erro ao atualizar configurações: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/targets")
-async def get_targets():
-    """Retorna todos os destinos configurados"""
+async def get_targets(name: Optional[str] = None, tag: Optional[str] = None, enabled: Optional[bool] = None):
+    """Retorna todos os destinos configurados (personalizados filtráveis por nome, tag e estado)"""
     try:
         if not network_monitor:
             raise HTTPException(status_code=503, detail="Monitor não inicializado")
@@ -177,9 +302,11 @@ async def get_targets():
                 "google_dns": "8.8.8.8",
                 "gateway": network_monitor.get_gateway_ip()
             },
-            "custom_targets": network_monitor.get_custom_targets()
+            "custom_targets": network_monitor.get_custom_targets(name=name, tag=tag, enabled=enabled)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao obter destinos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -195,6 +322,8 @@ async def add_custom_target(request: Request):
         ip = data.get("ip", "").strip()
         name = data.get("name", "").strip()
         enabled = data.get("enabled", True)
+        parent = data.get("parent")
+        tags = data.get("tags")
         
         if not ip:
             raise HTTPException(status_code=400, detail="IP é obrigatório")
@@ -203,17 +332,22 @@ async def add_custom_target(request: Request):
             name = f"Destino {ip}"
         
         # Adiciona destino
-        success = network_monitor.add_custom_target(ip, name, enabled)
+        success = network_monitor.add_custom_target(ip, name, enabled, parent, tags)
         
         if success:
+            unresolved = await network_monitor.unresolved_targets([ip])
             return {
                 "success": True,
-                "message": "Destino adicionado com sucesso",
-                "target": {"ip": ip, "name": name, "enabled": enabled}
+                "message": f"Destino adicionado, mas {ip} não foi resolvido" if unresolved
+                           else "Destino adicionado com sucesso",
+                "resolved": not unresolved,
+                "target": network_monitor.get_custom_target(ip)
             }
         else:
             raise HTTPException(status_code=400, detail="Erro ao adicionar destino")
             
+    except HTTPException:
+        raise
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Dados JSON inválidos")
     except Exception as e:
@@ -231,6 +365,8 @@ async def update_custom_target(target_ip: str, request: Request):
         new_ip = data.get("ip", "").strip()
         name = data.get("name", "").strip()
         enabled = data.get("enabled", True)
+        parent = data.get("parent")
+        tags = data.get("tags")
         
         if not new_ip:
             raise HTTPException(status_code=400, detail="IP é obrigatório")
@@ -239,17 +375,22 @@ async def update_custom_target(target_ip: str, request: Request):
             name = f"Destino {new_ip}"
         
         # Atualiza destino
-        success = network_monitor.update_custom_target(target_ip, new_ip, name, enabled)
+        success = network_monitor.update_custom_target(target_ip, new_ip, name, enabled, parent, tags)
         
         if success:
+            unresolved = await network_monitor.unresolved_targets([new_ip]) if new_ip != target_ip else []
             return {
                 "success": True,
-                "message": "Destino atualizado com sucesso",
-                "target": {"ip": new_ip, "name": name, "enabled": enabled}
+                "message": f"Destino atualizado, mas {new_ip} não foi resolvido" if unresolved
+                           else "Destino atualizado com sucesso",
+                "resolved": not unresolved,
+                "target": network_monitor.get_custom_target(new_ip)
             }
         else:
             raise HTTPException(status_code=404, detail="Destino não encontrado")
             
+    except HTTPException:
+        raise
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Dados JSON inválidos")
     except Exception as e:
@@ -277,9 +418,184 @@ async def remove_custom_target(target_ip: str):
         logger.error(f"Erro ao remover destino: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def read_bulk_rows(request: Request):
+    """Lê as linhas de um lote: CSV e NDJSON em streaming, JSON (lista ou {"targets": [...]}) inteiro"""
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type or "ndjson" in content_type or "jsonl" in content_type:
+        parser = BulkRowParser("csv" if "csv" in content_type else "ndjson")
+        rows = []
+        async for chunk in request.stream():
+            rows.extend(parser.feed(chunk))
+        rows.extend(parser.close())
+        return rows, parser.errors
+    
+    data = await request.json()
+    if isinstance(data, dict):
+        data = data.get("targets", data.get("ips", []))
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Esperada uma lista de destinos")
+    rows, errors = [], []
+    for index, row in enumerate(data):
+        if isinstance(row, dict):
+            rows.append(normalize_row(row))
+        elif isinstance(row, str) and row.strip():
+            rows.append({"ip": row.strip()})
+        else:
+            errors.append({"line": index + 1, "error": "entrada inválida"})
+    return rows, errors
+
+@app.post("/api/targets/bulk")
+async def add_custom_targets_bulk(request: Request):
+    """Importa destinos em lote (CSV, NDJSON ou JSON) com um único evento targets_changed"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        rows, parse_errors = await read_bulk_rows(request)
+        result = network_monitor.add_custom_targets(rows)
+        
+        return {
+            "success": True,
+            "added": len(result["added"]),
+            "unresolved": await network_monitor.unresolved_targets(result["added"]),
+            "rejected": len(result["errors"]) + len(parse_errors),
+            "errors": parse_errors + result["errors"]
+        }
+        
+    except HTTPException:
+        raise
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except Exception as e:
+        logger.error(f"Erro ao importar destinos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/api/targets/bulk")
+async def update_custom_targets_bulk(request: Request):
+    """Atualiza destinos em lote; cada linha traz `ip` e os campos a alterar (`new_ip` renomeia)"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        rows, parse_errors = await read_bulk_rows(request)
+        result = network_monitor.update_custom_targets(rows)
+        
+        return {
+            "success": True,
+            "updated": len(result["updated"]),
+            "unresolved": await network_monitor.unresolved_targets(result["renamed"]),
+            "rejected": len(result["errors"]) + len(parse_errors),
+            "errors": parse_errors + result["errors"]
+        }
+        
+    except HTTPException:
+        raise
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except Exception as e:
+        logger.error(f"Erro ao atualizar destinos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/api/targets/bulk")
+async def remove_custom_targets_bulk(request: Request, tag: Optional[str] = None):
+    """Remove em lote os destinos listados no corpo ou todos os marcados com `tag`"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        if tag is not None:
+            ips, parse_errors = list(network_monitor.get_custom_targets(tag=tag)), []
+        else:
+            rows, parse_errors = await read_bulk_rows(request)
+            ips = [row["ip"] for row in rows if row.get("ip")]
+        result = network_monitor.remove_custom_targets(ips)
+        
+        return {
+            "success": True,
+            "removed": len(result["removed"]),
+            "rejected": len(result["errors"]) + len(parse_errors),
+            "errors": parse_errors + result["errors"]
+        }
+        
+    except HTTPException:
+        raise
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except Exception as e:
+        logger.error(f"Erro ao remover destinos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/bandwidth/test")
+async def run_bandwidth_test(request: Request):
+    """Executa um teste de vazão TCP/UDP contra um destino personalizado"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        data = await request.json()
+        target = data.get("target", "").strip()
+        if not target:
+            raise HTTPException(status_code=400, detail="Destino é obrigatório")
+        
+        protocol = data.get("protocol", "tcp")
+        if protocol not in ("tcp", "udp"):
+            raise HTTPException(status_code=400, detail="Protocolo deve ser tcp ou udp")
+        
+        # O teste bloqueia por toda a duração: roda fora do event loop
+        return await asyncio.to_thread(
+            network_monitor.run_bandwidth_test,
+            target,
+            protocol,
+            int(data.get("port", 5201)),
+            int(data.get("streams", 4)),
+            float(data.get("duration", 5)),
+            bool(data.get("reverse", False)),
+            float(data.get("bitrate_mbps", 100))
+        )
+        
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=502, detail=f"Falha no teste de vazão: {e}")
+    except Exception as e:
+        logger.error(f"Erro no teste de vazão: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/bandwidth/server")
+async def set_bandwidth_server(request: Request):
+    """Liga ou desliga o servidor local de teste de vazão"""
+    try:
+        if not network_monitor:
+            raise HTTPException(status_code=503, detail="Monitor não inicializado")
+        
+        data = await request.json()
+        if data.get("enabled", True):
+            port = network_monitor.start_bandwidth_server(int(data.get("port", 5201)))
+            return {"success": True, "enabled": True, "port": port}
+        
+        network_monitor.stop_bandwidth_server()
+        return {"success": True, "enabled": False}
+        
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Dados JSON inválidos")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=409, detail=f"Não foi possível abrir a porta: {e}")
+    except Exception as e:
+        logger.error(f"Erro no servidor de vazão: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/reports")
-async def get_reports():
-    """Retorna relatórios disponíveis"""
+async def get_reports(page: int = 1, page_size: int = 50, type: Optional[str] = None,
+                      date_from: Optional[str] = None, date_to: Optional[str] = None):
+    """Retorna relatórios disponíveis (paginados, com filtros de tipo e data)"""
     try:
         if not report_generator:
             raise HTTPException(status_code=503, detail="Gerador de relatórios não inicializado")
@@ -289,15 +605,26 @@ async def get_reports():
         if network_monitor:
             active_failures = network_monitor.get_active_failures()
         
-        # Obtém lista de relatórios
-        reports_list = report_generator.list_reports()
+        # Obtém página de relatórios do catálogo
+        page = max(1, page)
+        page_size = max(1, min(500, page_size))
+        reports_page = report_generator.list_reports_page(
+            report_type=type,
+            date_from=date_from,
+            date_to=date_to,
+            offset=(page - 1) * page_size,
+            limit=page_size
+        )
         
         # Calcula resumo
-        summary = report_generator.get_summary()
+        summary = report_generator.get_failure_summary()
         
         return {
             "active_failures": active_failures,
-            "reports": reports_list,
+            "reports": reports_page["reports"],
+            "total": reports_page["total"],
+            "page": page,
+            "page_size": page_size,
             "summary": summary
         }
         
@@ -312,7 +639,10 @@ async def generate_report():
         if not report_generator:
             raise HTTPException(status_code=503, detail="Gerador de relatórios não inicializado")
         
-        filename = report_generator.generate_manual_report()
+        report_file = await asyncio.to_thread(report_generator.generate_daily_report)
+        if report_file is None:
+            raise HTTPException(status_code=500, detail="Erro ao gerar relatório")
+        filename = report_file.name
         
         return {
             "success": True,
@@ -320,24 +650,74 @@ async def generate_report():
             "filename": filename
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao gerar relatório: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/reports/{filename}")
-async def get_report_content(filename: str):
-    """Retorna conteúdo de um relatório específico"""
+@app.get("/api/reports/summary")
+async def get_failure_summaries(days: Optional[int] = None):
+    """Resumo de falhas nas janelas de 7/30/90/365 dias (ou em uma janela específica)"""
     try:
         if not report_generator:
             raise HTTPException(status_code=503, detail="Gerador de relatórios não inicializado")
         
-        content = report_generator.get_report_content(filename)
+        if days is not None:
+            return await asyncio.to_thread(report_generator.get_failure_summary, max(1, min(3650, days)))
+        return await asyncio.to_thread(report_generator.get_failure_summaries)
         
-        if content:
-            return content
-        else:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter resumo de falhas: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/reports/{filename}")
+async def get_report_content(filename: str, request: Request, offset: Optional[int] = None,
+                             limit: Optional[int] = None):
+    """Retorna conteúdo de um relatório específico (streaming do disco, ETag/304 e Range)"""
+    try:
+        if not report_generator:
+            raise HTTPException(status_code=503, detail="Gerador de relatórios não inicializado")
+        
+        file_path = report_generator.resolve_report_path(filename)
+        if not file_path:
+            # Relatório antigo: descomprime só o membro do arquivo mensal
+            entry = report_generator.archive.entry(filename)
+            if not entry:
+                raise HTTPException(status_code=404, detail="Relatório não encontrado")
+            etag = f'"{int(entry["mtime"] * 1e9):x}-{entry["size"]:x}"'
+            last_modified = formatdate(entry["mtime"], usegmt=True)
+            if is_not_modified(request, etag, entry["mtime"]):
+                return Response(status_code=304, headers={"ETag": etag, "Last-Modified": last_modified})
+            content = await asyncio.to_thread(report_generator.get_report_content, filename)
+            if content is None:
+                raise HTTPException(status_code=404, detail="Relatório não encontrado")
+            if offset is not None or limit is not None:
+                return report_entries_response(content, etag, last_modified, offset or 0, limit)
+            return JSONResponse(content, headers={"ETag": etag, "Last-Modified": last_modified})
+        
+        if file_path.suffix == ".jsonl":
+            # Garante que falhas ainda na fila de gravação estejam no arquivo
+            await asyncio.to_thread(report_generator.writer.flush)
+        
+        if offset is None and limit is None:
+            return report_file_response(file_path, request)
+        
+        # Paginação sobre as entradas, usando o cache de relatórios interpretados
+        stat = file_path.stat()
+        etag, last_modified = file_validators(stat)
+        if is_not_modified(request, etag, stat.st_mtime):
+            return Response(status_code=304, headers={"ETag": etag, "Last-Modified": last_modified})
+        
+        content = await asyncio.to_thread(report_generator.get_report_content, filename)
+        if content is None:
             raise HTTPException(status_code=404, detail="Relatório não encontrado")
+        return report_entries_response(content, etag, last_modified, offset or 0, limit)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao obter conteúdo do relatório: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -348,9 +728,9 @@ async def get_report_content(filename: str):
 async def websocket_endpoint(websocket: WebSocket):
     """Endpoint WebSocket para comunicação em tempo real"""
     await websocket.accept()
-    websocket_connections.append(websocket)
+    client = await websocket_hub.connect(websocket)
     
-    print(f"✅ WebSocket conectado. Total: {len(websocket_connections)}")
+    print(f"✅ WebSocket conectado. Total: {len(websocket_hub)}")
     
     try:
         # Envia destinos iniciais
@@ -361,7 +741,16 @@ async def websocket_endpoint(websocket: WebSocket):
                     "custom_targets": network_monitor.get_custom_targets()
                 }
             }
-            await websocket.send_text(json.dumps(initial_data))
+            client.send(initial_data)
+            
+            # Estado atual de todos os destinos (base para frames delta)
+            client.send({
+                "type": "cycle_results",
+                "data": {
+                    "delta": False,
+                    "results": network_monitor.get_last_results()
+                }
+            })
         
         # Mantém conexão ativa
         while True:
@@ -371,7 +760,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 data = json.loads(message)
                 
                 if data.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    client.send({"type": "pong"})
                     
             except WebSocketDisconnect:
                 break
@@ -384,9 +773,8 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(f"❌ Erro na conexão WebSocket: {e}")
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
-        print(f"❌ WebSocket desconectado. Total: {len(websocket_connections)}")
+        await websocket_hub.disconnect(websocket)
+        print(f"❌ WebSocket desconectado. Total: {len(websocket_hub)}")
 
 # === ROTAS ESTÁTICAS ===
 
@@ -0,0 +1,193 @@
+import os
+import time
+import logging
+from threading import Event, Lock, Thread
+from typing import Dict, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+PROC_NET_DEV = "/proc/net/dev"
+
+
+class ProcNetDevReader:
+    """Lê contadores de bytes por interface de /proc/net/dev com um descritor aberto"""
+
+    def __init__(self, path: str = PROC_NET_DEV):
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> Dict[str, Tuple[int, int]]:
+        """{interface: (bytes recebidos, bytes enviados)}"""
+        data = os.pread(self.fd, 65536, 0)
+        counters = {}
+        for line in data.split(b"\n")[2:]:
+            name, sep, rest = line.partition(b":")
+            if not sep:
+                continue
+            fields = rest.split()
+            counters[name.strip().decode()] = (int(fields[0]), int(fields[8]))
+        return counters
+
+    def close(self):
+        os.close(self.fd)
+
+
+def read_psutil_counters() -> Dict[str, Tuple[int, int]]:
+    """Fallback portátil: contadores por interface via psutil"""
+    return {name: (io.bytes_recv, io.bytes_sent)
+            for name, io in psutil.net_io_counters(pernic=True).items()}
+
+
+class NicRate:
+    """Taxas de uma interface: instantânea, EWMA e pico retido (bits/s)"""
+
+    def __init__(self, alpha: float, peak_hold: float):
+        self.alpha = alpha
+        self.peak_hold = peak_hold
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+        self.rx_bps = 0.0
+        self.tx_bps = 0.0
+        self.rx_ewma: Optional[float] = None
+        self.tx_ewma: Optional[float] = None
+        self.rx_peak = 0.0
+        self.tx_peak = 0.0
+        self._rx_peak_at = 0.0
+        self._tx_peak_at = 0.0
+
+    def update(self, rx_bps: float, tx_bps: float, now: float):
+        """Incorpora uma amostra em O(1)"""
+        self.rx_bps = rx_bps
+        self.tx_bps = tx_bps
+        self.rx_ewma = rx_bps if self.rx_ewma is None else self.rx_ewma + self.alpha * (rx_bps - self.rx_ewma)
+        self.tx_ewma = tx_bps if self.tx_ewma is None else self.tx_ewma + self.alpha * (tx_bps - self.tx_ewma)
+
+        # Pico retido por `peak_hold` segundos, depois acompanha a taxa atual
+        if rx_bps >= self.rx_peak or now - self._rx_peak_at > self.peak_hold:
+            self.rx_peak, self._rx_peak_at = rx_bps, now
+        if tx_bps >= self.tx_peak or now - self._tx_peak_at > self.peak_hold:
+            self.tx_peak, self._tx_peak_at = tx_bps, now
+
+    def to_dict(self) -> Dict:
+        mbps = 1_000_000
+        return {
+            "rx_mbps": round(self.rx_bps / mbps, 3),
+            "tx_mbps": round(self.tx_bps / mbps, 3),
+            "rx_ewma_mbps": round((self.rx_ewma or 0) / mbps, 3),
+            "tx_ewma_mbps": round((self.tx_ewma or 0) / mbps, 3),
+            "rx_peak_mbps": round(self.rx_peak / mbps, 3),
+            "tx_peak_mbps": round(self.tx_peak / mbps, 3),
+            "rx_bytes": self.rx_bytes,
+            "tx_bytes": self.tx_bytes
+        }
+
+
+class RateSampler:
+    """Amostra os contadores das interfaces a cada `interval` s e mantém as taxas por NIC"""
+
+    def __init__(self, interval: float = 1.0, alpha: float = 0.3, peak_hold: float = 60,
+                 excluded: Tuple[str, ...] = ("lo",)):
+        self.interval = interval
+        self.alpha = alpha
+        self.peak_hold = peak_hold
+        self.excluded = excluded  # fora do total (ainda aparecem por interface)
+
+        self.nics: Dict[str, NicRate] = {}
+        self._last: Dict[str, Tuple[int, int]] = {}
+        self._last_time: Optional[float] = None
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+        self.samples = 0
+        self._reader: Optional[ProcNetDevReader] = None
+        self._open()
+
+    def _open(self):
+        """Abre /proc/net/dev (mantido aberto entre leituras) ou cai para o psutil"""
+        try:
+            self._reader = ProcNetDevReader()
+            self._read = self._reader.read
+            self.source = "proc"
+        except OSError:
+            self._reader = None
+            self._read = read_psutil_counters
+            self.source = "psutil"
+
+    def sample(self):
+        """Lê os contadores uma vez e atualiza as taxas pela diferença no tempo monotônico"""
+        counters = self._read()
+        now = time.monotonic()
+
+        with self._lock:
+            elapsed = now - self._last_time if self._last_time is not None else None
+            for name, (rx, tx) in counters.items():
+                nic = self.nics.get(name)
+                if nic is None:
+                    nic = self.nics[name] = NicRate(self.alpha, self.peak_hold)
+                previous = self._last.get(name)
+                if previous and elapsed and elapsed > 0:
+                    rx_delta = rx - previous[0]
+                    tx_delta = tx - previous[1]
+                    # Contador reiniciado (interface recriada ou overflow): descarta o intervalo
+                    if rx_delta >= 0 and tx_delta >= 0:
+                        nic.update(rx_delta * 8 / elapsed, tx_delta * 8 / elapsed, now)
+                nic.rx_bytes, nic.tx_bytes = rx, tx
+
+            for name in set(self.nics) - set(counters):
+                del self.nics[name]
+            self._last = counters
+            self._last_time = now
+            self.samples += 1
+
+    def start(self):
+        """Inicia a thread de amostragem"""
+        if self._thread:
+            return
+        if self._reader is None:
+            # Reaberto após close()
+            self._open()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="net-rate-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"📶 Amostragem de tráfego por interface a cada {self.interval}s ({self.source})")
+
+    def stop(self):
+        """Para a thread de amostragem"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"❌ Erro ao amostrar tráfego: {e}")
+            # Passo fixo, sem acumular atraso
+            next_time += self.interval
+            self._stop.wait(max(0.0, next_time - time.monotonic()))
+
+    def snapshot(self) -> Dict:
+        """Taxas por interface e totais (EWMA) das interfaces não excluídas"""
+        with self._lock:
+            interfaces = {name: nic.to_dict() for name, nic in self.nics.items()}
+            counted = [nic for name, nic in self.nics.items() if name not in self.excluded]
+            rx = sum(nic.rx_ewma or 0 for nic in counted)
+            tx = sum(nic.tx_ewma or 0 for nic in counted)
+        return {
+            "download_mbps": round(rx / 1_000_000, 2),
+            "upload_mbps": round(tx / 1_000_000, 2),
+            "interfaces": interfaces
+        }
+
+    def close(self):
+        """Para a amostragem e fecha o descritor de /proc/net/dev"""
+        self.stop()
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+            self._read = read_psutil_counters
@@ -1,13 +1,30 @@
 import asyncio
+import math
 import time
 import logging
 import socket
 import subprocess
 import platform
-from typing import Dict, List, Callable, Optional
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Callable, Optional
 from datetime import datetime
+from pathlib import Path
 from threading import Thread, Event
-import psutil
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from probe_scheduler import ProbeScheduler
+from adaptive_scheduler import AdaptiveScheduler
+from icmp_engine import IcmpEngine
+from history_store import HistoryStore
+from stats_engine import StatsEngine
+from gateway_resolver import GatewayResolver
+from dns_cache import DnsCache, is_ipv4, is_valid_hostname
+from net_rate import RateSampler
+from failure_detector import FailureDetector
+from target_registry import TargetRegistry
+from config_store import ConfigStore
+from bandwidth_test import (BandwidthServer, DEFAULT_PORT, run_tcp_test, run_udp_test, validate_bitrate,
+                            validate_port)
 
 try:
     from ping3 import ping
@@ -17,24 +34,81 @@ except ImportError:
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+# Faixas de latência (ms) usadas pelo modo delta dos frames de ciclo
+LATENCY_BUCKETS = (10, 20, 50, 100, 200, 500, 1000)
+
 class NetworkMonitor:
     def __init__(self):
-        self.custom_targets: Dict[str, Dict] = {}
+        self.custom_targets = TargetRegistry()
         self.callbacks: List[Callable] = []
-        self.ping_history: List[Dict] = []
+        self.result_sinks: List[Callable] = []
         self.is_running = False
         self.monitor_thread = None
         self.stop_event = Event()
         
         # Configurações
         self.ping_interval = 5  # segundos
+        self.ping_timeout = 3  # segundos
         self.failure_threshold = 3
-        self.max_history = 1000
+        self.history_capacity = 17280  # amostras por destino (1 dia a cada 5 s)
+        self.max_in_flight = 64  # sondas simultâneas
+        self.probe_backend = "auto"  # "auto", "icmp" ou "system" (ping3/subprocess)
+        self.frame_mode = "full"  # "full" ou "delta" (apenas destinos que mudaram)
+        self.keyframe_interval = 12  # no modo delta, frame completo a cada N ciclos
+        self.burst_count = 1  # sondas por destino por ciclo (modo rajada quando > 1)
+        self.burst_spacing = 0.2  # segundos entre as sondas da rajada
+        self.schedule_mode = "fixed"  # "fixed" (todos a cada ping_interval) ou "adaptive" (por destino)
+        self.suppressed_probe_interval = 30  # segundos entre sondas de um dependente com o pai em queda
+        
+        # Último resultado por destino e estado enviado no último frame
+        self.last_results: Dict[str, Dict] = {}
+        self._sent_state: Dict[str, tuple] = {}
+        self._cycle_count = 0
+        
+        # Dependentes suprimidos (pai em queda) e instante da última sonda reduzida
+        self._suppressed: Dict[str, float] = {}
+        
+        # Histórico compacto por destino
+        self.ping_history = HistoryStore(capacity=self.history_capacity)
+        
+        # Estatísticas incrementais por destino
+        self.stats = StatsEngine()
+        
+        # Detecção de quedas compartilhada (sonda → detector → consumidores)
+        self.failure_detector = FailureDetector(threshold=self.failure_threshold,
+                                                parent_of=self.get_target_parent)
+        self.failure_detector.register_sink(self._notify_failure_event)
+        
+        # Agendador de sondas concorrentes
+        self.scheduler = ProbeScheduler(self._probe, max_in_flight=self.max_in_flight)
         
-        # Cache para gateway
-        self._gateway_cache = None
-        self._gateway_cache_time = 0
-        self._gateway_cache_ttl = 300  # 5 minutos
+        # Intervalos adaptativos por destino com orçamento global de sondas/s
+        self.adaptive = AdaptiveScheduler(base_interval=self.ping_interval)
+        for label in ("8.8.8.8", "gateway"):
+            self.adaptive.add(label, time.monotonic())
+        self._probe_executor = None
+        self._batch_tasks = set()
+        self.icmp_engine = None
+        self._loop = None
+        self._async_stop = None
+        
+        # Vazão por interface (contadores de /proc/net/dev ou psutil)
+        self.rate_sampler = RateSampler(interval=1.0)
+        
+        # Servidor de teste de vazão (opcional, iniciado pela API)
+        self.bandwidth_server: Optional[BandwidthServer] = None
+        
+        # Cache de DNS para destinos por nome (fora do caminho da API e das sondas)
+        self.dns_cache = DnsCache()
+        self._prefetches: Dict[str, Future] = {}  # resolução antecipada em andamento por nome
+        
+        # Gateway padrão (rtnetlink / /proc/net/route, fork apenas como último recurso)
+        self.gateway_resolver = GatewayResolver()
+        self.gateway_resolver.register_callback(self._on_gateway_changed)
+        
+        # Destinos e configurações persistidos (gravação atômica e agrupada)
+        self.config_store = ConfigStore(Path.home() / "NetworkMonitor" / "config.json", self._state_snapshot)
+        self._restoring = False
         
         logger.info("✅ NetworkMonitor inicializado")
 
@@ -43,68 +117,32 @@ class NetworkMonitor:
         self.callbacks.append(callback)
         logger.info(f"📞 Callback registrado. Total: {len(self.callbacks)}")
 
+    def register_result_sink(self, sink: Callable):
+        """Registra um consumidor da lista completa de resultados de cada ciclo"""
+        self.result_sinks.append(sink)
+        logger.info(f"📥 Consumidor de resultados registrado. Total: {len(self.result_sinks)}")
+
     def get_default_gateway(self) -> Optional[str]:
-        """Obtém o gateway padrão da rede"""
+        """Obtém o gateway padrão da rede (mantido atualizado por eventos de rota)"""
         try:
-            # Verifica cache
-            current_time = time.time()
-            if (self._gateway_cache and 
-                current_time - self._gateway_cache_time < self._gateway_cache_ttl):
-                return self._gateway_cache
-            
-            # Obtém gateway usando psutil
-            gateways = psutil.net_if_addrs()
-            stats = psutil.net_if_stats()
-            
-            # Método alternativo usando route
-            if platform.system() == "Windows":
-                result = subprocess.run(
-                    ["route", "print", "0.0.0.0"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.split('\n')
-                    for line in lines:
-                        if '0.0.0.0' in line and 'Gateway' not in line:
-                            parts = line.split()
-                            if len(parts) >= 3:
-                                gateway = parts[2]
-                                if self._is_valid_ip(gateway):
-                                    self._gateway_cache = gateway
-                                    self._gateway_cache_time = current_time
-                                    logger.info(f"🏠 Gateway detectado: {gateway}")
-                                    return gateway
-            else:
-                # Linux/Mac
-                result = subprocess.run(
-                    ["ip", "route", "show", "default"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    for line in lines:
-                        if 'default via' in line:
-                            parts = line.split()
-                            if len(parts) >= 3:
-                                gateway = parts[2]
-                                if self._is_valid_ip(gateway):
-                                    self._gateway_cache = gateway
-                                    self._gateway_cache_time = current_time
-                                    logger.info(f"🏠 Gateway detectado: {gateway}")
-                                    return gateway
-            
-            # Fallback: usar gateway padrão comum
-            fallback_gateway = "192.168.1.1"
-            logger.warning(f"⚠️ Gateway não detectado, usando fallback: {fallback_gateway}")
-            return fallback_gateway
-            
+            return self.gateway_resolver.get()
         except Exception as e:
             logger.error(f"❌ Erro ao obter gateway: {e}")
-            return "192.168.1.1"  # Fallback
+            return self.gateway_resolver.fallback
+
+    def get_gateway_ip(self) -> Optional[str]:
+        """Alias de get_default_gateway usado pela API"""
+        return self.get_default_gateway()
+
+    def _on_gateway_changed(self, previous: Optional[str], gateway: str):
+        """Gateway mudou: o próximo ciclo já sonda o novo endereço"""
+        logger.warning(f"🔀 Gateway alterado: {previous} → {gateway}")
+        self.last_results.pop("gateway", None)
+        self._sent_state.pop("gateway", None)
+        self._notify_callbacks({
+            "type": "gateway_changed",
+            "data": {"previous": previous, "gateway": gateway, "timestamp": datetime.now().isoformat()}
+        })
 
     def _is_valid_ip(self, ip: str) -> bool:
         """Valida se é um IP válido"""
@@ -168,21 +206,11 @@ class NetworkMonitor:
             }
 
     def get_network_speed(self) -> Dict:
-        """Obtém velocidade de rede (simulada)"""
+        """Obtém a vazão real das interfaces (EWMA dos contadores amostrados a cada segundo)"""
         try:
-            # Obtém estatísticas de rede
-            net_io = psutil.net_io_counters()
-            
-            # Simula velocidade baseada na atividade de rede
-            # Em uma implementação real, você mediria a diferença ao longo do tempo
-            download_mbps = min(100, max(0.1, (net_io.bytes_recv % 1000000) / 100000))
-            upload_mbps = min(50, max(0.0, (net_io.bytes_sent % 500000) / 100000))
-            
-            return {
-                "download_mbps": round(download_mbps, 1),
-                "upload_mbps": round(upload_mbps, 1),
-                "timestamp": datetime.now().isoformat()
-            }
+            speed = self.rate_sampler.snapshot()
+            speed["timestamp"] = datetime.now().isoformat()
+            return speed
         except Exception as e:
             logger.error(f"❌ Erro ao obter velocidade: {e}")
             return {
@@ -191,39 +219,157 @@ class NetworkMonitor:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def add_custom_target(self, ip: str, name: str, enabled: bool = True) -> bool:
-        """Adiciona um destino personalizado"""
+    def start_bandwidth_server(self, port: int = DEFAULT_PORT, host: str = "0.0.0.0") -> int:
+        """Inicia o servidor de teste de vazão; retorna a porta em uso"""
+        validate_port(port)
+        if self.bandwidth_server and self.bandwidth_server.is_running:
+            return self.bandwidth_server.port
+        self.bandwidth_server = BandwidthServer(host, port)
+        self.bandwidth_server.start()
+        return self.bandwidth_server.port
+
+    def stop_bandwidth_server(self):
+        """Para o servidor de teste de vazão"""
+        if self.bandwidth_server:
+            self.bandwidth_server.stop()
+            self.bandwidth_server = None
+
+    def run_bandwidth_test(self, target: str, protocol: str = "tcp", port: int = DEFAULT_PORT,
+                           streams: int = 4, duration: float = 5, reverse: bool = False,
+                           bitrate_mbps: float = 100) -> Dict:
+        """Mede a vazão até um destino personalizado (ou loopback) e notifica como network_speed"""
+        if target not in self.custom_targets and target not in ("127.0.0.1", "localhost"):
+            raise ValueError(f"Destino {target} não é um destino personalizado")
+        
+        validate_port(port)
+        if protocol == "udp":
+            validate_bitrate(bitrate_mbps)
+        streams = max(1, min(16, streams))
+        duration = max(1, min(60, duration))
+        logger.info(f"📶 Teste de vazão {protocol.upper()} para {target}:{port} ({streams} fluxos, {duration}s)")
+        
+        if protocol == "udp":
+            result = run_udp_test(target, port, duration, bitrate_mbps)
+        else:
+            result = run_tcp_test(target, port, streams, duration, reverse)
+        result["timestamp"] = datetime.now().isoformat()
+        
+        self._notify_callbacks({
+            "type": "bandwidth_test",
+            "data": result
+        })
+        return result
+
+    def get_custom_target(self, ip: str) -> Optional[Dict]:
+        """Dados públicos de um destino para eventos e respostas"""
+        info = self.custom_targets.get(ip)
+        if info is None:
+            return None
+        return {
+            "ip": ip,
+            "name": info.get("name"),
+            "enabled": info.get("enabled", True),
+            "parent": info.get("parent", "gateway"),
+            "tags": info.get("tags", [])
+        }
+
+    def _add_target(self, ip: str, name: Optional[str] = None, enabled: bool = True,
+                    parent: Optional[str] = None, tags: Optional[List[str]] = None) -> Optional[str]:
+        """Valida e insere um destino sem notificar; retorna a mensagem de erro, se houver"""
+        if ip in self.custom_targets:
+            return "destino já existe"
+        if not self._is_valid_target(ip):
+            return "IP/hostname inválido"
+        
+        parent = "gateway" if parent is None else (parent or None)
+        if not self._is_valid_parent(ip, parent):
+            return f"destino pai inválido: {parent}"
+        
+        self.custom_targets.add(ip, {
+            "name": name or f"Destino {ip}",
+            "enabled": enabled,
+            "parent": parent,
+            "tags": tags,
+            "added_at": datetime.now().isoformat()
+        })
+        self.adaptive.add(ip, time.monotonic())
+        return None
+
+    def _update_target(self, old_ip: str, new_ip: Optional[str] = None, name: Optional[str] = None,
+                       enabled: Optional[bool] = None, parent: Optional[str] = None,
+                       tags: Optional[List[str]] = None) -> Optional[str]:
+        """Atualiza um destino sem notificar (None mantém o valor atual); retorna o erro, se houver"""
+        current = self.custom_targets.get(old_ip)
+        if current is None:
+            return "destino não encontrado"
+        
+        new_ip = new_ip or old_ip
+        if not self._is_valid_target(new_ip):
+            return "IP/hostname inválido"
+        
+        parent = current.get("parent", "gateway") if parent is None else (parent or None)
+        if not self._is_valid_parent(old_ip, parent, new_ip):
+            return f"destino pai inválido: {parent}"
+        
+        fields = {
+            "name": name or current.get("name"),
+            "enabled": current.get("enabled", True) if enabled is None else enabled,
+            "parent": parent,
+            "tags": current.get("tags") if tags is None else tags,
+            "updated_at": datetime.now().isoformat()
+        }
+        
+        # Se o IP mudou, remove o antigo e adiciona o novo
+        if old_ip != new_ip:
+            if new_ip in self.custom_targets:
+                return "novo IP já existe"
+            self._forget_target(old_ip)
+            self.custom_targets.add(new_ip, fields)
+            self.adaptive.add(new_ip, time.monotonic())
+            self._reparent_children(old_ip, new_ip)
+        else:
+            self.custom_targets.update(old_ip, fields)
+        return None
+
+    def _remove_target(self, ip: str) -> Optional[str]:
+        """Remove um destino sem notificar; retorna o erro, se houver"""
+        if ip not in self.custom_targets:
+            return "destino não encontrado"
+        parent = self.get_target_parent(ip)
+        self._forget_target(ip)
+        # Dependentes passam para o pai do destino removido
+        self._reparent_children(ip, parent)
+        return None
+
+    def _forget_target(self, ip: str):
+        """Descarta o destino e todo o estado associado a ele"""
+        self.custom_targets.remove(ip)
+        self._suppressed.pop(ip, None)
+        self.last_results.pop(ip, None)
+        self._sent_state.pop(ip, None)
+        self.ping_history.remove(ip)
+        self.stats.remove(ip)
+        self.failure_detector.remove(ip)
+        self.adaptive.remove(ip)
+        self.dns_cache.forget(ip)
+
+    def add_custom_target(self, ip: str, name: str, enabled: bool = True, parent: Optional[str] = None,
+                          tags: Optional[List[str]] = None) -> bool:
+        """Adiciona um destino personalizado (pai padrão: gateway; "" para nenhum)"""
         try:
-            logger.info(f"=== ADICIONANDO DESTINO PERSONALIZADO ===")
-            logger.info(f"IP: {ip}")
-            logger.info(f"Nome: {name}")
-            logger.info(f"Enabled: {enabled}")
-            
-            if ip in self.custom_targets:
-                logger.warning(f"⚠️ Destino {ip} já existe")
-                return False
-            
-            # Valida IP/hostname
-            if not self._is_valid_target(ip):
-                logger.error(f"❌ IP/hostname inválido: {ip}")
+            error = self._add_target(ip, name, enabled, parent, tags)
+            if error:
+                logger.error(f"❌ Erro ao adicionar destino {ip}: {error}")
                 return False
             
-            self.custom_targets[ip] = {
-                "name": name,
-                "enabled": enabled,
-                "added_at": datetime.now().isoformat()
-            }
-            
-            logger.info(f"✅ Destino adicionado. Total de destinos personalizados: {len(self.custom_targets)}")
+            self._prefetch_targets([ip])
+            self._persist()
+            logger.info(f"✅ Destino {ip} adicionado. Total de destinos personalizados: {len(self.custom_targets)}")
             
             # Notifica callbacks
             self._notify_callbacks({
                 "type": "target_added",
-                "data": {
-                    "ip": ip,
-                    "name": name,
-                    "enabled": enabled
-                }
+                "data": self.get_custom_target(ip)
             })
             
             return True
@@ -232,58 +378,24 @@ class NetworkMonitor:
             logger.error(f"❌ Erro ao adicionar destino: {e}")
             return False
 
-    def update_custom_target(self, old_ip: str, new_ip: str, name: str, enabled: bool) -> bool:
-        """Atualiza um destino personalizado"""
+    def update_custom_target(self, old_ip: str, new_ip: str, name: str, enabled: bool,
+                             parent: Optional[str] = None, tags: Optional[List[str]] = None) -> bool:
+        """Atualiza um destino personalizado (parent/tags None mantêm os atuais; parent "" remove)"""
         try:
-            logger.info(f"=== ATUALIZANDO DESTINO PERSONALIZADO ===")
-            logger.info(f"IP antigo: {old_ip}")
-            logger.info(f"IP novo: {new_ip}")
-            logger.info(f"Nome: {name}")
-            logger.info(f"Enabled: {enabled}")
-            
-            if old_ip not in self.custom_targets:
-                logger.error(f"❌ Destino {old_ip} não encontrado")
-                return False
-            
-            # Valida novo IP/hostname
-            if not self._is_valid_target(new_ip):
-                logger.error(f"❌ IP/hostname inválido: {new_ip}")
+            error = self._update_target(old_ip, new_ip, name, enabled, parent, tags)
+            if error:
+                logger.error(f"❌ Erro ao atualizar destino {old_ip}: {error}")
                 return False
             
-            # Se o IP mudou, remove o antigo e adiciona o novo
             if old_ip != new_ip:
-                if new_ip in self.custom_targets:
-                    logger.error(f"❌ Novo IP {new_ip} já existe")
-                    return False
-                
-                # Remove antigo
-                del self.custom_targets[old_ip]
-                
-                # Adiciona novo
-                self.custom_targets[new_ip] = {
-                    "name": name,
-                    "enabled": enabled,
-                    "updated_at": datetime.now().isoformat()
-                }
-            else:
-                # Apenas atualiza dados
-                self.custom_targets[old_ip].update({
-                    "name": name,
-                    "enabled": enabled,
-                    "updated_at": datetime.now().isoformat()
-                })
-            
-            logger.info(f"✅ Destino atualizado com sucesso")
+                self._prefetch_targets([new_ip])
+            self._persist()
+            logger.info(f"✅ Destino {old_ip} atualizado")
             
             # Notifica callbacks
             self._notify_callbacks({
                 "type": "target_updated",
-                "data": {
-                    "old_ip": old_ip,
-                    "ip": new_ip,
-                    "name": name,
-                    "enabled": enabled
-                }
+                "data": {"old_ip": old_ip, **self.get_custom_target(new_ip)}
             })
             
             return True
@@ -295,13 +407,12 @@ class NetworkMonitor:
     def remove_custom_target(self, ip: str) -> bool:
         """Remove um destino personalizado"""
         try:
-            logger.info(f"=== REMOVENDO DESTINO: {ip} ===")
-            
-            if ip not in self.custom_targets:
-                logger.error(f"❌ Destino {ip} não encontrado")
+            error = self._remove_target(ip)
+            if error:
+                logger.error(f"❌ Erro ao remover destino {ip}: {error}")
                 return False
             
-            del self.custom_targets[ip]
+            self._persist()
             logger.info(f"✅ Destino {ip} removido. Total restante: {len(self.custom_targets)}")
             
             # Notifica callbacks
@@ -318,19 +429,162 @@ class NetworkMonitor:
             logger.error(f"❌ Erro ao remover destino: {e}")
             return False
 
+    def add_custom_targets(self, entries: Iterable[Dict]) -> Dict:
+        """Adiciona destinos em lote com um único evento targets_changed"""
+        added, errors = [], []
+        for entry in entries:
+            ip = entry.get("ip", "")
+            try:
+                error = self._add_target(ip, entry.get("name"), entry.get("enabled", True),
+                                         entry.get("parent"), entry.get("tags"))
+            except Exception as e:
+                error = str(e)
+            if error:
+                errors.append({"ip": ip, "error": error})
+            else:
+                added.append(ip)
+        
+        self._prefetch_targets(added)
+        self._notify_targets_changed(added=[self.get_custom_target(ip) for ip in added])
+        logger.info(f"✅ Lote: {len(added)} destinos adicionados, {len(errors)} rejeitados")
+        return {"added": added, "errors": errors}
+
+    def update_custom_targets(self, entries: Iterable[Dict]) -> Dict:
+        """Atualiza destinos em lote (campos ausentes mantêm o valor atual)"""
+        updated, errors = [], []
+        for entry in entries:
+            ip = entry.get("ip", "")
+            new_ip = entry.get("new_ip") or ip
+            try:
+                error = self._update_target(ip, new_ip, entry.get("name"), entry.get("enabled"),
+                                            entry.get("parent"), entry.get("tags"))
+            except Exception as e:
+                error = str(e)
+            if error:
+                errors.append({"ip": ip, "error": error})
+            else:
+                updated.append({"old_ip": ip, **self.get_custom_target(new_ip)})
+        
+        renamed = [item["ip"] for item in updated if item["ip"] != item["old_ip"]]
+        self._prefetch_targets(renamed)
+        self._notify_targets_changed(updated=updated)
+        logger.info(f"✅ Lote: {len(updated)} destinos atualizados, {len(errors)} rejeitados")
+        return {"updated": [item["ip"] for item in updated], "renamed": renamed, "errors": errors}
+
+    def remove_custom_targets(self, ips: Iterable[str]) -> Dict:
+        """Remove destinos em lote com um único evento targets_changed"""
+        removed, errors = [], []
+        for ip in ips:
+            error = self._remove_target(ip)
+            if error:
+                errors.append({"ip": ip, "error": error})
+            else:
+                removed.append(ip)
+        
+        self._notify_targets_changed(removed=removed)
+        logger.info(f"✅ Lote: {len(removed)} destinos removidos. Total restante: {len(self.custom_targets)}")
+        return {"removed": removed, "errors": errors}
+
+    def _notify_targets_changed(self, added: Optional[List[Dict]] = None, updated: Optional[List[Dict]] = None,
+                                removed: Optional[List[str]] = None):
+        """Evento único com todas as alterações de um lote"""
+        if not (added or updated or removed):
+            return
+        self._persist()
+        self._notify_callbacks({
+            "type": "targets_changed",
+            "data": {
+                "added": added or [],
+                "updated": updated or [],
+                "removed": removed or [],
+                "total": len(self.custom_targets)
+            }
+        })
+
     def _is_valid_target(self, target: str) -> bool:
-        """Valida se o destino é um IP ou hostname válido"""
+        """Valida se o destino é um IP ou hostname sintaticamente válido (sem resolver)"""
+        return is_ipv4(target) or is_valid_hostname(target)
+
+    def _prefetch_targets(self, targets: List[str]):
+        """Resolve em paralelo, em segundo plano no loop do monitor, os destinos por nome"""
+        names = [target for target in targets if not is_ipv4(target)]
+        if not names or not self._loop:
+            return
+        
+        async def resolve_all():
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            
+            async def resolve(name: str):
+                async with semaphore:
+                    await self.dns_cache.resolve(name)
+            
+            await asyncio.gather(*(resolve(name) for name in names), return_exceptions=True)
+        
         try:
-            # Tenta resolver como IP
-            socket.inet_aton(target)
+            future = asyncio.run_coroutine_threadsafe(resolve_all(), self._loop)
+        except RuntimeError:
+            return
+        
+        for name in names:
+            self._prefetches[name] = future
+        
+        def done(_):
+            for name in names:
+                if self._prefetches.get(name) is future:
+                    del self._prefetches[name]
+        
+        future.add_done_callback(done)
+
+    async def unresolved_targets(self, targets: List[str], timeout: float = 5) -> List[str]:
+        """Destinos por nome que não resolveram, aguardando (até timeout) a resolução antecipada"""
+        names = [target for target in targets if not is_ipv4(target)]
+        if not names or not self._loop:
+            return []
+        
+        pending = {self._prefetches[name] for name in names if name in self._prefetches}
+        if pending:
+            await asyncio.wait([asyncio.wrap_future(future) for future in pending], timeout=timeout)
+        
+        unresolved = []
+        for name in names:
+            future = self._prefetches.get(name)
+            # Ainda em andamento após o timeout não conta como falha
+            if (future is None or future.done()) and self.dns_cache.lookup(name) is None:
+                unresolved.append(name)
+        return unresolved
+
+    def get_target_parent(self, target: str) -> Optional[str]:
+        """Destino pai (upstream) de um destino; os padrão não têm pai"""
+        info = self.custom_targets.get(target)
+        if info is None:
+            return None
+        return info.get("parent", "gateway")
+
+    def get_dependents(self, target: str) -> List[str]:
+        """Destinos personalizados que dependem, direta ou indiretamente, do destino"""
+        dependents = []
+        pending = [target]
+        seen = {target}
+        while pending:
+            for ip in self.custom_targets.children(pending.pop()):
+                if ip not in seen:
+                    seen.add(ip)
+                    dependents.append(ip)
+                    pending.append(ip)
+        return dependents
+
+    def _is_valid_parent(self, target: str, parent: Optional[str], new_target: Optional[str] = None) -> bool:
+        """O pai deve ser um destino conhecido e não pode criar ciclo"""
+        if parent is None or parent in ("gateway", "8.8.8.8"):
             return True
-        except socket.error:
-            try:
-                # Tenta resolver como hostname
-                socket.gethostbyname(target)
-                return True
-            except socket.error:
-                return False
+        if parent in (target, new_target) or parent not in self.custom_targets:
+            return False
+        return parent not in self.get_dependents(target)
+
+    def _reparent_children(self, old_parent: str, new_parent: Optional[str]):
+        """Aponta os dependentes diretos de um destino para outro pai"""
+        for ip in self.custom_targets.children(old_parent):
+            self.custom_targets.update(ip, {"parent": new_parent})
 
     def get_all_targets(self) -> Dict:
         """Retorna todos os destinos (padrão + personalizados)"""
@@ -342,17 +596,22 @@ class NetworkMonitor:
             "custom": self.custom_targets.copy()
         }
 
+    def get_custom_targets(self, name: Optional[str] = None, tag: Optional[str] = None,
+                           enabled: Optional[bool] = None) -> Dict:
+        """Retorna os destinos personalizados, opcionalmente filtrados por nome, tag ou estado"""
+        if name is None and tag is None and enabled is None:
+            return self.custom_targets.copy()
+        return self.custom_targets.filter(name=name, tag=tag, enabled=enabled)
+
     def _notify_callbacks(self, data: Dict):
         """Notifica todos os callbacks registrados"""
-        logger.info(f"📞 Notificando {len(self.callbacks)} callbacks sobre: {data['type']}")
+        logger.debug(f"📞 Notificando {len(self.callbacks)} callbacks sobre: {data['type']}")
         
         for callback in self.callbacks:
             try:
                 callback(data)
             except Exception as e:
                 logger.error(f"❌ Erro no callback: {e}")
-        
-        logger.info("=== NOTIFICAÇÃO CONCLUÍDA ===")
 
     def start_monitoring(self):
         """Inicia o monitoramento em thread separada"""
@@ -362,6 +621,8 @@ class NetworkMonitor:
         
         self.is_running = True
         self.stop_event.clear()
+        self.gateway_resolver.start()
+        self.rate_sampler.start()
         self.monitor_thread = Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         logger.info("🚀 Monitoramento iniciado")
@@ -374,91 +635,367 @@ class NetworkMonitor:
         self.is_running = False
         self.stop_event.set()
         
+        # Acorda o loop assíncrono que está aguardando o próximo ciclo
+        if self._loop and self._async_stop:
+            try:
+                self._loop.call_soon_threadsafe(self._async_stop.set)
+            except RuntimeError:
+                pass
+        
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         
+        self.gateway_resolver.stop()
+        self.rate_sampler.close()
+        self.stop_bandwidth_server()
+        
+        # Grava alterações pendentes (e os endereços resolvidos mais recentes)
+        try:
+            if len(self.custom_targets):
+                self.config_store.save()
+            else:
+                self.config_store.flush()
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar configuração: {e}")
         logger.info("🛑 Monitoramento parado")
 
     def _monitor_loop(self):
         """Loop principal de monitoramento"""
         logger.info("🔄 Loop de monitoramento iniciado")
         
-        while self.is_running and not self.stop_event.is_set():
-            try:
-                cycle_start = time.time()
-                logger.info(f"📊 Ciclo de monitoramento - {datetime.now().strftime('%H:%M:%S')}")
-                
-                # Testa destinos padrão
-                self._test_default_targets()
-                
-                # Testa destinos personalizados
-                self._test_custom_targets()
-                
-                # Obtém velocidade de rede
-                self._test_network_speed()
-                
-                # Aguarda próximo ciclo
-                elapsed = time.time() - cycle_start
-                sleep_time = max(0, self.ping_interval - elapsed)
-                
-                if sleep_time > 0:
-                    self.stop_event.wait(sleep_time)
-                
-            except Exception as e:
-                logger.error(f"❌ Erro no loop de monitoramento: {e}")
-                self.stop_event.wait(1)
+        self._probe_executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="probe"
+        )
+        try:
+            asyncio.run(self._async_monitor_loop())
+        except Exception as e:
+            logger.error(f"❌ Erro fatal no loop de monitoramento: {e}")
+        finally:
+            self._probe_executor.shutdown(wait=False)
+            self._probe_executor = None
         
         logger.info("🔄 Loop de monitoramento finalizado")
 
-    def _test_default_targets(self):
-        """Testa destinos padrão"""
-        # Google DNS
-        logger.debug("🌐 Testando 8.8.8.8 (Google DNS)")
-        result = self.ping_target("8.8.8.8")
-        logger.info(f"📍 Ping 8.8.8.8: {result['latency']}ms ({'✅' if result['success'] else '❌'})")
+    async def _async_monitor_loop(self):
+        """Executa os ciclos de sondagem no event loop da thread de monitoramento"""
+        self._loop = asyncio.get_running_loop()
+        self._async_stop = asyncio.Event()
+        await self._start_icmp_engine()
+        next_speed_test = 0.0
         
-        self._add_to_history(result)
-        self._notify_callbacks({
-            "type": "ping_result",
-            "data": result
-        })
+        try:
+            while self.is_running and not self.stop_event.is_set():
+                try:
+                    if self.schedule_mode == "adaptive":
+                        # Cada destino vence no seu próprio intervalo; o loop só despacha lotes
+                        self._dispatch_adaptive_batch()
+                        now = time.monotonic()
+                        if now >= next_speed_test:
+                            self._test_network_speed()
+                            next_speed_test = now + self.ping_interval
+                        await self._wait_stop(self.adaptive.next_wakeup(time.monotonic()))
+                        continue
+                    
+                    cycle_start = time.monotonic()
+                    logger.info(f"📊 Ciclo de monitoramento - {datetime.now().strftime('%H:%M:%S')}")
+                    
+                    # Testa destinos padrão e personalizados ao mesmo tempo
+                    await self._run_probe_cycle()
+                    
+                    # Obtém velocidade de rede
+                    self._test_network_speed()
+                    
+                    # Aguarda próximo ciclo
+                    elapsed = time.monotonic() - cycle_start
+                    sleep_time = max(0, self.ping_interval - elapsed)
+                    
+                    if sleep_time > 0:
+                        await self._wait_stop(sleep_time)
+                    
+                except Exception as e:
+                    logger.error(f"❌ Erro no loop de monitoramento: {e}")
+                    await self._wait_stop(1)
+        finally:
+            for task in list(self._batch_tasks):
+                task.cancel()
+            if self._batch_tasks:
+                await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+            if self.icmp_engine:
+                self.icmp_engine.close()
+                self.icmp_engine = None
+            self._loop = None
+            self._async_stop = None
+
+    async def _start_icmp_engine(self):
+        """Abre o motor ICMP compartilhado conforme o backend configurado"""
+        if self.probe_backend == "system":
+            return
+        if self.probe_backend == "auto" and platform.system() == "Windows":
+            # O event loop do Windows não suporta add_reader
+            return
         
-        # Gateway
-        gateway = self.get_default_gateway()
-        if gateway:
-            logger.debug(f"🏠 Testando gateway: {gateway}")
-            result = self.ping_target(gateway)
-            result["target"] = "gateway"  # Normaliza nome
-            logger.info(f"📍 Ping Gateway ({gateway}): {result['latency']}ms ({'✅' if result['success'] else '❌'})")
-            
-            self._add_to_history(result)
-            self._notify_callbacks({
-                "type": "ping_result",
-                "data": result
+        engine = IcmpEngine()
+        try:
+            await engine.start()
+            self.icmp_engine = engine
+        except (OSError, NotImplementedError) as e:
+            engine.close()
+            if self.probe_backend == "icmp":
+                raise
+            logger.warning(f"⚠️ Motor ICMP indisponível ({e}), usando ping3/subprocess")
+
+    async def _wait_stop(self, timeout: float):
+        """Aguarda o timeout ou o pedido de parada"""
+        try:
+            await asyncio.wait_for(self._async_stop.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _probe(self, address: str, timeout: int) -> Dict:
+        """Executa um ping pelo motor ICMP ou, sem ele, por ping_target sem bloquear o loop"""
+        if not is_ipv4(address):
+            # Nome resolvido pelo cache; a sonda recebe sempre um IP
+            resolved = await self.dns_cache.resolve(address)
+            if resolved is None:
+                return {
+                    "target": address,
+                    "success": False,
+                    "latency": 0,
+                    "timestamp": datetime.now().isoformat(),
+                    "error": "Falha na resolução DNS"
+                }
+            return await self._probe(resolved, timeout)
+        
+        if self.burst_count > 1:
+            return await self._probe_burst(address, timeout)
+        
+        if not self.icmp_engine:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._probe_executor, self.ping_target, address, timeout)
+        
+        try:
+            latency = await self.icmp_engine.ping(address, timeout)
+            success = latency is not None
+            return {
+                "target": address,
+                "success": success,
+                "latency": round(latency, 2) if success else 0,
+                "timestamp": datetime.now().isoformat(),
+                "error": None if success else "Timeout ou host inacessível"
+            }
+        except Exception as e:
+            logger.debug(f"❌ Erro no ping ICMP para {address}: {e}")
+            return {
+                "target": address,
+                "success": False,
+                "latency": 0,
+                "timestamp": datetime.now().isoformat(),
+                "error": str(e)
+            }
+
+    async def _probe_burst(self, address: str, timeout: int) -> Dict:
+        """Envia uma rajada de sondas e resume min/avg/max/mdev e perda em um resultado"""
+        count, spacing = self.burst_count, self.burst_spacing
+        timestamp = datetime.now().isoformat()
+        try:
+            if self.icmp_engine:
+                latencies = await self.icmp_engine.ping_burst(address, count, spacing, timeout)
+            else:
+                loop = asyncio.get_running_loop()
+                
+                async def one(i: int):
+                    if i:
+                        await asyncio.sleep(i * spacing)
+                    result = await loop.run_in_executor(self._probe_executor, self.ping_target, address, timeout)
+                    return result["latency"] if result["success"] else None
+                
+                latencies = await asyncio.gather(*(one(i) for i in range(count)))
+        except Exception as e:
+            logger.debug(f"❌ Erro na rajada para {address}: {e}")
+            return {
+                "target": address,
+                "success": False,
+                "latency": 0,
+                "timestamp": timestamp,
+                "error": str(e),
+                "sent": count,
+                "received": 0,
+                "loss": 1.0
+            }
+        
+        received = [latency for latency in latencies if latency is not None]
+        result = {
+            "target": address,
+            "success": bool(received),
+            "latency": 0,
+            "timestamp": timestamp,
+            "error": None if received else "Timeout ou host inacessível",
+            "sent": count,
+            "received": len(received),
+            "loss": round(1 - len(received) / count, 3)
+        }
+        if received:
+            # Mesmas medidas do ping do sistema (mdev = desvio padrão populacional)
+            avg = sum(received) / len(received)
+            mdev = math.sqrt(max(0.0, sum(x * x for x in received) / len(received) - avg * avg))
+            result.update({
+                "latency": round(avg, 2),
+                "min": round(min(received), 2),
+                "max": round(max(received), 2),
+                "mdev": round(mdev, 2)
             })
+        return result
+
+    def _get_probe_targets(self) -> List[tuple]:
+        """Monta a lista (endereço, rótulo) de destinos habilitados"""
+        now = time.monotonic()
+        targets = []
+        for label in ["8.8.8.8", "gateway", *self.custom_targets]:
+            address = self._probe_address(label, now)
+            if address:
+                targets.append((address, label))
+        return targets
+
+    def _probe_address(self, label: str, now: float) -> Optional[str]:
+        """Endereço a sondar de um destino, ou None se ele não deve ser sondado agora
+
+        Chamado só quando a sonda vai ser despachada: o horário da sondagem de um dependente
+        suprimido é registrado aqui.
+        """
+        if label == "8.8.8.8":
+            return label
+        if label == "gateway":
+            return self.get_default_gateway()
+        
+        info = self.custom_targets.get(label)
+        if info is None:
+            return None
+        if not info.get("enabled", True):
+            logger.debug(f"⏸️ Destino {label} desabilitado, pulando")
+            return None
+        
+        # Pai em queda: o dependente só é sondado a cada suppressed_probe_interval
+        if self.failure_detector.failing_ancestor(label):
+            last_probe = self._suppressed.get(label)
+            if last_probe is not None and now - last_probe < self.suppressed_probe_interval:
+                return None
+            self._suppressed[label] = now
+        elif label in self._suppressed:
+            del self._suppressed[label]
+        
+        return label
 
-    def _test_custom_targets(self):
-        """Testa destinos personalizados"""
-        if not self.custom_targets:
-            logger.debug("📭 Nenhum destino personalizado configurado")
+    def _dispatch_adaptive_batch(self):
+        """Inicia, sem aguardar, a sondagem dos destinos vencidos dentro do orçamento"""
+        batch = self.adaptive.due(time.monotonic(), self._probe_address)
+        if not batch:
             return
+        total_targets = len(self.adaptive.targets)
+        logger.debug(f"🎯 Lote adaptativo: {len(batch)} de {total_targets} destinos")
+        task = asyncio.create_task(self._run_adaptive_batch(batch, total_targets))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_adaptive_batch(self, batch: List[tuple], total_targets: int):
+        """Sonda um lote e devolve os resultados ao agendador adaptativo"""
+        try:
+            results = await self._run_probe_cycle(batch, total_targets)
+            now = time.monotonic()
+            for result in results:
+                self.adaptive.observe(result, now)
+        except Exception as e:
+            logger.error(f"❌ Erro no lote adaptativo: {e}")
+            for _, label in batch:
+                self.adaptive.release(label)
+
+    async def _run_probe_cycle(self, targets: Optional[List[tuple]] = None,
+                               total_targets: Optional[int] = None) -> List[Dict]:
+        """Sonda em paralelo os destinos informados (por padrão, todos os habilitados)"""
+        partial = targets is not None
+        if targets is None:
+            targets = self._get_probe_targets()
+            logger.info(f"🎯 Testando {len(targets)} destinos")
         
-        logger.info(f"🎯 Testando {len(self.custom_targets)} destinos personalizados")
+        cycle_start = time.monotonic()
+        probe_time = self.ping_timeout + (self.burst_count - 1) * self.burst_spacing
+        results = await self.scheduler.run_cycle(targets, self.ping_interval, self.ping_timeout, probe_time)
+        duration = time.monotonic() - cycle_start
         
-        for ip, info in self.custom_targets.items():
-            if not info.get("enabled", True):
-                logger.debug(f"⏸️ Destino {ip} desabilitado, pulando")
-                continue
-            
-            logger.debug(f"🎯 Testando {info['name']} ({ip})")
-            result = self.ping_target(ip)
-            logger.info(f"📍 Ping {info['name']} ({ip}): {result['latency']}ms ({'✅' if result['success'] else '❌'})")
-            
+        for result in results:
+            logger.debug(f"📍 Ping {result['target']}: {result['latency']}ms ({'✅' if result['success'] else '❌'})")
             self._add_to_history(result)
-            self._notify_callbacks({
-                "type": "ping_result",
-                "data": result
-            })
+            self.last_results[result["target"]] = result
+        
+        # Consumidores recebem todos os resultados, mesmo no modo delta
+        for sink in self.result_sinks:
+            try:
+                sink(results)
+            except Exception as e:
+                logger.error(f"❌ Erro no consumidor de resultados: {e}")
+        
+        # Detecção de quedas em O(1) por resultado; eventos vão aos consumidores registrados
+        self.failure_detector.process_many(results)
+        
+        self._notify_cycle_results(results, duration, partial,
+                                   total_targets if total_targets is not None else len(results))
+        return results
+
+    def _latency_bucket(self, result: Dict) -> int:
+        """Faixa de latência do resultado (-1 para falha)"""
+        if not result["success"]:
+            return -1
+        return bisect_right(LATENCY_BUCKETS, result["latency"])
+
+    def _notify_cycle_results(self, results: List[Dict], duration: float, partial: bool = False,
+                              total_targets: Optional[int] = None):
+        """Envia um único frame com os resultados do ciclo (ou do lote, no modo adaptativo)"""
+        self._cycle_count += 1
+        only_changed = (self.frame_mode == "delta" and
+                        self._cycle_count % self.keyframe_interval != 1)
+        
+        changed = []
+        for result in results:
+            state = (result["success"], self._latency_bucket(result), round(result.get("loss", 0) * 10))
+            if self._sent_state.get(result["target"]) != state:
+                self._sent_state[result["target"]] = state
+                changed.append(result)
+        
+        frame_results = changed if only_changed else results
+        if only_changed and not frame_results:
+            return
+        
+        self._notify_callbacks({
+            "type": "cycle_results",
+            "data": {
+                "cycle": self._cycle_count,
+                "timestamp": datetime.now().isoformat(),
+                "duration_ms": round(duration * 1000, 1),
+                "delta": only_changed or partial,
+                "total_targets": total_targets if total_targets is not None else len(results),
+                "results": frame_results
+            }
+        })
+
+    def register_failure_sink(self, sink: Callable):
+        """Registra um consumidor dos eventos de falha (failure_started / failure_resolved)"""
+        self.failure_detector.register_sink(sink)
+        logger.info("🚨 Consumidor de eventos de falha registrado")
+
+    def _notify_failure_event(self, event: Dict):
+        """Envia o evento de falha aos clientes"""
+        if event["type"] == "failure_started":
+            # Dependentes cujas sondas e alertas ficam suprimidos durante a queda
+            event["suppressed_targets"] = self.get_dependents(event["target"])
+        self._notify_callbacks({"type": event["type"], "data": event})
+
+    def get_active_failures(self) -> Dict:
+        """Retorna as falhas confirmadas em andamento por destino"""
+        return self.failure_detector.active(confirmed_only=True)
+
+    def get_last_results(self) -> List[Dict]:
+        """Retorna o último resultado de cada destino"""
+        return list(self.last_results.values())
 
     def _test_network_speed(self):
         """Testa velocidade de rede"""
@@ -476,37 +1013,140 @@ class NetworkMonitor:
     def _add_to_history(self, result: Dict):
         """Adiciona resultado ao histórico"""
         self.ping_history.append(result)
-        
-        # Limita tamanho do histórico
-        if len(self.ping_history) > self.max_history:
-            self.ping_history = self.ping_history[-self.max_history:]
+        self.stats.update(result)
+
+    def get_ping_history(self, target: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Retorna histórico de pings (de um destino ou de todos, em ordem cronológica)"""
+        return self.ping_history.to_dicts(target=target, limit=limit)
 
-    def get_ping_history(self) -> List[Dict]:
-        """Retorna histórico de pings"""
-        return self.ping_history.copy()
+    def set_history_capacity(self, target: str, capacity: int):
+        """Define quantas amostras guardar para um destino"""
+        self.ping_history.set_capacity(target, max(1, capacity))
 
-    def update_config(self, ping_interval: int = None, failure_threshold: int = None):
+    def update_config(self, ping_interval: int = None, failure_threshold: int = None,
+                      frame_mode: str = None, burst_count: int = None, burst_spacing: float = None,
+                      schedule_mode: str = None, max_probes_per_second: float = None):
         """Atualiza configurações do monitor"""
         if ping_interval is not None:
             self.ping_interval = max(1, min(60, ping_interval))
+            self.adaptive.base_interval = self.ping_interval
         
         if failure_threshold is not None:
             self.failure_threshold = max(1, min(10, failure_threshold))
+            self.failure_detector.threshold = self.failure_threshold
         
-        logger.info(f"⚙️ Configurações atualizadas: interval={self.ping_interval}s, threshold={self.failure_threshold}")
+        if frame_mode in ("full", "delta"):
+            self.frame_mode = frame_mode
+        
+        if burst_count is not None:
+            self.burst_count = max(1, min(20, burst_count))
+        
+        if burst_spacing is not None:
+            self.burst_spacing = max(0.01, min(1.0, burst_spacing))
+        
+        if schedule_mode in ("fixed", "adaptive") and schedule_mode != self.schedule_mode:
+            self.schedule_mode = schedule_mode
+            # Recomeça todos os destinos no intervalo base
+            self.adaptive.reset(time.monotonic())
+        
+        if max_probes_per_second is not None:
+            self.adaptive.max_probes_per_second = max(1, min(1000, max_probes_per_second))
+        
+        self._persist()
+        logger.info(f"⚙️ Configurações atualizadas: interval={self.ping_interval}s, threshold={self.failure_threshold}, "
+                    f"schedule={self.schedule_mode}")
+
+    def get_config(self) -> Dict:
+        """Configurações ajustáveis por update_config (as mesmas que são salvas)"""
+        return {
+            "ping_interval": self.ping_interval,
+            "failure_threshold": self.failure_threshold,
+            "frame_mode": self.frame_mode,
+            "burst_count": self.burst_count,
+            "burst_spacing": self.burst_spacing,
+            "schedule_mode": self.schedule_mode,
+            "max_probes_per_second": self.adaptive.max_probes_per_second
+        }
+
+    def _persist(self):
+        """Agenda a gravação do estado (ignorado durante a restauração)"""
+        if not self._restoring:
+            self.config_store.schedule_save()
+
+    def _state_snapshot(self) -> Dict:
+        """Estado salvo: configurações, destinos e endereços já resolvidos dos destinos por nome"""
+        targets = self.custom_targets.copy()
+        return {
+            "config": self.get_config(),
+            "targets": targets,
+            "resolved": self.dns_cache.export(ip for ip in targets if not is_ipv4(ip))
+        }
+
+    def load_state(self) -> int:
+        """Restaura configurações e destinos salvos; retorna quantos destinos foram carregados
+
+        Os destinos já foram validados quando adicionados, então entram direto no registro;
+        nomes com endereço salvo são semeados no cache de DNS e o restante resolve na 1ª sonda.
+        """
+        data = self.config_store.load()
+        if not data:
+            return 0
+        
+        start = time.perf_counter()
+        self._restoring = True
+        try:
+            config = data.get("config") or {}
+            self.update_config(**{key: value for key, value in config.items() if key in self.get_config()})
+            
+            for ip, info in (data.get("targets") or {}).items():
+                self.custom_targets.add(ip, info)
+                self.adaptive.add(ip, time.monotonic())
+            
+            now = time.time()
+            for name, entry in (data.get("resolved") or {}).items():
+                # Endereço vencido ainda serve para começar; o cache o renova logo em seguida
+                ttl = max(self.dns_cache.min_ttl, entry["expires_at"] - now)
+                self.dns_cache.seed(name, entry["address"], ttl)
+        finally:
+            self._restoring = False
+        
+        logger.info(f"💾 {len(self.custom_targets)} destinos restaurados em "
+                    f"{self.config_store.last_load_ms + (time.perf_counter() - start) * 1000:.1f}ms")
+        return len(self.custom_targets)
+
+    def get_target_stats(self, target: Optional[str] = None) -> Dict:
+        """Retorna estatísticas incrementais de um destino ou de todos"""
+        if target is not None:
+            return self.stats.get(target) or {}
+        return self.stats.snapshot()
 
     def get_stats(self) -> Dict:
         """Retorna estatísticas do monitor"""
-        total_pings = len(self.ping_history)
-        successful_pings = sum(1 for result in self.ping_history if result["success"])
+        total_pings = self.stats.total.count
+        successful_pings = self.stats.total.successful
         
         return {
             "total_pings": total_pings,
             "successful_pings": successful_pings,
             "success_rate": round((successful_pings / total_pings * 100) if total_pings > 0 else 0, 2),
+            "average_latency": round(self.stats.total.mean, 2),
             "custom_targets_count": len(self.custom_targets),
             "is_running": self.is_running,
             "ping_interval": self.ping_interval,
-            "failure_threshold": self.failure_threshold
+            "failure_threshold": self.failure_threshold,
+            "burst_count": self.burst_count,
+            "burst_spacing": self.burst_spacing,
+            "schedule_mode": self.schedule_mode,
+            "suppressed_targets": len(self._suppressed),
+            "history_bytes": self.ping_history.memory_bytes(),
+            "scheduler": self.scheduler.get_stats(),
+            "adaptive": self.adaptive.get_stats() if self.schedule_mode == "adaptive" else None,
+            "icmp_engine": self.icmp_engine.get_stats() if self.icmp_engine else None,
+            "gateway": self.gateway_resolver.get_stats(),
+            "config_store": self.config_store.get_stats(),
+            "dns": self.dns_cache.get_stats(),
+            "failure_detector": self.failure_detector.get_stats(),
+            "bandwidth_server": ({"port": self.bandwidth_server.port, "sessions": self.bandwidth_server.sessions}
+                                 if self.bandwidth_server else None)
         }
 
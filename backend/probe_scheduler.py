@@ -0,0 +1,93 @@
+import asyncio
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Função de sonda: (endereço, timeout) -> resultado no formato de ping_target
+ProbeFunc = Callable[[str, int], Awaitable[Dict]]
+
+
+class ProbeScheduler:
+    """Executa um ciclo de sondagem com todos os destinos em paralelo"""
+
+    def __init__(self, probe: ProbeFunc, max_in_flight: int = 64, spread_ratio: float = 0.5):
+        self.probe = probe
+        self.max_in_flight = max(1, max_in_flight)
+        self.spread_ratio = max(0.0, min(1.0, spread_ratio))
+
+        # Estatísticas de ciclos
+        self.cycles = 0
+        self.overruns = 0
+        self.last_cycle_duration = 0.0
+        self.max_cycle_duration = 0.0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    def _spread_window(self, count: int, interval: float, probe_time: float) -> float:
+        """Janela usada para espalhar os inícios das sondas dentro do intervalo"""
+        if count <= 1:
+            return 0.0
+        # Todas as sondas devem terminar antes do próximo ciclo
+        return max(0.0, min(interval * self.spread_ratio, interval - probe_time))
+
+    async def run_cycle(self, targets: List[Tuple[str, str]], interval: float, timeout: int = 3,
+                        probe_time: Optional[float] = None) -> List[Dict]:
+        """Sonda todos os destinos (endereço, rótulo) e retorna os resultados na mesma ordem
+
+        `probe_time` é a duração máxima de uma sonda (maior que o timeout no modo rajada).
+        """
+        cycle_start = time.monotonic()
+        count = len(targets)
+        if count == 0:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        step = self._spread_window(count, interval, probe_time if probe_time is not None else timeout) / count
+
+        async def run_one(index: int, address: str, label: str) -> Dict:
+            delay = index * step
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with semaphore:
+                self._in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+                try:
+                    result = await self.probe(address, timeout)
+                finally:
+                    self._in_flight -= 1
+
+            # Normaliza o nome do destino (ex.: gateway)
+            result["target"] = label
+            return result
+
+        results = await asyncio.gather(
+            *(run_one(i, address, label) for i, (address, label) in enumerate(targets))
+        )
+
+        duration = time.monotonic() - cycle_start
+        self.cycles += 1
+        self.last_cycle_duration = duration
+        self.max_cycle_duration = max(self.max_cycle_duration, duration)
+
+        if duration > interval:
+            self.overruns += 1
+            logger.warning(
+                f"⏱️ Ciclo excedeu o intervalo: {duration:.2f}s > {interval}s "
+                f"({count} destinos, {self.overruns} estouros no total)"
+            )
+
+        return list(results)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do agendador"""
+        return {
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "last_cycle_duration": round(self.last_cycle_duration, 3),
+            "max_cycle_duration": round(self.max_cycle_duration, 3),
+            "max_in_flight": self.max_in_flight,
+            "peak_in_flight": self.peak_in_flight
+        }
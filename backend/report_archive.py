@@ -0,0 +1,225 @@
+import gzip
+import json
+import os
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from report_catalog import DATE_PATTERN
+
+logger = logging.getLogger(__name__)
+
+
+class ReportArchive:
+    """Arquivos mensais comprimidos de relatórios antigos, com índice por arquivo
+
+    Cada relatório é um membro independente (gzip) ou frame (zstd) concatenado no
+    arquivo do mês; o índice guarda offset e tamanho de cada membro, então um dia é
+    lido descomprimindo só o seu trecho.
+    """
+
+    def __init__(self, archive_dir: Path, compression: str = "gzip", level: int = 6):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        if compression == "zstd" and zstandard is None:
+            logger.warning("⚠️ zstandard não instalado, usando gzip nos arquivos de relatórios")
+            compression = "gzip"
+        self.compression = compression
+        self.level = level
+
+        self._lock = Lock()
+        self._indexes: Dict[str, Tuple[int, Dict]] = {}  # {mês: (mtime_ns do índice, índice)}
+
+    # === Caminhos ===
+
+    def _suffix(self, compression: str) -> str:
+        return ".zst" if compression == "zstd" else ".gz"
+
+    def index_path(self, month: str) -> Path:
+        """Índice JSON de um mês (YYYY-MM)"""
+        return self.archive_dir / f"reports_{month}.index.json"
+
+    def data_path(self, month: str, compression: str) -> Path:
+        """Arquivo comprimido de um mês"""
+        return self.archive_dir / f"reports_{month}{self._suffix(compression)}"
+
+    @staticmethod
+    def month_of(filename: str) -> Optional[str]:
+        """Mês (YYYY-MM) a partir da data no nome do relatório"""
+        match = DATE_PATTERN.search(filename)
+        return match.group(0)[:7] if match else None
+
+    # === Índice ===
+
+    def _load_index(self, month: str) -> Optional[Dict]:
+        """Índice do mês (em cache enquanto o arquivo não muda)"""
+        path = self.index_path(month)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._indexes.pop(month, None)
+            return None
+
+        cached = self._indexes.get(month)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self._indexes[month] = (mtime, index)
+        return index
+
+    def _write_index(self, month: str, index: Dict):
+        """Grava o índice de forma atômica"""
+        path = self.index_path(month)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # === Compressão ===
+
+    def _compress(self, data: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+    def _decompress(self, data: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard não instalado para ler arquivo zstd")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    # === Escrita ===
+
+    def add_files(self, month: str, paths: Iterable[Path]) -> List[Path]:
+        """Acrescenta relatórios ao arquivo do mês; retorna os que foram arquivados"""
+        archived = []
+        with self._lock:
+            index = self._load_index(month) or {"compression": self.compression, "files": {}}
+            compression = index["compression"]
+            data_path = self.data_path(month, compression)
+
+            with open(data_path, "ab") as out:
+                for path in paths:
+                    try:
+                        stat = path.stat()
+                        raw = path.read_bytes()
+                    except FileNotFoundError:
+                        continue
+                    member = self._compress(raw, compression)
+                    offset = out.tell()
+                    out.write(member)
+                    index["files"][path.name] = {
+                        "offset": offset,
+                        "length": len(member),
+                        "size": len(raw),
+                        "mtime": stat.st_mtime
+                    }
+                    archived.append(path)
+                out.flush()
+                os.fsync(out.fileno())
+
+            # O índice só passa a apontar para os membros depois que eles estão no disco
+            if archived:
+                self._write_index(month, index)
+        return archived
+
+    def remove_month(self, month: str):
+        """Apaga o arquivo e o índice de um mês"""
+        with self._lock:
+            index = self._load_index(month)
+            if index:
+                self.data_path(month, index["compression"]).unlink(missing_ok=True)
+            self.index_path(month).unlink(missing_ok=True)
+            self._indexes.pop(month, None)
+
+    def months(self) -> List[str]:
+        """Meses arquivados"""
+        return sorted(path.name[len("reports_"):-len(".index.json")]
+                      for path in self.archive_dir.glob("reports_*.index.json"))
+
+    # === Leitura ===
+
+    def entry(self, filename: str) -> Optional[Dict]:
+        """Entrada do índice de um relatório arquivado (offset, length, size, mtime)"""
+        month = self.month_of(filename)
+        if not month:
+            return None
+        with self._lock:
+            index = self._load_index(month)
+        if not index:
+            return None
+        return index["files"].get(filename)
+
+    def read(self, filename: str) -> Optional[bytes]:
+        """Bytes originais de um relatório, descomprimindo apenas o seu membro"""
+        month = self.month_of(filename)
+        if not month:
+            return None
+        with self._lock:
+            index = self._load_index(month)
+        if not index or filename not in index["files"]:
+            return None
+
+        entry = index["files"][filename]
+        with open(self.data_path(month, index["compression"]), "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        return self._decompress(member, index["compression"])
+
+    def load(self, filename: str):
+        """Conteúdo interpretado de um relatório arquivado (lista para logs JSONL)"""
+        data = self.read(filename)
+        if data is None:
+            return None
+        if filename.endswith(".jsonl"):
+            return list(self._iter_lines(data))
+        return json.loads(data)
+
+    @staticmethod
+    def _iter_lines(data: bytes) -> Iterator[Dict]:
+        for line in data.splitlines():
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def iter_failures(self, date_str: str) -> Iterator[Dict]:
+        """Falhas de um dia arquivado (formato antigo e JSONL)"""
+        legacy = self.read(f"failures_{date_str}.json")
+        if legacy:
+            yield from json.loads(legacy)
+        data = self.read(f"failures_{date_str}.jsonl")
+        if data:
+            yield from self._iter_lines(data)
+
+    def get_stats(self) -> Dict:
+        """Tamanho comprimido x original dos arquivos"""
+        files = 0
+        original = 0
+        compressed = 0
+        for month in self.months():
+            with self._lock:
+                index = self._load_index(month)
+            if not index:
+                continue
+            files += len(index["files"])
+            original += sum(entry["size"] for entry in index["files"].values())
+            compressed += self.data_path(month, index["compression"]).stat().st_size
+        return {
+            "months": len(self.months()),
+            "files": files,
+            "original_bytes": original,
+            "compressed_bytes": compressed,
+            "compression": self.compression
+        }
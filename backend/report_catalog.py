@@ -0,0 +1,239 @@
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import sqlite3
+import struct
+import logging
+from datetime import datetime
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Arquivos listados como relatórios e data no nome
+REPORT_PATTERN = re.compile(r"^[^.].*\.jsonl?$")
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Máscaras do inotify (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    filename TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    date TEXT,
+    size INTEGER NOT NULL,
+    created TEXT NOT NULL,
+    modified TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_modified ON reports (modified);
+CREATE INDEX IF NOT EXISTS reports_type_date ON reports (type, date);
+"""
+
+
+class ReportCatalog:
+    """Índice persistente (SQLite) dos relatórios, atualizado na escrita e via inotify"""
+
+    def __init__(self, reports_dir: Path, db_path: Optional[Path] = None):
+        self.reports_dir = Path(reports_dir)
+        self.db_path = Path(db_path) if db_path else self.reports_dir / ".catalog.db"
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+        self._dir_mtime = None
+        self._watcher: Optional[Thread] = None
+        self._stop = Event()
+        self._inotify_fd = None
+
+        self.rescan()
+
+    def _entry(self, path: Path) -> Optional[tuple]:
+        """Linha do catálogo para um arquivo (None se não for relatório ou não existir)"""
+        if not REPORT_PATTERN.match(path.name):
+            return None
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        date = DATE_PATTERN.search(path.name)
+        return (
+            path.name,
+            "failure" if "failures_" in path.name else "daily",
+            date.group(0) if date else None,
+            stat.st_size,
+            datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            datetime.fromtimestamp(stat.st_mtime).isoformat()
+        )
+
+    def rescan(self):
+        """Reconstrói o catálogo a partir do diretório (inicialização ou fallback)"""
+        entries = []
+        for path in self.reports_dir.iterdir():
+            entry = self._entry(path)
+            if entry:
+                entries.append(entry)
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reports")
+            self._conn.executemany("INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?)", entries)
+            self._dir_mtime = self.reports_dir.stat().st_mtime
+        logger.info(f"📚 Catálogo de relatórios reconstruído: {len(entries)} arquivos")
+
+    def update(self, path: Path):
+        """Atualiza (ou remove) a entrada de um arquivo após escrita"""
+        path = Path(path)
+        entry = self._entry(path)
+        with self._lock, self._conn:
+            if entry:
+                self._conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)", entry)
+            else:
+                self._conn.execute("DELETE FROM reports WHERE filename = ?", (path.name,))
+
+    def remove(self, filename: str):
+        """Remove a entrada de um arquivo apagado"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reports WHERE filename = ?", (filename,))
+
+    def _check_directory(self):
+        """Sem inotify: reconstrói se o diretório mudou (um único stat por consulta)"""
+        if self._watcher is not None:
+            return
+        try:
+            mtime = self.reports_dir.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._dir_mtime:
+            self.rescan()
+
+    def list(self, report_type: Optional[str] = None, date_from: Optional[str] = None,
+             date_to: Optional[str] = None, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Página de relatórios (mais recentes primeiro) e o total que atende aos filtros"""
+        self._check_directory()
+
+        where, params = [], []
+        if report_type:
+            where.append("type = ?")
+            params.append(report_type)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            params.append(date_to)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reports{clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT filename, type, size, created, modified FROM reports{clause} "
+                f"ORDER BY modified DESC LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, max(0, offset)]
+            ).fetchall()
+
+        reports = [
+            {
+                "filename": filename,
+                "path": str(self.reports_dir / filename),
+                "size": size,
+                "created": created,
+                "modified": modified,
+                "type": kind
+            }
+            for filename, kind, size, created, modified in rows
+        ]
+        return reports, total
+
+    def filenames_before(self, modified_before: str) -> List[str]:
+        """Arquivos modificados antes de uma data ISO (para limpeza)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename FROM reports WHERE modified < ?", (modified_before,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # === Invalidação via inotify (Linux) ===
+
+    def start_watching(self) -> bool:
+        """Observa o diretório com inotify; retorna False se indisponível"""
+        if self._watcher is not None:
+            return True
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            return False
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                return False
+            mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_MODIFY
+            if libc.inotify_add_watch(fd, str(self.reports_dir).encode(), mask) < 0:
+                os.close(fd)
+                return False
+        except (AttributeError, OSError):
+            return False
+
+        self._inotify_fd = fd
+        self._stop.clear()
+        self._watcher = Thread(target=self._watch_loop, name="report-catalog-watcher", daemon=True)
+        self._watcher.start()
+        logger.info("👀 Catálogo de relatórios observando o diretório via inotify")
+        return True
+
+    def stop_watching(self):
+        """Para o observador"""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=5)
+        self._watcher = None
+        os.close(self._inotify_fd)
+        self._inotify_fd = None
+
+    def _watch_loop(self):
+        """Aplica eventos do inotify ao catálogo, arquivo por arquivo"""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._inotify_fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._inotify_fd, 64 * 1024)
+            except OSError:
+                continue
+
+            changed = set()
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                _, mask, _, name_len = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + name_len]
+                offset += INOTIFY_EVENT.size + name_len
+                if mask & IN_Q_OVERFLOW:
+                    changed = None
+                    break
+                if name:
+                    changed.add(name.rstrip(b"\0").decode(errors="replace"))
+
+            try:
+                if changed is None:
+                    self.rescan()
+                else:
+                    for filename in changed:
+                        self.update(self.reports_dir / filename)
+            except Exception as e:
+                logger.error(f"❌ Erro ao atualizar catálogo de relatórios: {e}")
+
+    def close(self):
+        """Fecha o catálogo"""
+        self.stop_watching()
+        with self._lock:
+            self._conn.close()
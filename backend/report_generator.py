@@ -1,78 +1,80 @@
 import os
 import csv
 import json
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
+from threading import Lock
 from typing import Dict, List, Optional
 import logging
 
+from stats_engine import StatsEngine
+from failure_log import FailureLog
+from report_writer import ReportWriter
+from report_catalog import ReportCatalog
+from report_archive import ReportArchive
+from failure_aggregates import FailureAggregates
+import analytics
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, history_store=None):
         # Diretório de relatórios
         self.reports_dir = Path.home() / "NetworkMonitor" / "Reports"
         self.reports_dir.mkdir(parents=True, exist_ok=True)
         
-        # Controle de falhas ativas
-        self.active_failures = {}  # {target: {start_time, packets_lost, last_seen}}
-        self.failure_threshold = 3  # Número de falhas consecutivas para gerar relatório
+        # Catálogo indexado dos relatórios (atualizado na escrita e via inotify)
+        self.catalog = ReportCatalog(self.reports_dir)
+        self.catalog.start_watching()
+        
+        # Arquivos mensais comprimidos dos relatórios antigos
+        self.archive = ReportArchive(self.reports_dir / "Archive")
+        
+        # Log de falhas append-only (JSONL)
+        self.failure_log = FailureLog(self.reports_dir)
+        
+        # Agregados diários de falhas (dias fechados gravados uma vez, dia atual ao vivo)
+        self.aggregates = FailureAggregates(self.reports_dir / ".failure_aggregates.json", self._iter_failures)
+        self.aggregates.start_day(datetime.now().strftime("%Y-%m-%d"))
+        
+        # Gravação em lote numa thread dedicada (fora do caminho das sondas)
+        self.writer = ReportWriter(self._write_failure_batch)
+        self.writer.start()
+        
+        # LRU dos últimos relatórios interpretados: {(nome, mtime_ns, tamanho): conteúdo}
+        self._parsed_cache = OrderedDict()
+        self._parsed_cache_size = 8
+        self._parsed_cache_lock = Lock()
+        
+        # Estatísticas incrementais do dia corrente
+        self.daily_stats = StatsEngine()
+        self._daily_stats_date = datetime.now().strftime("%Y-%m-%d")
+        
+        # Histórico do monitor (HistoryStore), base do relatório diário colunar
+        self.history_store = history_store
         
         logger.info(f"✅ ReportGenerator inicializado - Diretório: {self.reports_dir}")
 
     def process_ping_result(self, result: Dict):
-        """Processa resultado de ping e detecta falhas para relatórios automáticos"""
-        target = result.get("target", "unknown")
-        success = result.get("success", False)
-        timestamp = result.get("timestamp", datetime.now().isoformat())
-        latency = result.get("latency", 0)
-        
-        logger.debug(f"📊 Processando ping: {target} - {'✅' if success else '❌'}")
-        
-        if not success:
-            # Ping falhou
-            self._handle_ping_failure(target, timestamp, latency)
-        else:
-            # Ping bem-sucedido
-            self._handle_ping_success(target, timestamp, latency)
+        """Atualiza as estatísticas do dia com um resultado de ping"""
+        # Reinicia na virada do dia
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        if date_str != self._daily_stats_date:
+            self.daily_stats = StatsEngine()
+            self._daily_stats_date = date_str
+        self.daily_stats.update(result)
 
-    def _handle_ping_failure(self, target: str, timestamp: str, latency: float):
-        """Trata falha de ping"""
-        if target not in self.active_failures:
-            # Primeira falha
-            self.active_failures[target] = {
-                "start_time": timestamp,
-                "packets_lost": 1,
-                "last_seen": timestamp,
-                "consecutive_failures": 1
-            }
-            logger.info(f"🔴 Primeira falha detectada: {target}")
-        else:
-            # Falha consecutiva
-            self.active_failures[target]["packets_lost"] += 1
-            self.active_failures[target]["last_seen"] = timestamp
-            self.active_failures[target]["consecutive_failures"] += 1
-            
-            consecutive = self.active_failures[target]["consecutive_failures"]
-            logger.warning(f"🔴 Falha consecutiva #{consecutive}: {target}")
-            
-            # Verifica se deve gerar relatório
-            if consecutive >= self.failure_threshold:
-                logger.error(f"🚨 LIMITE DE FALHAS ATINGIDO: {target} ({consecutive} falhas)")
+    def process_results(self, results: List[Dict]):
+        """Consumidor dos resultados de cada ciclo (estatísticas do dia)"""
+        for result in results:
+            self.process_ping_result(result)
 
-    def _handle_ping_success(self, target: str, timestamp: str, latency: float):
-        """Trata sucesso de ping"""
-        if target in self.active_failures:
-            # Fim da falha - gera relatório
-            failure_data = self.active_failures[target]
-            
-            # Só gera relatório se atingiu o threshold
-            if failure_data["consecutive_failures"] >= self.failure_threshold:
-                self._generate_failure_report(target, failure_data, timestamp)
-            
-            # Remove da lista de falhas ativas
-            del self.active_failures[target]
-            logger.info(f"✅ Falha resolvida: {target}")
+    def handle_failure_event(self, event: Dict) -> Optional[Dict]:
+        """Consumidor dos eventos do detector de falhas: gera o relatório quando a falha termina"""
+        if event["type"] != "failure_resolved":
+            return None
+        return self._generate_failure_report(event["target"], event, event["end_time"])
 
     def _generate_failure_report(self, target: str, failure_data: Dict, recovery_time: str):
         """Gera relatório automático de falha"""
@@ -96,6 +98,8 @@ class ReportGenerator:
                 "packets_lost": failure_data["packets_lost"],
                 "consecutive_failures": failure_data["consecutive_failures"],
                 "severity": self._calculate_severity(failure_data["consecutive_failures"], duration),
+                # Dependentes que caíram junto, sem relatório próprio
+                "affected_targets": failure_data.get("affected_targets", []),
                 "generated_at": datetime.now().isoformat()
             }
             
@@ -133,27 +137,27 @@ class ReportGenerator:
             return "BAIXA"
 
     def _save_failure_report(self, report_data: Dict):
-        """Salva relatório de falha em arquivo"""
-        try:
-            # Nome do arquivo baseado na data
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            
-            # Arquivo JSON detalhado
-            json_file = self.reports_dir / f"failures_{date_str}.json"
-            
-            # Carrega relatórios existentes ou cria lista vazia
-            if json_file.exists():
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    reports = json.load(f)
-            else:
-                reports = []
-            
-            # Adiciona novo relatório
-            reports.append(report_data)
-            
-            # Salva arquivo JSON
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(reports, f, indent=2, ensure_ascii=False)
+        """Enfileira o relatório de falha para a thread de gravação (não faz I/O aqui)"""
+        now = datetime.now()
+        self.writer.submit({
+            "date": now.strftime("%Y-%m-%d"),
+            "saved_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "report": report_data
+        })
+
+    def _write_failure_batch(self, items: List[Dict]):
+        """Grava um lote de relatórios de falha (executado pela thread de gravação)"""
+        # Agrupa por dia
+        by_date: Dict[str, List[Dict]] = {}
+        for item in items:
+            by_date.setdefault(item["date"], []).append(item)
+        
+        for date_str, day_items in by_date.items():
+            # Log JSONL detalhado
+            self.failure_log.append_many([item["report"] for item in day_items], date_str)
+            self.catalog.update(self.failure_log.path_for(date_str))
+            for item in day_items:
+                self.aggregates.add(item["report"], date_str)
             
             # Arquivo CSV resumido
             csv_file = self.reports_dir / f"failures_summary_{date_str}.csv"
@@ -161,7 +165,7 @@ class ReportGenerator:
             # Verifica se arquivo CSV existe
             file_exists = csv_file.exists()
             
-            # Adiciona linha ao CSV
+            # Adiciona linhas ao CSV
             with open(csv_file, 'a', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 
@@ -173,32 +177,54 @@ class ReportGenerator:
                         'Falhas Consecutivas', 'Severidade'
                     ])
                 
-                # Dados da falha
-                writer.writerow([
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    report_data["target"],
-                    report_data["target_name"],
-                    report_data["failure_start"],
-                    report_data["failure_end"],
-                    round(report_data["duration_seconds"] / 60, 2),
-                    report_data["packets_lost"],
-                    report_data["consecutive_failures"],
-                    report_data["severity"]
-                ])
-            
-            logger.info(f"💾 Relatório salvo: {json_file.name}")
+                # Dados das falhas
+                for item in day_items:
+                    report_data = item["report"]
+                    writer.writerow([
+                        item["saved_at"],
+                        report_data["target"],
+                        report_data["target_name"],
+                        report_data["failure_start"],
+                        report_data["failure_end"],
+                        round(report_data["duration_seconds"] / 60, 2),
+                        report_data["packets_lost"],
+                        report_data["consecutive_failures"],
+                        report_data["severity"]
+                    ])
             
-        except Exception as e:
-            logger.error(f"❌ Erro ao salvar relatório: {e}")
+            logger.info(f"💾 {len(day_items)} relatório(s) salvo(s): {self.failure_log.path_for(date_str).name}")
+
+    def close(self):
+        """Grava relatórios pendentes e fecha os arquivos"""
+        self.writer.stop()
+        self.failure_log.close()
+        self.catalog.close()
+
+    def get_writer_stats(self) -> Dict:
+        """Retorna estatísticas da thread de gravação"""
+        return self.writer.get_stats()
 
-    def generate_daily_report(self, ping_history: List[Dict]) -> Path:
-        """Gera relatório diário consolidado"""
+    def generate_daily_report(self, ping_history: Optional[List[Dict]] = None, history_store=None) -> Path:
+        """Gera relatório diário consolidado
+        
+        Por padrão (e com NumPy disponível) usa o caminho colunar sobre os buffers do
+        monitor; com ping_history explícito ou sem histórico usa as estatísticas por dict.
+        """
         try:
             date_str = datetime.now().strftime("%Y-%m-%d")
             report_file = self.reports_dir / f"daily_report_{date_str}.json"
             
             # Processa histórico
-            stats = self._calculate_daily_stats(ping_history)
+            if history_store is None and ping_history is None:
+                history_store = self.history_store
+            if history_store is not None and analytics.np is not None:
+                day_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+                columns = analytics.ColumnarHistory.from_history_store(
+                    history_store, since_ms=int(day_start.timestamp() * 1000)
+                )
+                stats = analytics.compute_daily_stats(columns)
+            else:
+                stats = self._calculate_daily_stats(ping_history)
             
             # Dados do relatório
             report_data = {
@@ -223,6 +249,7 @@ class ReportGenerator:
             # Salva relatório
             with open(report_file, 'w', encoding='utf-8') as f:
                 json.dump(report_data, f, indent=2, ensure_ascii=False)
+            self.catalog.update(report_file)
             
             logger.info(f"📊 Relatório diário gerado: {report_file}")
             return report_file
@@ -231,163 +258,170 @@ class ReportGenerator:
             logger.error(f"❌ Erro ao gerar relatório diário: {e}")
             return None
 
-    def _calculate_daily_stats(self, ping_history: List[Dict]) -> Dict:
+    def _calculate_daily_stats(self, ping_history: Optional[List[Dict]] = None) -> Dict:
         """Calcula estatísticas diárias"""
-        if not ping_history:
-            return {}
-        
-        total_pings = len(ping_history)
-        successful_pings = sum(1 for p in ping_history if p.get("success", False))
-        failed_pings = total_pings - successful_pings
+        if ping_history is None:
+            engine = self.daily_stats
+        else:
+            # Uma única passada sobre o histórico fornecido
+            engine = StatsEngine()
+            for ping in ping_history:
+                engine.update(ping)
         
-        # Latência média (apenas pings bem-sucedidos)
-        successful_latencies = [p.get("latency", 0) for p in ping_history if p.get("success", False) and p.get("latency", 0) > 0]
-        average_latency = sum(successful_latencies) / len(successful_latencies) if successful_latencies else 0
+        total = engine.total
+        if total.count == 0:
+            return {}
         
         # Estatísticas por destino
         targets = {}
-        for ping in ping_history:
-            target = ping.get("target", "unknown")
-            if target not in targets:
-                targets[target] = {
-                    "total": 0,
-                    "successful": 0,
-                    "failed": 0,
-                    "success_rate": 0,
-                    "average_latency": 0,
-                    "latencies": []
-                }
-            
-            targets[target]["total"] += 1
-            if ping.get("success", False):
-                targets[target]["successful"] += 1
-                if ping.get("latency", 0) > 0:
-                    targets[target]["latencies"].append(ping.get("latency", 0))
-            else:
-                targets[target]["failed"] += 1
-        
-        # Calcula médias por destino
-        for target_data in targets.values():
-            if target_data["total"] > 0:
-                target_data["success_rate"] = round((target_data["successful"] / target_data["total"]) * 100, 2)
-            if target_data["latencies"]:
-                target_data["average_latency"] = round(sum(target_data["latencies"]) / len(target_data["latencies"]), 2)
-            del target_data["latencies"]  # Remove dados temporários
+        for target, stats in engine.targets.items():
+            targets[target] = {
+                "total": stats.count,
+                "successful": stats.successful,
+                "failed": stats.lost,
+                "success_rate": round((stats.successful / stats.count) * 100, 2) if stats.count else 0,
+                "average_latency": round(stats.mean, 2)
+            }
         
         return {
-            "total_pings": total_pings,
-            "successful_pings": successful_pings,
-            "failed_pings": failed_pings,
-            "success_rate": round((successful_pings / total_pings) * 100, 2) if total_pings > 0 else 0,
-            "average_latency": round(average_latency, 2),
+            "total_pings": total.count,
+            "successful_pings": total.successful,
+            "failed_pings": total.lost,
+            "success_rate": round((total.successful / total.count) * 100, 2),
+            "average_latency": round(total.mean, 2),
             "targets": targets,
-            "first_ping": ping_history[0].get("timestamp", "N/A") if ping_history else "N/A",
-            "last_ping": ping_history[-1].get("timestamp", "N/A") if ping_history else "N/A"
+            "first_ping": total.first_timestamp or "N/A",
+            "last_ping": total.last_timestamp or "N/A"
         }
 
+    def _iter_failures(self, date_str: str):
+        """Falhas de um dia, do log em disco ou do arquivo mensal comprimido"""
+        if (self.failure_log.path_for(date_str).exists() or
+                self.failure_log.legacy_path_for(date_str).exists()):
+            return self.failure_log.iter_day(date_str)
+        return self.archive.iter_failures(date_str)
+
     def _get_daily_failures(self, date_str: str) -> List[Dict]:
         """Obtém falhas do dia"""
         try:
-            json_file = self.reports_dir / f"failures_{date_str}.json"
-            if json_file.exists():
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            # Garante que falhas ainda na fila de gravação sejam incluídas
+            self.writer.flush()
+            return list(self._iter_failures(date_str))
         except Exception as e:
             logger.error(f"❌ Erro ao obter falhas diárias: {e}")
             return []
 
-    def list_reports(self) -> List[Dict]:
-        """Lista todos os relatórios disponíveis"""
+    def list_reports(self, report_type: Optional[str] = None, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Lista os relatórios disponíveis (mais recentes primeiro)"""
+        return self.list_reports_page(report_type, date_from, date_to, offset, limit)["reports"]
+
+    def list_reports_page(self, report_type: Optional[str] = None, date_from: Optional[str] = None,
+                          date_to: Optional[str] = None, offset: int = 0, limit: Optional[int] = None) -> Dict:
+        """Página de relatórios a partir do catálogo, com total para paginação"""
         try:
-            reports = []
-            
-            for file_path in self.reports_dir.glob("*.json"):
-                try:
-                    stat = file_path.stat()
-                    reports.append({
-                        "filename": file_path.name,
-                        "path": str(file_path),
-                        "size": stat.st_size,
-                        "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "type": "failure" if "failures_" in file_path.name else "daily"
-                    })
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro ao processar arquivo {file_path}: {e}")
-            
-            # Ordena por data de modificação (mais recente primeiro)
-            reports.sort(key=lambda x: x["modified"], reverse=True)
-            
-            return reports
+            reports, total = self.catalog.list(report_type, date_from, date_to, offset, limit)
+            return {"reports": reports, "total": total, "offset": offset, "limit": limit}
             
         except Exception as e:
             logger.error(f"❌ Erro ao listar relatórios: {e}")
-            return []
+            return {"reports": [], "total": 0, "offset": offset, "limit": limit}
+
+    def resolve_report_path(self, filename: str) -> Optional[Path]:
+        """Caminho de um relatório do diretório (None se inexistente ou nome inválido)"""
+        if not filename or Path(filename).name != filename or filename.startswith("."):
+            return None
+        file_path = self.reports_dir / filename
+        if file_path.suffix not in (".json", ".jsonl") or not file_path.is_file():
+            return None
+        return file_path
+
+    def _load_report(self, file_path: Path):
+        """Interpreta um relatório do disco"""
+        if file_path.suffix == ".jsonl":
+            date_str = file_path.stem.replace("failures_", "")
+            return list(self.failure_log.iter_day(date_str))
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
 
     def get_report_content(self, filename: str) -> Optional[Dict]:
-        """Obtém conteúdo de um relatório específico"""
+        """Obtém conteúdo de um relatório específico (com cache LRU por mtime/tamanho)"""
         try:
-            file_path = self.reports_dir / filename
-            if not file_path.exists():
-                return None
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            file_path = self.resolve_report_path(filename)
+            if not file_path:
+                # Relatórios antigos são lidos do arquivo mensal
+                if Path(filename).name != filename:
+                    return None
+                return self.archive.load(filename)
+            
+            stat = file_path.stat()
+            key = (filename, stat.st_mtime_ns, stat.st_size)
+            with self._parsed_cache_lock:
+                if key in self._parsed_cache:
+                    self._parsed_cache.move_to_end(key)
+                    return self._parsed_cache[key]
+            
+            content = self._load_report(file_path)
+            
+            with self._parsed_cache_lock:
+                # Versões antigas do mesmo arquivo deixam de ser válidas
+                for stale in [k for k in self._parsed_cache if k[0] == filename]:
+                    del self._parsed_cache[stale]
+                self._parsed_cache[key] = content
+                while len(self._parsed_cache) > self._parsed_cache_size:
+                    self._parsed_cache.popitem(last=False)
+            return content
                 
         except Exception as e:
             logger.error(f"❌ Erro ao ler relatório {filename}: {e}")
             return None
 
-    def get_active_failures(self) -> Dict:
-        """Retorna falhas ativas no momento"""
-        return self.active_failures.copy()
-
     def get_failure_summary(self, days: int = 7) -> Dict:
-        """Retorna resumo de falhas dos últimos N dias"""
+        """Retorna resumo de falhas dos últimos N dias (a partir dos agregados diários)"""
         try:
-            summary = {
-                "period_days": days,
-                "total_failures": 0,
-                "targets_affected": set(),
-                "severity_count": {"CRÍTICA": 0, "ALTA": 0, "MÉDIA": 0, "BAIXA": 0},
-                "daily_breakdown": {}
-            }
-            
-            # Verifica arquivos dos últimos N dias
-            for i in range(days):
-                date = datetime.now() - timedelta(days=i)
-                date_str = date.strftime("%Y-%m-%d")
-                
-                failures = self._get_daily_failures(date_str)
-                summary["daily_breakdown"][date_str] = len(failures)
-                summary["total_failures"] += len(failures)
-                
-                for failure in failures:
-                    summary["targets_affected"].add(failure.get("target", "unknown"))
-                    severity = failure.get("severity", "BAIXA")
-                    if severity in summary["severity_count"]:
-                        summary["severity_count"][severity] += 1
-            
-            summary["targets_affected"] = list(summary["targets_affected"])
-            
-            return summary
-            
+            return self.aggregates.summary(days)
         except Exception as e:
             logger.error(f"❌ Erro ao gerar resumo de falhas: {e}")
             return {}
 
-    def cleanup_old_reports(self, days_to_keep: int = 30):
-        """Remove relatórios antigos"""
+    def get_failure_summaries(self, windows=(7, 30, 90, 365)) -> Dict:
+        """Resumos de várias janelas; os dias mais antigos são agregados uma única vez"""
+        return {f"{days}d": self.get_failure_summary(days) for days in windows}
+
+    def cleanup_old_reports(self, days_to_keep: int = 30, archive_days: int = 365):
+        """Compacta relatórios antigos em arquivos mensais e remove arquivos vencidos"""
         try:
             cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            by_month: Dict[str, List[Path]] = {}
             removed_count = 0
             
-            for file_path in self.reports_dir.glob("*.json"):
-                if file_path.stat().st_mtime < cutoff_date.timestamp():
+            for filename in self.catalog.filenames_before(cutoff_date.isoformat()):
+                file_path = self.reports_dir / filename
+                month = self.archive.month_of(filename)
+                if month:
+                    by_month.setdefault(month, []).append(file_path)
+                elif file_path.exists():
                     file_path.unlink()
                     removed_count += 1
+                    self.catalog.remove(filename)
             
+            archived_count = 0
+            for month, paths in by_month.items():
+                for file_path in self.archive.add_files(month, paths):
+                    file_path.unlink()
+                    self.catalog.remove(file_path.name)
+                    archived_count += 1
+            
+            # Meses inteiros fora da janela de retenção
+            oldest_month = (datetime.now() - timedelta(days=archive_days)).strftime("%Y-%m")
+            for month in self.archive.months():
+                if month < oldest_month:
+                    self.archive.remove_month(month)
+                    logger.info(f"🗑️ Arquivo de relatórios de {month} removido")
+            self.aggregates.forget(f"{oldest_month}-01")
+            
+            if archived_count > 0:
+                logger.info(f"🗜️ {archived_count} relatórios antigos compactados")
             if removed_count > 0:
                 logger.info(f"🗑️ Removidos {removed_count} relatórios antigos")
                 
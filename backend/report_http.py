@@ -0,0 +1,138 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_validators(stat: os.stat_result) -> Tuple[str, str]:
+    """ETag e Last-Modified derivados de mtime e tamanho"""
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    return etag, last_modified
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Verifica If-None-Match / If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Interpreta um único intervalo 'bytes=início-fim' (None se inválido ou múltiplo)"""
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[6:].strip().partition("-")
+    try:
+        if start_text == "":
+            # Sufixo: últimos N bytes
+            length = int(end_text)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _read_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    """Lê um trecho do arquivo em blocos"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _jsonl_as_array(path: Path) -> Iterator[bytes]:
+    """Converte um log JSONL em um array JSON sem interpretar as linhas"""
+    yield b"["
+    first = True
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            yield line if first else b"," + line
+            first = False
+    yield b"]"
+
+
+def report_file_response(path: Path, request: Request) -> Response:
+    """Serve um relatório direto do disco com validadores, 304 e Range"""
+    stat = path.stat()
+    etag, last_modified = file_validators(stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": "no-cache",
+        "Accept-Ranges": "bytes"
+    }
+
+    if is_not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = "application/x-ndjson" if path.suffix == ".jsonl" else "application/json"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = parse_range(range_header, stat.st_size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+        start, end = byte_range
+        length = end - start + 1
+        return StreamingResponse(
+            _read_file(path, start, length),
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                     "Content-Length": str(length)}
+        )
+
+    if path.suffix == ".jsonl":
+        # Sem Range, o log é entregue como array JSON (formato esperado pelo painel)
+        headers.pop("Accept-Ranges")
+        return StreamingResponse(_jsonl_as_array(path), media_type="application/json", headers=headers)
+
+    return StreamingResponse(
+        _read_file(path, 0, stat.st_size),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(stat.st_size)}
+    )
+
+
+def report_entries_response(content, etag: str, last_modified: str,
+                            offset: int, limit: Optional[int]) -> Response:
+    """Página de entradas de um relatório já interpretado (lista de falhas ou campo 'failures')"""
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "no-cache"}
+
+    entries = content if isinstance(content, list) else content.get("failures", [])
+    total = len(entries)
+    offset = max(0, offset)
+    page = entries[offset:offset + limit] if limit is not None else entries[offset:]
+    headers["X-Total-Count"] = str(total)
+    return JSONResponse({"total": total, "offset": offset, "limit": limit, "entries": page}, headers=headers)
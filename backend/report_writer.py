@@ -0,0 +1,136 @@
+import queue
+import time
+import logging
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWriter:
+    """Thread dedicada que grava relatórios em lote, fora do caminho das sondas"""
+
+    def __init__(self, write_batch: Callable[[List[Dict]], None], max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+
+        # Estatísticas
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def start(self):
+        """Inicia a thread de gravação"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Grava o que estiver pendente e para a thread"""
+        if not self._thread:
+            return
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        try:
+            self.queue.put(None, timeout=timeout)  # acorda a thread
+        except queue.Full:
+            # Fila cheia: a thread está acordada e para ao esvaziá-la
+            pass
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            logger.warning(f"⚠️ Gravador de relatórios não terminou em {timeout}s, "
+                           f"{self.queue.qsize()} itens pendentes")
+        self._thread = None
+
+    def submit(self, item: Dict) -> bool:
+        """Enfileira um item sem bloquear; com a fila cheia o item é descartado"""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            logger.error(f"❌ Fila de gravação de relatórios cheia, {self.dropped} itens descartados")
+            return False
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def flush(self, timeout: float = 5) -> bool:
+        """Aguarda a gravação de tudo que foi enfileirado até agora"""
+        if not self._thread:
+            return False
+        done = Event()
+        deadline = time.monotonic() + timeout
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.monotonic()))
+
+    def _run(self):
+        """Agrupa itens por tamanho ou tempo e grava cada lote de uma vez"""
+        while True:
+            item = self.queue.get()
+            batch: List[Dict] = []
+            waiters: List[Event] = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if isinstance(item, Event):
+                    waiters.append(item)
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+            if self._stop.is_set() and self.queue.empty():
+                return
+
+    def _write(self, batch: List[Dict]):
+        start = time.perf_counter()
+        try:
+            self.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar lote de relatórios: {e}")
+        elapsed = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    def get_stats(self) -> Dict:
+        """Retorna profundidade da fila e latência de gravação"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
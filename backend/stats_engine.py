@@ -0,0 +1,172 @@
+import math
+from typing import Dict, Optional
+
+
+class QuantileSketch:
+    """Sketch de quantis com erro relativo limitado (buckets logarítmicos), mesclável"""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0  # valores <= 0
+        self.count = 0
+
+    def add(self, value: float):
+        """Adiciona um valor em O(1)"""
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        """Mescla outro sketch com a mesma precisão"""
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches com precisões diferentes")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Valor aproximado do quantil q (0..1)"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class RunningStats:
+    """Agregador incremental de um destino: contagem, perda, Welford, min/max, EWMA e quantis"""
+
+    def __init__(self, ewma_alpha: float = 0.2):
+        self.ewma_alpha = ewma_alpha
+        self.count = 0
+        self.lost = 0
+        # Latência (apenas pings bem-sucedidos com latência > 0)
+        self.latency_count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.ewma: Optional[float] = None
+        self.sketch = QuantileSketch()
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+
+    def update(self, success: bool, latency: float, timestamp: Optional[str] = None):
+        """Atualiza em O(1) com uma amostra"""
+        self.count += 1
+        if timestamp:
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+
+        if not success:
+            self.lost += 1
+            return
+        if latency <= 0:
+            return
+
+        self.latency_count += 1
+        delta = latency - self.mean
+        self.mean += delta / self.latency_count
+        self._m2 += delta * (latency - self.mean)
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+        self.ewma = latency if self.ewma is None else self.ewma + self.ewma_alpha * (latency - self.ewma)
+        self.sketch.add(latency)
+
+    def merge(self, other: "RunningStats"):
+        """Mescla outro agregador (algoritmo paralelo de Chan para a variância)"""
+        if other.latency_count:
+            total = self.latency_count + other.latency_count
+            delta = other.mean - self.mean
+            self._m2 += other._m2 + delta * delta * self.latency_count * other.latency_count / total
+            self.mean += delta * other.latency_count / total
+            self.latency_count = total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+            self.ewma = other.ewma
+            self.sketch.merge(other.sketch)
+
+        self.count += other.count
+        self.lost += other.lost
+        if other.first_timestamp and (self.first_timestamp is None or other.first_timestamp < self.first_timestamp):
+            self.first_timestamp = other.first_timestamp
+        if other.last_timestamp and (self.last_timestamp is None or other.last_timestamp > self.last_timestamp):
+            self.last_timestamp = other.last_timestamp
+
+    @property
+    def successful(self) -> int:
+        return self.count - self.lost
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.latency_count - 1) if self.latency_count > 1 else 0.0
+
+    def to_dict(self) -> Dict:
+        """Estado atual em formato serializável"""
+        p50 = self.sketch.quantile(0.5)
+        p95 = self.sketch.quantile(0.95)
+        p99 = self.sketch.quantile(0.99)
+        return {
+            "total": self.count,
+            "successful": self.successful,
+            "failed": self.lost,
+            "success_rate": round(self.successful / self.count * 100, 2) if self.count else 0,
+            "loss": round(self.lost / self.count, 4) if self.count else 0,
+            "average_latency": round(self.mean, 2),
+            "stddev": round(math.sqrt(self.variance), 2),
+            "min_latency": round(self.min, 2) if self.min is not None else None,
+            "max_latency": round(self.max, 2) if self.max is not None else None,
+            "ewma_latency": round(self.ewma, 2) if self.ewma is not None else None,
+            "p50": round(p50, 2) if p50 is not None else None,
+            "p95": round(p95, 2) if p95 is not None else None,
+            "p99": round(p99, 2) if p99 is not None else None
+        }
+
+
+class StatsEngine:
+    """Agregadores incrementais por destino e total"""
+
+    def __init__(self):
+        self.total = RunningStats()
+        self.targets: Dict[str, RunningStats] = {}
+
+    def update(self, result: Dict):
+        """Atualiza com um resultado no formato de ping_target"""
+        success = result.get("success", False)
+        latency = result.get("latency", 0) or 0
+        timestamp = result.get("timestamp")
+
+        stats = self.targets.get(result.get("target", "unknown"))
+        if stats is None:
+            stats = RunningStats()
+            self.targets[result.get("target", "unknown")] = stats
+
+        stats.update(success, latency, timestamp)
+        self.total.update(success, latency, timestamp)
+
+    def remove(self, target: str):
+        """Descarta o agregador de um destino (o total é mantido)"""
+        self.targets.pop(target, None)
+
+    def get(self, target: str) -> Optional[Dict]:
+        """Estatísticas de um destino"""
+        stats = self.targets.get(target)
+        return stats.to_dict() if stats else None
+
+    def snapshot(self) -> Dict:
+        """Estatísticas de todos os destinos"""
+        return {target: stats.to_dict() for target, stats in self.targets.items()}
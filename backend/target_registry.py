@@ -0,0 +1,234 @@
+import csv
+import json
+import logging
+from threading import RLock
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Campos indexados: alterá-los só por add/update mantém os índices consistentes
+INDEXED_FIELDS = ("name", "tags", "parent")
+
+# Colunas aceitas na importação em lote (ordem usada quando o CSV não tem cabeçalho)
+BULK_COLUMNS = ("ip", "name", "enabled", "parent", "tags", "new_ip")
+
+
+def normalize_tags(tags) -> List[str]:
+    """Aceita lista ou texto separado por vírgula/ponto e vírgula; retorna tags únicas, sem vazias"""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.replace(";", ",").split(",")
+    result = []
+    for tag in tags:
+        tag = str(tag).strip().lower()
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ("0", "false", "no", "nao", "não", "off", "n")
+
+
+def normalize_row(row: Dict) -> Dict:
+    """Linha de importação com tipos normalizados; campos ausentes ficam de fora
+
+    `parent` vazio (ou "none"/"-") significa "sem pai" e por isso é mantido como "".
+    """
+    entry = {}
+    for field in BULK_COLUMNS:
+        value = row.get(field)
+        if value is None:
+            continue
+        if field == "enabled":
+            if value != "":
+                entry[field] = parse_bool(value)
+        elif field == "tags":
+            entry[field] = normalize_tags(value)
+        elif field == "parent":
+            value = str(value).strip()
+            entry[field] = "" if value.lower() in ("none", "-") else value
+        elif str(value).strip():
+            entry[field] = str(value).strip()
+    return entry
+
+
+class BulkRowParser:
+    """Converte um corpo CSV ou NDJSON recebido em partes em linhas de destino, sem guardar o corpo"""
+
+    def __init__(self, fmt: str = "csv"):
+        self.fmt = fmt
+        self.columns: Optional[List[str]] = None
+        self.errors: List[Dict] = []
+        self.line = 0
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        """Processa as linhas completas do trecho recebido"""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return self._parse(lines)
+
+    def close(self) -> List[Dict]:
+        """Processa a última linha (sem quebra no final)"""
+        lines, self._buffer = [self._buffer], b""
+        return self._parse(lines)
+
+    def _parse(self, lines: List[bytes]) -> List[Dict]:
+        rows = []
+        for raw in lines:
+            self.line += 1
+            text = raw.decode("utf-8-sig" if self.line == 1 else "utf-8", errors="replace").strip()
+            if not text or text.startswith("#"):
+                continue
+            try:
+                if self.fmt == "csv":
+                    fields = [field.strip() for field in next(csv.reader([text]))]
+                    if self.columns is None:
+                        if fields[0].lower() == "ip":
+                            # Cabeçalho
+                            self.columns = [field.lower() for field in fields]
+                            continue
+                        self.columns = list(BULK_COLUMNS)
+                    # Célula vazia no CSV = campo não informado
+                    row = {column: field for column, field in zip(self.columns, fields) if field}
+                else:
+                    row = json.loads(text)
+                    if not isinstance(row, dict):
+                        raise ValueError("esperado um objeto JSON")
+                rows.append(normalize_row(row))
+            except (ValueError, StopIteration) as e:
+                self.errors.append({"line": self.line, "error": str(e)})
+        return rows
+
+
+class TargetRegistry:
+    """Destinos personalizados por IP com índices por nome, tag e pai (consultas em O(1))"""
+
+    def __init__(self):
+        self._targets: Dict[str, Dict] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._children: Dict[Optional[str], Set[str]] = {}
+        self._lock = RLock()
+
+    # Interface de dicionário (somente leitura)
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self._targets
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __getitem__(self, ip: str) -> Dict:
+        return self._targets[ip]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._targets))
+
+    def get(self, ip: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        return self._targets.get(ip, default)
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            return list(self._targets.items())
+
+    def values(self) -> List[Dict]:
+        with self._lock:
+            return list(self._targets.values())
+
+    def copy(self) -> Dict[str, Dict]:
+        """Cópia rasa {ip: info} para serialização"""
+        with self._lock:
+            return {ip: dict(info) for ip, info in self._targets.items()}
+
+    # Índices
+
+    def _index(self, ip: str, info: Dict):
+        self._by_name.setdefault(info.get("name", "").lower(), set()).add(ip)
+        for tag in info.get("tags", ()):
+            self._by_tag.setdefault(tag, set()).add(ip)
+        self._children.setdefault(info.get("parent", "gateway"), set()).add(ip)
+
+    def _unindex(self, ip: str, info: Dict):
+        keys = [(self._by_name, info.get("name", "").lower()),
+                (self._children, info.get("parent", "gateway"))]
+        keys += [(self._by_tag, tag) for tag in info.get("tags", ())]
+        for index, key in keys:
+            members = index.get(key)
+            if members is not None:
+                members.discard(ip)
+                if not members:
+                    del index[key]
+
+    # Escrita
+
+    def add(self, ip: str, info: Dict):
+        """Insere (ou substitui) um destino"""
+        with self._lock:
+            previous = self._targets.get(ip)
+            if previous is not None:
+                self._unindex(ip, previous)
+            info["tags"] = normalize_tags(info.get("tags"))
+            self._targets[ip] = info
+            self._index(ip, info)
+
+    def update(self, ip: str, fields: Dict):
+        """Atualiza campos de um destino existente reindexando se necessário"""
+        with self._lock:
+            info = self._targets[ip]
+            if "tags" in fields:
+                fields = {**fields, "tags": normalize_tags(fields["tags"])}
+            reindex = any(field in fields for field in INDEXED_FIELDS)
+            if reindex:
+                self._unindex(ip, info)
+            info.update(fields)
+            if reindex:
+                self._index(ip, info)
+
+    def remove(self, ip: str) -> Optional[Dict]:
+        """Remove um destino; retorna os dados removidos"""
+        with self._lock:
+            info = self._targets.pop(ip, None)
+            if info is not None:
+                self._unindex(ip, info)
+            return info
+
+    # Consultas
+
+    def by_name(self, name: str) -> List[str]:
+        """IPs com o nome exato (sem diferenciar maiúsculas)"""
+        return sorted(self._by_name.get(name.lower(), ()))
+
+    def by_tag(self, tag: str) -> List[str]:
+        """IPs marcados com a tag"""
+        return sorted(self._by_tag.get(tag.strip().lower(), ()))
+
+    def children(self, parent: Optional[str]) -> List[str]:
+        """Dependentes diretos de um destino"""
+        return list(self._children.get(parent, ()))
+
+    def tags(self) -> Dict[str, int]:
+        """Quantidade de destinos por tag"""
+        return {tag: len(members) for tag, members in self._by_tag.items()}
+
+    def filter(self, name: Optional[str] = None, tag: Optional[str] = None,
+               enabled: Optional[bool] = None, parent: Optional[str] = None) -> Dict[str, Dict]:
+        """Destinos que atendem a todos os filtros informados, partindo do menor índice"""
+        with self._lock:
+            candidates: Optional[Iterable[str]] = None
+            for index, key in ((self._by_name, name.lower() if name is not None else None),
+                               (self._by_tag, tag.strip().lower() if tag is not None else None),
+                               (self._children, parent)):
+                if key is None:
+                    continue
+                members = index.get(key, set())
+                candidates = members if candidates is None else set(candidates) & members
+            if candidates is None:
+                candidates = self._targets
+
+            return {ip: dict(self._targets[ip]) for ip in candidates
+                    if enabled is None or self._targets[ip].get("enabled", True) == enabled}
@@ -0,0 +1,329 @@
+import sqlite3
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resoluções dos rollups (segundos por bucket)
+ROLLUPS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Retenção padrão de cada resolução de rollup (dias)
+ROLLUP_RETENTION_DAYS = {"1m": 90, "1h": 730, "1d": 3650}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    target TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_target_ts ON samples (target, ts);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    target TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    lost INTEGER NOT NULL,
+    min REAL,
+    avg REAL,
+    max REAL,
+    p95 REAL,
+    PRIMARY KEY (resolution, target, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_resolution_bucket ON rollups (resolution, bucket);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Percentil por interpolação linear sobre uma lista ordenada"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class TimeSeriesStore:
+    """Armazenamento persistente (SQLite em WAL) de resultados de ping com rollups"""
+
+    def __init__(self, db_path: Optional[Path] = None, flush_interval: float = 2.0,
+                 batch_size: int = 1000, raw_retention_days: int = 7,
+                 rollup_retention_days: Optional[Dict[str, int]] = None):
+        if db_path is None:
+            db_path = Path.home() / "NetworkMonitor" / "Data" / "timeseries.db"
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.raw_retention_days = raw_retention_days
+        self.rollup_retention_days = {**ROLLUP_RETENTION_DAYS, **(rollup_retention_days or {})}
+        # Atraso antes de fechar um bucket (amostras ainda no buffer)
+        self.rollup_grace = flush_interval * 2 + 5
+
+        self._buffer: List[tuple] = []
+        self._lock = Lock()
+        self._wakeup = Event()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Estatísticas
+        self.samples_written = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        logger.info(f"✅ TimeSeriesStore inicializado - Banco: {self.db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma conexão com WAL habilitado"""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        """Inicia a thread de gravação em lote"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._writer_loop, name="timeseries-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Grava o que estiver pendente e para a thread"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def append(self, result: Dict):
+        """Enfileira um resultado no formato de ping_target"""
+        self.append_many([result])
+
+    def append_many(self, results: List[Dict]):
+        """Enfileira vários resultados (chamado pela thread de monitoramento)"""
+        rows = []
+        for result in results:
+            try:
+                ts = int(datetime.fromisoformat(result["timestamp"]).timestamp() * 1000)
+            except (KeyError, TypeError, ValueError):
+                ts = int(time.time() * 1000)
+            rows.append((result["target"], ts, float(result.get("latency") or 0), 1 if result["success"] else 0))
+
+        with self._lock:
+            self._buffer.extend(rows)
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _writer_loop(self):
+        """Grava lotes por tamanho ou tempo e mantém os rollups"""
+        self._conn = self._connect()
+        last_maintenance = 0.0
+        try:
+            while not self._stop.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                try:
+                    self._flush()
+                    self._build_rollups()
+                    if time.time() - last_maintenance > 3600:
+                        self._prune()
+                        last_maintenance = time.time()
+                except Exception as e:
+                    logger.error(f"❌ Erro ao gravar séries temporais: {e}")
+            self._flush()
+            self._build_rollups()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    def _flush(self):
+        """Grava o buffer em uma única transação"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+
+        start = time.perf_counter()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO samples (target, ts, latency, success) VALUES (?, ?, ?, ?)", rows
+            )
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.samples_written += len(rows)
+        self.flushes += 1
+
+    def _get_meta(self, key: str) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _build_rollups(self):
+        """Calcula os rollups de todos os buckets já fechados"""
+        now = int(time.time() - self.rollup_grace)
+        for resolution, size in ROLLUPS.items():
+            key = f"rollup_{resolution}"
+            watermark = self._get_meta(key)
+            if watermark is None:
+                row = self._conn.execute("SELECT MIN(ts) FROM samples").fetchone()
+                if row[0] is None:
+                    continue
+                watermark = (row[0] // 1000) // size * size
+
+            closed_until = now // size * size
+            if closed_until <= watermark:
+                continue
+
+            rows = self._conn.execute(
+                "SELECT target, ts, latency, success FROM samples "
+                "WHERE ts >= ? AND ts < ? ORDER BY target, ts",
+                (watermark * 1000, closed_until * 1000)
+            )
+            records = self._aggregate(rows, size, resolution)
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, closed_until)
+                )
+
+    @staticmethod
+    def _aggregate(rows, size: int, resolution: str) -> List[tuple]:
+        """Agrupa amostras ordenadas por (destino, bucket) em registros de rollup"""
+        records = []
+        current = None
+        count = lost = 0
+        latencies: List[float] = []
+
+        def emit():
+            latencies.sort()
+            records.append((
+                resolution, current[0], current[1], count, lost,
+                latencies[0] if latencies else None,
+                sum(latencies) / len(latencies) if latencies else None,
+                latencies[-1] if latencies else None,
+                _percentile(latencies, 0.95)
+            ))
+
+        for target, ts, latency, success in rows:
+            key = (target, (ts // 1000) // size * size)
+            if key != current:
+                if current is not None:
+                    emit()
+                current = key
+                count = lost = 0
+                latencies = []
+            count += 1
+            if success:
+                latencies.append(latency)
+            else:
+                lost += 1
+
+        if current is not None:
+            emit()
+        return records
+
+    def _prune(self):
+        """Remove amostras brutas e rollups fora da retenção de cada resolução"""
+        now = time.time()
+        cutoff = int((now - self.raw_retention_days * 86400) * 1000)
+        with self._conn:
+            deleted = self._conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,)).rowcount
+            rollups_deleted = 0
+            for resolution, days in self.rollup_retention_days.items():
+                rollups_deleted += self._conn.execute(
+                    "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                    (resolution, int(now - days * 86400))
+                ).rowcount
+        if deleted or rollups_deleted:
+            logger.info(f"🗑️ Removidas {deleted} amostras brutas e {rollups_deleted} rollups antigos")
+
+    def _choose_resolution(self, span_seconds: float) -> str:
+        """Escolhe a menor resolução adequada ao período consultado"""
+        if span_seconds <= 6 * 3600:
+            return "raw"
+        if span_seconds <= 3 * 86400:
+            return "1m"
+        if span_seconds <= 90 * 86400:
+            return "1h"
+        return "1d"
+
+    def query(self, target: str, start: float, end: float, resolution: str = "auto") -> Dict:
+        """Consulta um intervalo (epoch em segundos) usando rollups para períodos longos"""
+        if resolution == "auto":
+            resolution = self._choose_resolution(end - start)
+        # Dados já removidos na resolução pedida: usa a próxima mais grossa que ainda os tem
+        now = time.time()
+        if resolution == "raw" and start < now - self.raw_retention_days * 86400:
+            resolution = "1m"
+        if resolution != "raw":
+            coarser = list(ROLLUPS)
+            while (resolution != coarser[-1] and
+                   start < now - self.rollup_retention_days[resolution] * 86400):
+                resolution = coarser[coarser.index(resolution) + 1]
+
+        conn = self._connect()
+        try:
+            if resolution == "raw":
+                rows = conn.execute(
+                    "SELECT ts, latency, success FROM samples "
+                    "WHERE target = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                    (target, int(start * 1000), int(end * 1000))
+                ).fetchall()
+                points = [
+                    {"timestamp": ts / 1000, "latency": latency, "success": bool(success)}
+                    for ts, latency, success in rows
+                ]
+            else:
+                size = ROLLUPS[resolution]
+                rows = conn.execute(
+                    "SELECT bucket, count, lost, min, avg, max, p95 FROM rollups "
+                    "WHERE resolution = ? AND target = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                    (resolution, target, int(start) // size * size, int(end))
+                ).fetchall()
+                points = [
+                    {
+                        "timestamp": bucket,
+                        "count": count,
+                        "loss": round(lost / count, 4) if count else 0,
+                        "min": latency_min,
+                        "avg": round(latency_avg, 2) if latency_avg is not None else None,
+                        "max": latency_max,
+                        "p95": round(p95, 2) if p95 is not None else None
+                    }
+                    for bucket, count, lost, latency_min, latency_avg, latency_max, p95 in rows
+                ]
+        finally:
+            conn.close()
+
+        return {"target": target, "resolution": resolution, "points": points}
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas de gravação"""
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "pending": pending,
+            "samples_written": self.samples_written,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Mensagens de estado: no modo coalescido basta a mais recente (por destino, no caso de ping_result).
+# As demais são eventos discretos e são entregues todas, em ordem.
+SNAPSHOT_TYPES = ("ping_result", "cycle_results", "network_speed")
+
+
+class WebSocketClient:
+    """Conexão WebSocket com fila de saída própria e tarefa de escrita dedicada"""
+
+    def __init__(self, websocket: WebSocket, hub: "WebSocketHub", max_queue: int, send_timeout: float,
+                 max_events: int = 64):
+        self.websocket = websocket
+        self.hub = hub
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.max_events = max_events
+
+        self._pending = deque()  # (chave, mensagem, dados) em ordem de chegada
+        self._events = deque()  # modo coalescido: eventos discretos, em ordem e limitados
+        self._latest: Dict[Hashable, Optional[str]] = {}  # modo coalescido: só o estado mais recente
+        self._latest_results: Dict[str, Dict] = {}  # resultados de ciclo mesclados por destino
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.coalesced = False
+        self.closed = False
+        self.sent = 0
+        self.overflows = 0
+
+    def start(self):
+        """Inicia a tarefa de escrita"""
+        self._task = asyncio.create_task(self._writer())
+
+    def _coalesce(self, key: Hashable, message: str, data: Dict) -> bool:
+        """Guarda o estado mais recente (ciclos mesclados por destino) ou enfileira o evento
+
+        Retorna False se a fila de eventos estourou: o cliente precisa ser ressincronizado.
+        """
+        if key is None:
+            if len(self._events) >= self.max_events:
+                return False
+            self._events.append(message)
+        elif key == "cycle_results":
+            for result in data["data"]["results"]:
+                self._latest_results[result["target"]] = result
+            self._latest[key] = None  # serializado no envio
+        else:
+            self._latest[key] = message
+        return True
+
+    def _evict(self, reason: str):
+        """Desconecta o cliente; ao reconectar ele recebe o estado completo"""
+        logger.warning(f"🐢 Cliente WebSocket lento desconectado ({reason})")
+        self.closed = True
+        asyncio.create_task(self.hub.disconnect(self.websocket, close=True))
+
+    def offer(self, key: Hashable, message: str, data: Dict):
+        """Enfileira uma mensagem sem bloquear"""
+        if self.closed:
+            return
+
+        if self.coalesced:
+            if not self._coalesce(key, message, data):
+                self._evict("eventos acumulados")
+                return
+        elif len(self._pending) >= self.max_queue:
+            self.overflows += 1
+            if self.hub.slow_client_policy == "drop":
+                self._evict("fila cheia")
+                return
+            # Passa a enviar apenas o estado mais recente de cada chave (eventos continuam todos)
+            logger.warning("🐢 Cliente WebSocket lento, alternando para modo coalescido")
+            self.coalesced = True
+            pending, self._pending = self._pending, deque()
+            for item in (*pending, (key, message, data)):
+                if not self._coalesce(*item):
+                    self._evict("eventos acumulados")
+                    return
+        else:
+            self._pending.append((key, message, data))
+
+        self._wakeup.set()
+
+    def send(self, data: Dict):
+        """Envia uma mensagem apenas para este cliente"""
+        self.offer(self.hub._coalesce_key(data), json.dumps(data), data)
+
+    def _next_message(self) -> Optional[str]:
+        """Retira a próxima mensagem a ser enviada"""
+        if self._pending:
+            return self._pending.popleft()[1]
+        if self._events:
+            return self._events.popleft()
+        if self._latest:
+            key = next(iter(self._latest))
+            message = self._latest.pop(key)
+            if message is None:
+                message = self._merged_cycle_frame()
+            return message
+        return None
+
+    def _merged_cycle_frame(self) -> str:
+        """Monta um frame delta com os resultados mesclados no modo coalescido"""
+        results = list(self._latest_results.values())
+        self._latest_results.clear()
+        return json.dumps({
+            "type": "cycle_results",
+            "data": {"delta": True, "coalesced": True, "results": results}
+        })
+
+    async def _writer(self):
+        """Envia as mensagens da fila; um envio travado desconecta o cliente"""
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                message = self._next_message()
+                while message is not None:
+                    await asyncio.wait_for(self.websocket.send_text(message), self.send_timeout)
+                    self.sent += 1
+                    message = self._next_message()
+
+                # Cliente alcançou o fluxo, volta ao modo normal
+                if self.coalesced:
+                    self.coalesced = False
+                    logger.info("✅ Cliente WebSocket recuperado, saindo do modo coalescido")
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            logger.warning(f"🐢 Envio para WebSocket excedeu {self.send_timeout}s, desconectando cliente")
+            asyncio.create_task(self.hub.disconnect(self.websocket, close=True))
+        except Exception as e:
+            logger.error(f"❌ Erro ao enviar para WebSocket: {e}")
+            asyncio.create_task(self.hub.disconnect(self.websocket, close=True))
+
+    async def close(self, close_socket: bool = False):
+        """Encerra a tarefa de escrita e, opcionalmente, o socket"""
+        self.closed = True
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if close_socket:
+            try:
+                await asyncio.wait_for(self.websocket.close(), self.send_timeout)
+            except Exception:
+                pass
+
+
+class WebSocketHub:
+    """Distribui mensagens para todos os clientes WebSocket em paralelo"""
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 5.0, slow_client_policy: str = "coalesce"):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.slow_client_policy = slow_client_policy  # "coalesce" ou "drop"
+        self.clients: Dict[WebSocket, WebSocketClient] = {}
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    async def connect(self, websocket: WebSocket) -> WebSocketClient:
+        """Registra uma conexão já aceita"""
+        client = WebSocketClient(websocket, self, self.max_queue, self.send_timeout)
+        self.clients[websocket] = client
+        client.start()
+        return client
+
+    async def disconnect(self, websocket: WebSocket, close: bool = False):
+        """Remove uma conexão (close=True indica remoção forçada de cliente lento)"""
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if close:
+            self.evicted += 1
+        await client.close(close_socket=close)
+
+    def _coalesce_key(self, data: Dict) -> Hashable:
+        """Chave usada para manter apenas o estado mais recente no modo coalescido (None = evento)"""
+        message_type = data.get("type")
+        if message_type == "ping_result":
+            return (message_type, data.get("data", {}).get("target"))
+        if message_type in SNAPSHOT_TYPES:
+            return message_type
+        return None
+
+    def broadcast(self, data: Dict):
+        """Serializa uma vez e enfileira para cada cliente (nunca bloqueia)"""
+        if not self.clients:
+            return
+        message = json.dumps(data)
+        key = self._coalesce_key(data)
+        for client in list(self.clients.values()):
+            client.offer(key, message, data)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas das conexões"""
+        clients = list(self.clients.values())
+        return {
+            "connections": len(clients),
+            "coalesced_clients": sum(1 for c in clients if c.coalesced),
+            "queued_messages": sum(len(c._pending) + len(c._events) + len(c._latest) for c in clients),
+            "evicted": self.evicted,
+            "slow_client_policy": self.slow_client_policy
+        }
@@ -172,6 +172,10 @@ class NetworkMonitor {
             case 'ping_result':
                 this.updatePingData(data.data);
                 break;
+            case 'cycle_results':
+                // Um frame por ciclo com os resultados de todos os destinos (ou só os alterados)
+                data.data.results.forEach(result => this.updatePingData(result));
+                break;
             case 'network_speed':
                 this.updateNetworkSpeed(data.data);
                 break;
@@ -184,12 +188,30 @@ class NetworkMonitor {
             case 'target_removed':
                 this.handleTargetRemoved(data.data);
                 break;
+            case 'targets_changed':
+                this.handleTargetsChanged(data.data);
+                break;
             case 'initial_targets':
                 this.handleInitialTargets(data.data);
                 break;
             case 'failure_report':
                 this.handleFailureReport(data.data);
                 break;
+            case 'failure_started':
+                // Dependentes do destino ficam suprimidos durante a queda
+                this.showToast(`Queda detectada: ${data.data.target} (${data.data.consecutive_failures} falhas consecutivas)` +
+                    (data.data.suppressed_targets?.length ? `, ${data.data.suppressed_targets.length} dependente(s) suprimido(s)` : ''), 'error');
+                break;
+            case 'failure_resolved':
+                this.showToast(`Destino ${data.data.target} voltou a responder` +
+                    (data.data.affected_targets?.length ? ` (${data.data.affected_targets.length} dependente(s) afetado(s))` : ''), 'info');
+                break;
+            case 'bandwidth_test':
+                console.log(`📶 Teste de vazão ${data.data.protocol.toUpperCase()} para ${data.data.target}: ${data.data.mbps} Mbps`);
+                break;
+            case 'gateway_changed':
+                console.log(`🔀 Gateway alterado: ${data.data.previous} → ${data.data.gateway}`);
+                break;
             case 'pong':
                 // Resposta ao ping
                 break;
@@ -473,7 +495,8 @@ class NetworkMonitor {
                 this.loadCustomTargets();
                 
                 // Mostra toast de sucesso
-                this.showToast('Destino adicionado com sucesso!', 'success');
+                this.showToast(result.resolved === false ? result.message : 'Destino adicionado com sucesso!',
+                    result.resolved === false ? 'error' : 'success');
             } else {
                 const error = await response.json();
                 throw new Error(error.detail || 'Erro ao adicionar destino');
@@ -548,7 +571,8 @@ class NetworkMonitor {
                 this.loadCustomTargets();
                 
                 // Mostra toast de sucesso
-                this.showToast('Destino atualizado com sucesso!', 'success');
+                this.showToast(result.resolved === false ? result.message : 'Destino atualizado com sucesso!',
+                    result.resolved === false ? 'error' : 'success');
             } else {
                 const error = await response.json();
                 throw new Error(error.detail || 'Erro ao atualizar destino');
@@ -653,6 +677,38 @@ class NetworkMonitor {
         this.showToast('Destino removido!', 'info');
     }
 
+    handleTargetsChanged(data) {
+        console.log(`📦 Destinos alterados em lote: +${data.added.length} ~${data.updated.length} -${data.removed.length}`);
+        
+        // Aplica o lote inteiro antes de redesenhar a lista uma única vez
+        data.removed.forEach(ip => {
+            delete this.customTargets[ip];
+            this.removeCustomTargetCard(ip);
+        });
+        
+        data.updated.forEach(target => {
+            if (target.old_ip !== target.ip) {
+                delete this.customTargets[target.old_ip];
+                this.removeCustomTargetCard(target.old_ip);
+            }
+        });
+        
+        [...data.added, ...data.updated].forEach(target => {
+            this.customTargets[target.ip] = {
+                name: target.name,
+                enabled: target.enabled
+            };
+            this.createCustomTargetCard(target.ip, target.name);
+        });
+        
+        // Atualiza lista se estiver na seção de configurações
+        if (document.getElementById('configuracoes').style.display !== 'none') {
+            this.renderCustomTargetsList();
+        }
+        
+        this.showToast(`${data.added.length + data.updated.length + data.removed.length} destinos alterados`, 'info');
+    }
+
     handleInitialTargets(data) {
         console.log('📋 Destinos iniciais recebidos:', data);
         